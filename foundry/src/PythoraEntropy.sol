@@ -29,6 +29,23 @@ contract PythoraEntropy is IEntropyConsumer {
         address entropyProvider = entropy.getDefaultProvider();
         uint256 fee = entropy.getFee(entropyProvider);
 
+        _requestRandomNumber(entropyProvider, fee, userRandomNumber);
+    }
+
+    // @param userRandomNumbers The random numbers generated by the user, one per requested random number.
+    // The value sent must cover the fee of every request.
+    function requestRandomNumbers(bytes32[] calldata userRandomNumbers) external payable {
+        // Get the default provider and the fee once for all requests
+        address entropyProvider = entropy.getDefaultProvider();
+        uint256 fee = entropy.getFee(entropyProvider);
+        require(msg.value >= fee * userRandomNumbers.length, "Insufficient fee");
+
+        for (uint256 i = 0; i < userRandomNumbers.length; i++) {
+            _requestRandomNumber(entropyProvider, fee, userRandomNumbers[i]);
+        }
+    }
+
+    function _requestRandomNumber(address entropyProvider, uint256 fee, bytes32 userRandomNumber) internal {
         // Request the random number with the callback
         uint64 sequenceNumber = entropy.requestWithCallback{value: fee}(entropyProvider, userRandomNumber);
         // Store the sequence number to identify the callback request
@@ -0,0 +1,81 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.0;
+
+import {Test} from "forge-std/Test.sol";
+import {PythoraEntropy} from "../src/PythoraEntropy.sol";
+
+// Stands in for the Pyth Entropy contract, charging a fixed fee per request.
+contract MockEntropy {
+    address public constant PROVIDER = address(0xBEEF);
+    uint128 public fee;
+    uint64 public sequenceNumber;
+
+    constructor(uint128 requestFee) {
+        fee = requestFee;
+    }
+
+    function getDefaultProvider() external pure returns (address) {
+        return PROVIDER;
+    }
+
+    function getFee(address) external view returns (uint128) {
+        return fee;
+    }
+
+    function requestWithCallback(address, bytes32) external payable returns (uint64) {
+        require(msg.value >= fee, "Insufficient fee");
+        sequenceNumber++;
+        return sequenceNumber;
+    }
+}
+
+contract PythoraEntropyTest is Test {
+    uint128 constant FEE = 10;
+
+    MockEntropy entropy;
+    PythoraEntropy pythoraEntropy;
+
+    function setUp() public {
+        entropy = new MockEntropy(FEE);
+        pythoraEntropy = new PythoraEntropy(address(entropy));
+    }
+
+    function userRandomNumbers(uint256 count) internal pure returns (bytes32[] memory numbers) {
+        numbers = new bytes32[](count);
+        for (uint256 i = 0; i < count; i++) {
+            numbers[i] = keccak256(abi.encode(i));
+        }
+    }
+
+    function testRequestRandomNumbersPaysEveryFee() public {
+        bytes32[] memory numbers = userRandomNumbers(3);
+        pythoraEntropy.requestRandomNumbers{value: 3 * FEE}(numbers);
+
+        assertEq(address(entropy).balance, 3 * FEE);
+        assertEq(pythoraEntropy.lastSequenceNumber(), 3);
+        for (uint256 i = 0; i < numbers.length; i++) {
+            assertEq(pythoraEntropy.sequenceNumbersByUserRandomNumber(numbers[i]), i + 1);
+        }
+    }
+
+    function testRequestRandomNumbersRevertsWithoutEveryFee() public {
+        bytes32[] memory numbers = userRandomNumbers(3);
+        vm.expectRevert(bytes("Insufficient fee"));
+        pythoraEntropy.requestRandomNumbers{value: 3 * FEE - 1}(numbers);
+    }
+
+    function testRequestRandomNumbersDoesNotSpendTheBalance() public {
+        // a balance left on the contract must not pay for an underfunded batch
+        vm.deal(address(pythoraEntropy), 10 * FEE);
+        vm.expectRevert(bytes("Insufficient fee"));
+        pythoraEntropy.requestRandomNumbers{value: FEE}(userRandomNumbers(2));
+    }
+
+    function testEntropyCallbackStoresTheRandomNumber() public {
+        pythoraEntropy.requestRandomNumber{value: FEE}(keccak256("user"));
+        vm.prank(address(entropy));
+        pythoraEntropy._entropyCallback(1, entropy.PROVIDER(), keccak256("random"));
+        assertEq(pythoraEntropy.randomNumbersBySequenceNumber(1), keccak256("random"));
+    }
+}
@@ -0,0 +1,61 @@
+"""This module contains the Multicall3 contract definition."""
+
+from typing import Any
+
+from aea.common import JSONLike
+from aea.crypto.base import LedgerApi
+from aea.contracts.base import Contract
+from eth_utils.abi import collapse_if_tuple
+from aea.configurations.base import PublicId
+
+
+# Multicall3 is deployed at the same address on every EVM chain
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# a read of `method(*args)` on the contract at `address`, e.g. (Pyth, pyth_address, "getPriceUnsafe", (feed_id,))
+BatchCall = tuple[type[Contract], str, str, tuple[Any, ...]]
+
+
+class Multicall3(Contract):
+    """The Multicall3 contract class, batching contract reads into a single eth_call."""
+
+    contract_id = PublicId.from_str("dakavon/multicall3:0.1.0")
+
+    @classmethod
+    def aggregate3(cls, ledger_api: LedgerApi, contract_address: str, calls: list[tuple[str, bool, bytes]]) -> JSONLike:
+        """Handler method for the 'aggregate3' requests."""
+        instance = cls.get_instance(ledger_api, contract_address)
+        result = instance.functions.aggregate3(calls).call()
+        return {"results": result}
+
+    @classmethod
+    def batch_read(
+        cls,
+        ledger_api: LedgerApi,
+        calls: list[BatchCall],
+        contract_address: str = MULTICALL3_ADDRESS,
+    ) -> JSONLike:
+        """Read several contract methods in one round-trip.
+
+        Every call is a tuple of the contract class, the contract address, the method
+        name and its positional arguments. The results are decoded as `call()` would
+        return them, in the order of the calls; the result of a reverted call is None.
+        """
+        functions = []
+        call3 = []
+        for contract, address, method, args in calls:
+            instance = contract.get_instance(ledger_api, address)
+            functions.append(instance.get_function_by_name(method))
+            call3.append((instance.address, True, instance.encodeABI(fn_name=method, args=args)))
+
+        results = []
+        for function, (success, return_data) in zip(
+            functions, cls.aggregate3(ledger_api, contract_address, call3)["results"], strict=True
+        ):
+            if not success:
+                results.append(None)
+                continue
+            output_types = [collapse_if_tuple(output) for output in function.abi["outputs"]]
+            decoded = ledger_api.api.codec.decode(output_types, return_data)
+            results.append(decoded[0] if len(decoded) == 1 else list(decoded))
+        return {"results": results}
@@ -0,0 +1 @@
+"""This module contains the tests of the Multicall3 contract."""
@@ -0,0 +1,67 @@
+"""Test the Multicall3 contract."""
+
+from unittest.mock import MagicMock, patch
+
+from web3 import Web3
+
+from packages.dakavon.contracts.multicall3.contract import Multicall3
+
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+
+ABI = [
+    {
+        "name": "getPrice",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [{"name": "id", "type": "bytes32"}],
+        "outputs": [
+            {
+                "name": "price",
+                "type": "tuple",
+                "components": [
+                    {"name": "price", "type": "int64"},
+                    {"name": "expo", "type": "int32"},
+                ],
+            }
+        ],
+    },
+    {
+        "name": "getFee",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [],
+        "outputs": [{"name": "fee", "type": "uint256"}, {"name": "decimals", "type": "uint8"}],
+    },
+]
+
+
+class TestMulticall3:
+    """Test Multicall3."""
+
+    def setup_method(self):
+        """Set up the test."""
+        web3 = Web3()
+        self.ledger_api = MagicMock()
+        self.ledger_api.api.codec = web3.codec
+        self.contract = MagicMock()
+        self.contract.get_instance.return_value = web3.eth.contract(address=ADDRESS, abi=ABI)
+
+    def test_batch_read(self):
+        """Test the calls are encoded into one aggregate3 call and their results decoded in order."""
+        codec = self.ledger_api.api.codec
+        results = [
+            (True, codec.encode(["(int64,int32)"], [(12345, -2)])),
+            (False, b""),
+            (True, codec.encode(["uint256", "uint8"], [10, 18])),
+        ]
+        calls = [
+            (self.contract, ADDRESS, "getPrice", (b"\x01" * 32,)),
+            (self.contract, ADDRESS, "getPrice", (b"\x02" * 32,)),
+            (self.contract, ADDRESS, "getFee", ()),
+        ]
+        with patch.object(Multicall3, "aggregate3", return_value={"results": results}) as aggregate3:
+            assert Multicall3.batch_read(self.ledger_api, calls) == {"results": [(12345, -2), None, [10, 18]]}
+        call3 = aggregate3.call_args.args[2]
+        assert [(target, allow_failure) for target, allow_failure, _ in call3] == [(ADDRESS, True)] * 3
+        assert call3[0][2].startswith(Web3.keccak(text="getPrice(bytes32)")[:4].hex())
@@ -1,12 +1,19 @@
 """This module contains the scaffold contract definition."""
 
 # ruff: noqa: PLR0904
+import json
+from pathlib import Path
+
 from aea.common import JSONLike
 from aea.crypto.base import Address, LedgerApi
 from aea.contracts.base import Contract
 from aea.configurations.base import PublicId
 
 
+# the interface of the Pyth Entropy contract, to read the fees of its providers
+IENTROPY_INTERFACE = json.loads((Path(__file__).parent / "build" / "ientropy.json").read_text(encoding="utf-8"))
+
+
 class Pythoraentropy(Contract):
     """The scaffold contract class for a smart contract."""
 
@@ -23,6 +30,19 @@ class Pythoraentropy(Contract):
         result = instance.functions.lastSequenceNumber().call()
         return {"int": result}
 
+    @classmethod
+    def get_fee(cls, ledger_api: LedgerApi, contract_address: str, provider: Address | None = None) -> JSONLike:
+        """Get the fee of an entropy request, from the default provider unless given a provider.
+
+        Unlike the other handlers, this reads the Pyth Entropy contract at `contract_address`,
+        which the Pythora Entropy contract requests its random numbers from.
+        """
+        instance = ledger_api.get_contract_instance(IENTROPY_INTERFACE, contract_address)
+        if provider is None:
+            provider = instance.functions.getDefaultProvider().call()
+        result = instance.functions.getFee(provider).call()
+        return {"fee": result, "provider": provider}
+
     @classmethod
     def random_numbers_by_sequence_number(cls, ledger_api: LedgerApi, contract_address: str, var_0: int) -> JSONLike:
         """Handler method for the 'random_numbers_by_sequence_number' requests."""
@@ -53,6 +73,14 @@ class Pythoraentropy(Contract):
         instance = cls.get_instance(ledger_api, contract_address)
         return instance.functions.requestRandomNumber(userRandomNumber=user_random_number)
 
+    @classmethod
+    def request_random_numbers(
+        cls, ledger_api: LedgerApi, contract_address: str, user_random_numbers: list[str]
+    ) -> JSONLike:
+        """Handler method for the 'request_random_numbers' requests."""
+        instance = cls.get_instance(ledger_api, contract_address)
+        return instance.functions.requestRandomNumbers(userRandomNumbers=user_random_numbers)
+
     @classmethod
     def get_pythora_entropy_callback_events(
         cls,
@@ -0,0 +1,210 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the off-chain decoder of the Hermes accumulator updates."""
+
+from typing import Any
+from collections.abc import Iterable
+
+from eth_utils import keccak
+
+
+ACCUMULATOR_MAGIC = b"PNAU"
+WORMHOLE_MERKLE_MAGIC = b"AUWV"
+MAJOR_VERSION = 1
+WORMHOLE_MERKLE_UPDATE = 0
+PRICE_FEED_MESSAGE = 0
+
+MERKLE_LEAF_PREFIX = b"\x00"
+MERKLE_NODE_PREFIX = b"\x01"
+HASH_SIZE = 20  # bytes of a keccak160 digest
+VAA_SIGNATURE_SIZE = 66  # guardian index and a 65 bytes signature
+
+
+class AccumulatorError(ValueError):
+    """An accumulator update could not be decoded or verified."""
+
+
+class _Reader:
+    """Read the big-endian fields of an encoded update in order."""
+
+    def __init__(self, data: bytes) -> None:
+        """Initialize the reader."""
+        self._data = data
+        self._offset = 0
+
+    def read(self, size: int) -> bytes:
+        """Read the next `size` bytes."""
+        if self._offset + size > len(self._data):
+            raise AccumulatorError("Accumulator update is truncated")
+        chunk = self._data[self._offset : self._offset + size]
+        self._offset += size
+        return chunk
+
+    def uint(self, size: int) -> int:
+        """Read an unsigned integer of `size` bytes."""
+        return int.from_bytes(self.read(size), "big")
+
+    def sint(self, size: int) -> int:
+        """Read a signed integer of `size` bytes."""
+        return int.from_bytes(self.read(size), "big", signed=True)
+
+    @property
+    def offset(self) -> int:
+        """Get the number of bytes read so far."""
+        return self._offset
+
+    def rest(self) -> bytes:
+        """Read the remaining bytes."""
+        return self.read(len(self._data) - self._offset)
+
+
+def keccak160(data: bytes) -> bytes:
+    """Hash data the way the Pyth merkle tree does, keeping the first 20 bytes of keccak256."""
+    return keccak(data)[:HASH_SIZE]
+
+
+def verify_proof(root: bytes, message: bytes, proof: list[bytes]) -> bool:
+    """Check a message is a leaf of the merkle tree with the given root."""
+    node = keccak160(MERKLE_LEAF_PREFIX + message)
+    for sibling in proof:
+        node = keccak160(MERKLE_NODE_PREFIX + min(node, sibling) + max(node, sibling))
+    return node == root
+
+
+def parse_price_feed_message(message: bytes) -> dict[str, Any] | None:
+    """Decode a price feed message, or get None for the other message types, e.g. TWAP."""
+    reader = _Reader(message)
+    if reader.uint(1) != PRICE_FEED_MESSAGE:
+        return None
+    return {
+        "id": "0x" + reader.read(32).hex(),
+        "price": reader.sint(8),
+        "conf": reader.uint(8),
+        "expo": reader.sint(4),
+        "publish_time": reader.sint(8),
+        "prev_publish_time": reader.sint(8),
+        "ema_price": reader.sint(8),
+        "ema_conf": reader.uint(8),
+    }
+
+
+def _parse_merkle_root(vaa: bytes) -> tuple[int, bytes]:
+    """Get the slot and merkle root signed in a Wormhole VAA."""
+    reader = _Reader(vaa)
+    reader.read(1 + 4)  # version and guardian set index
+    reader.read(reader.uint(1) * VAA_SIGNATURE_SIZE)
+    reader.read(4 + 4 + 2 + 32 + 8 + 1)  # timestamp, nonce, emitter chain and address, sequence, consistency
+    payload = _Reader(reader.rest())
+    if payload.read(4) != WORMHOLE_MERKLE_MAGIC or payload.uint(1) != WORMHOLE_MERKLE_UPDATE:
+        raise AccumulatorError("VAA does not sign a Wormhole merkle root")
+    slot = payload.uint(8)
+    payload.read(4)  # ring size
+    return slot, payload.read(HASH_SIZE)
+
+
+def _split_accumulator_update(update_data: str | bytes) -> tuple[bytes, bytes, list[tuple[bytes, list[bytes]]]]:
+    """Split an accumulator update into its header up to the VAA, the VAA and its messages with their proofs."""
+    if isinstance(update_data, str):
+        update_data = bytes.fromhex(update_data.removeprefix("0x"))
+    reader = _Reader(update_data)
+    if reader.read(4) != ACCUMULATOR_MAGIC:
+        raise AccumulatorError("Not an accumulator update")
+    if reader.uint(1) != MAJOR_VERSION:
+        raise AccumulatorError("Unsupported accumulator update version")
+    reader.read(1)  # minor version
+    reader.read(reader.uint(1))  # trailing header
+    if reader.uint(1) != WORMHOLE_MERKLE_UPDATE:
+        raise AccumulatorError("Unsupported accumulator update type")
+
+    vaa = reader.read(reader.uint(2))
+    header = update_data[: reader.offset]
+    messages = []
+    for _ in range(reader.uint(1)):
+        message = reader.read(reader.uint(2))
+        messages.append((message, [reader.read(HASH_SIZE) for _ in range(reader.uint(1))]))
+    return header, vaa, messages
+
+
+def parse_accumulator_update(update_data: str | bytes, verify: bool = True) -> dict[str, Any]:
+    """Decode a hex-encoded or raw accumulator update, as returned by Hermes.
+
+    Every message is checked against the merkle root signed in the update's VAA unless
+    `verify` is False. The guardian signatures of the VAA itself are left to the Pyth
+    contract, so a decoded update is consistent but not proven authentic.
+    """
+    _, vaa, messages = _split_accumulator_update(update_data)
+    slot, root = _parse_merkle_root(vaa)
+    updates = []
+    for message, proof in messages:
+        if verify and not verify_proof(root, message, proof):
+            raise AccumulatorError("Invalid merkle proof of an accumulator message")
+        updates.append({"message": message, "price_feed": parse_price_feed_message(message)})
+    return {"slot": slot, "root": root, "updates": updates}
+
+
+def select_updates(update_data: list[str], feed_ids: Iterable[str]) -> list[str]:
+    """Re-encode some hex accumulator updates keeping only the price feed messages of the given feeds.
+
+    Every message carries its own merkle proof against the root signed in the VAA, so the
+    selected messages still make a valid update, and only their Pyth fee is paid. Updates
+    left without any message are dropped.
+    """
+    selected_ids = {feed_id.lower() for feed_id in feed_ids}
+    selected = []
+    for data in update_data:
+        header, _, messages = _split_accumulator_update(data)
+        kept = []
+        for message, proof in messages:
+            feed = parse_price_feed_message(message)
+            if feed is None or feed["id"] not in selected_ids:
+                continue
+            kept.append(
+                len(message).to_bytes(2, "big") + message + len(proof).to_bytes(1, "big") + b"".join(proof)
+            )
+        if kept:
+            selected.append((header + len(kept).to_bytes(1, "big") + b"".join(kept)).hex())
+    return selected
+
+
+def count_updates(update_data: list[str]) -> int:
+    """Get the number of messages in some accumulator updates, which their Pyth fee is paid for."""
+    return sum(len(parse_accumulator_update(data, verify=False)["updates"]) for data in update_data)
+
+
+def parse_update_prices(update_data: list[str], verify: bool = True) -> dict[str, dict[str, int]]:
+    """Extract the price, exponent and publish time of every feed in some accumulator updates.
+
+    The result has the shape of `parse_hermes_prices`, keeping the latest price of a feed
+    updated more than once.
+    """
+    prices: dict[str, dict[str, int]] = {}
+    for data in update_data:
+        for update in parse_accumulator_update(data, verify=verify)["updates"]:
+            feed = update["price_feed"]
+            if feed is None:
+                continue
+            if feed["id"] in prices and prices[feed["id"]]["publish_time"] >= feed["publish_time"]:
+                continue
+            prices[feed["id"]] = {
+                "price": feed["price"],
+                "expo": feed["expo"],
+                "publish_time": feed["publish_time"],
+            }
+    return prices
@@ -20,15 +20,14 @@
 """This package contains a behaviour that autogenerated from the protocol ``."""
 
 import os
+import json
 import time
 from abc import ABC
 from enum import Enum
-import requests
-from typing import Any, cast
-from pathlib import Path
-from aea.skills.behaviours import State, FSMBehaviour
-from aea.contracts.base import Contract, contract_registry
-from aea.configurations.loader import ComponentType, load_component_configuration
+from functools import partial
+from typing import Any, Generator, cast
+from aea.skills.behaviours import State, FSMBehaviour, TickerBehaviour
+from aea.contracts.base import Contract
 from aea_ledger_ethereum import (
     HexBytes,
     JSONLike,
@@ -37,29 +36,30 @@ from aea_ledger_ethereum import (
     EthereumCrypto,
     try_decorator,
 )
-from packages.dakavon.contracts.pyth import PUBLIC_ID as PYTH_PUBLIC_ID
-from packages.dakavon.contracts.pythoraentropy import (
-    PUBLIC_ID as PYTHORA_ENTROPY_PUBLIC_ID,
+from packages.eightballer.protocols.http.message import HttpMessage
+from packages.eightballer.connections.http_client.connection import PUBLIC_ID as HTTP_CLIENT_PUBLIC_ID
+from packages.dakavon.skills.pythora_abci_app.nonce import PendingTransaction
+from packages.dakavon.skills.pythora_abci_app.dialogues import HttpDialogues
+from packages.dakavon.skills.pythora_abci_app.accumulator import (
+    count_updates,
+    select_updates,
+    parse_update_prices,
 )
-from eth_utils import to_bytes
+from packages.dakavon.skills.pythora_abci_app.indexer import (
+    PRICE_FEED_UPDATE,
+    RANDOM_NUMBER_REQUESTED,
+    PYTHORA_ENTROPY_CALLBACK,
+)
+from packages.dakavon.skills.pythora_abci_app.strategy import PythoraStrategy
 from secrets import token_bytes
+from web3.logs import DISCARD
+from web3.exceptions import TimeExhausted, TransactionNotFound
 
-GAS = 500_000
-GAS_PREMIUM = 1.1  # 10% gas premium
+GAS = 500_000  # used when gas estimation fails
+GAS_PER_EXTRA_FEED = 50_000  # additional gas for every feed beyond the first one
 TX_TIMEOUT = 60  # seconds
-PYTH_USD_PRICEFEED_ID = (
-    "0x0bbf28e9a841a1cc788f6a361b17ca072d0ea3098a1e5df1c3922d06719579ff"
-)
-
-
-def load_contract(contract_path: Path) -> Contract:
-    """Helper function to load a contract."""
-    configuration = load_component_configuration(ComponentType.CONTRACT, contract_path)
-    configuration._directory = contract_path  # noqa
-    if str(configuration.public_id) not in contract_registry.specs:
-        # load contract into sys modules
-        Contract.from_config(configuration)
-    return contract_registry.make(str(configuration.public_id))
+RECEIPT_POLL_INTERVAL = 1  # seconds
+HERMES_TIMEOUT = 10  # seconds
 
 
 class PythoraabciappEvents(Enum):
@@ -150,9 +150,6 @@ class SignedTransactionTranslator:
         )
 
 
-ROOT = Path(__file__).parent.parent.parent.parent
-
-
 class BaseState(State, ABC):
     """Base class for states."""
 
@@ -162,26 +159,207 @@ class BaseState(State, ABC):
         super().__init__(**kwargs)
         self._event = None
         self._is_done = False  # Initially, the state is not done
-        author = PYTH_PUBLIC_ID.author
-        name = PYTH_PUBLIC_ID.name
-        contract = load_contract(ROOT / author / "contracts" / name)
-        self.pyth_contract = contract
-        self.pyth_address = "0xDd24F84d36BF92C65F92307595335bdFab5Bbd21"
-
-        pythoraEntropyAuthor = PYTHORA_ENTROPY_PUBLIC_ID.author
-        pythoraEntropyName = PYTHORA_ENTROPY_PUBLIC_ID.name
-        pythoraEntropyContract = load_contract(
-            ROOT / pythoraEntropyAuthor / "contracts" / pythoraEntropyName
-        )
-        self.pythora_entropy_contract = pythoraEntropyContract
-        self.pythora_entropy_contract_address = (
-            "0xb2Fa94AEe40Ad375D1bb65F5442f36DBFc0bD35a"
-        )
+        self._steps: Generator[None, None, None] | None = None
 
     def act(self) -> None:
-        """Perform the act."""
-        self._is_done = True
+        """Perform the act.
+
+        Advances `async_act` by one step, so that waiting states yield back to the
+        agent loop instead of blocking it. The state is done once `async_act` returns.
+        """
+        if self._steps is None:
+            self._is_done = False
+            self._steps = self.async_act()
+        try:
+            next(self._steps)
+        except StopIteration:
+            self._steps = None
+            self._is_done = True
+        except Exception:
+            self._steps = None
+            raise
+
+    def async_act(self) -> Generator[None, None, None]:
+        """Perform the act, yielding whenever the state has to wait."""
         self._event = PythoraabciappEvents.DONE
+        yield
+
+    def gather(self, steps: dict[str, Generator[None, None, Any]]) -> Generator[None, None, dict[str, Any]]:
+        """Run several generators side by side, e.g. one per chain, and get their results.
+
+        Every generator advances by one step per act, so waiting on one of them never
+        holds the others back and the whole takes as long as the slowest.
+        """
+        results = {}
+        pending = dict(steps)
+        while pending:
+            for name, step in list(pending.items()):
+                try:
+                    next(step)
+                except StopIteration as stop:
+                    results[name] = stop.value
+                    del pending[name]
+            if pending:
+                yield
+        return results
+
+    def sleep(self, seconds: float) -> Generator[None, None, None]:
+        """Wait for the given number of seconds without blocking the agent loop."""
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            yield
+
+    def http_get(
+        self, url: str, timeout: float = HERMES_TIMEOUT
+    ) -> Generator[None, None, HttpMessage | None]:
+        """Send a GET request through the http client connection and wait for the response.
+
+        The connection keeps a pooled session open, so repeated requests to the same
+        host reuse its connections. Returns None if no response arrived in time.
+        """
+        http_dialogues = cast(HttpDialogues, self.context.http_dialogues)
+        request, dialogue = http_dialogues.create(
+            counterparty=str(HTTP_CLIENT_PUBLIC_ID),
+            performative=HttpMessage.Performative.REQUEST,
+            method="GET",
+            url=url,
+            headers=HttpMessage.Headers(),
+            version="",
+            body=b"",
+        )
+        nonce = dialogue.dialogue_label.dialogue_reference[0]
+        pending_http_requests = self.strategy.pending_http_requests
+        pending_http_requests[nonce] = None
+        self.context.outbox.put_message(message=request)
+
+        deadline = time.time() + timeout
+        try:
+            while pending_http_requests[nonce] is None:
+                if time.time() >= deadline:
+                    return None
+                yield
+            return pending_http_requests[nonce]
+        finally:
+            pending_http_requests.pop(nonce, None)
+
+    def fetch_hermes_update(self, feed_ids: list[str]) -> Generator[None, None, dict[str, Any]]:
+        """Fetch the latest update of the given feeds from Hermes, decoded locally rather than by Hermes."""
+        response = yield from self.http_get(self.strategy.hermes_latest_url(feed_ids))
+        if response is None:
+            raise ValueError(f"No response from Hermes within {HERMES_TIMEOUT} seconds")
+        if response.status_code != 200:
+            raise ValueError(
+                f"Hermes responded with {response.status_code} {response.status_text}"
+            )
+        return json.loads(response.body)
+
+    def submit_transaction(
+        self,
+        ledger_api: EthereumApi,
+        chain_id: int,
+        func,
+        value: int = 0,
+        shape: Any = None,
+        default_gas: int = GAS,
+    ) -> PendingTransaction | None:
+        """Build, sign and send a transaction without waiting for it to be mined.
+
+        The gas limit is estimated once per `shape` of the calldata, e.g. the number of
+        price feeds updated, and falls back to `default_gas` if the estimation fails.
+        The transactions abandoned on the chain are polled first, so stuck ones are
+        bumped instead of holding back the new one.
+        """
+        self.poll_abandoned_transactions(ledger_api, chain_id)
+        gas_oracle = self.strategy.gas_oracle
+        nonce_manager = self.strategy.nonce_manager
+        address = self.crypto.address
+        gas = gas_oracle.estimate_gas(
+            chain_id,
+            (func.fn_name, shape),
+            lambda: func.estimate_gas({"from": address, "value": value}),
+            default=default_gas,
+        )
+        fees = gas_oracle.fees(chain_id, ledger_api)
+        nonce = nonce_manager.next_nonce(chain_id, ledger_api, address)
+        transaction = func.build_transaction(
+            {
+                "from": address,
+                "chainId": chain_id,
+                "nonce": nonce,
+                "gas": gas,
+                "value": value,
+                **fees,
+            }
+        )
+        tx_hash = self.sign_and_send(ledger_api, transaction)
+        if tx_hash is None:
+            nonce_manager.release(chain_id, nonce)
+            return None
+        self.context.logger.info(f"### Transaction hash: {tx_hash}")
+        return nonce_manager.track(chain_id, transaction, tx_hash)
+
+    def sign_and_send(self, ledger_api: EthereumApi, transaction: dict) -> str | None:
+        """Sign and send a transaction."""
+        signed_tx = self.crypto.entity.sign_transaction(transaction)
+        return try_send_signed_transaction(ledger_api, signed_tx_to_dict(signed_tx))
+
+    def replace_transaction(
+        self, ledger_api: EthereumApi, pending_tx: PendingTransaction
+    ) -> None:
+        """Replace a stuck transaction by the same one with higher fees."""
+        transaction = self.strategy.nonce_manager.replacement(pending_tx)
+        tx_hash = self.sign_and_send(ledger_api, transaction)
+        if tx_hash is None:
+            pending_tx.sent_at = time.time()  # try again once it looks stuck again
+            return
+        self.context.logger.warning(
+            f"### Transaction with nonce {pending_tx.nonce} is stuck, replaced by: {tx_hash}"
+        )
+        pending_tx.replace(transaction, tx_hash)
+
+    def poll_transaction(
+        self, ledger_api: EthereumApi, chain_id: int, pending_tx: PendingTransaction
+    ) -> Any | None:
+        """Check once for the receipt of a transaction in flight."""
+        for tx_hash in reversed(pending_tx.tx_hashes):
+            try:
+                receipt = ledger_api.api.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+            self.strategy.nonce_manager.confirm(chain_id, pending_tx.nonce)
+            return receipt
+        if self.strategy.nonce_manager.is_stuck(pending_tx):
+            self.replace_transaction(ledger_api, pending_tx)
+        return None
+
+    def poll_abandoned_transactions(self, ledger_api: EthereumApi, chain_id: int) -> None:
+        """Check once for the receipts of the transactions nobody waits for anymore."""
+        for pending_tx in self.strategy.nonce_manager.abandoned(chain_id):
+            self.poll_transaction(ledger_api, chain_id, pending_tx)
+
+    def wait_for_transaction(
+        self,
+        ledger_api: EthereumApi,
+        chain_id: int,
+        pending_tx: PendingTransaction,
+        timeout: float = TX_TIMEOUT,
+    ) -> Generator[None, None, Any]:
+        """Poll for the receipt of a transaction without blocking the agent loop.
+
+        A transaction not mined in time is abandoned rather than forgotten, so it keeps
+        being polled and bumped by the transactions sent after it.
+        """
+        deadline = time.time() + timeout
+        while True:
+            receipt = self.poll_transaction(ledger_api, chain_id, pending_tx)
+            if receipt is not None:
+                return receipt
+            if time.time() >= deadline:
+                self.strategy.nonce_manager.abandon(chain_id, pending_tx.nonce)
+                raise TimeExhausted(
+                    f"Transaction with nonce {pending_tx.nonce} is not in the chain after {timeout} seconds"
+                )
+            yield from self.sleep(RECEIPT_POLL_INTERVAL)
 
     def is_done(self) -> bool:
         """Is done."""
@@ -193,57 +371,49 @@ class BaseState(State, ABC):
         return self._event
 
     @property
-    def sepolia_ledger_api(self) -> EthereumApi:
-        """Get the Ethereum Sepolia ledger api."""
-        return EthereumApi(address="https://sepolia.drpc.org", chain_id=str(11155111))
+    def strategy(self) -> PythoraStrategy:
+        """Get the strategy."""
+        return cast(PythoraStrategy, self.context.strategy)
 
     @property
-    def arbitrum_sepolia_ledger_api(self) -> EthereumApi:
-        """Get the Arbitrum Sepolia ledger api."""
-        return EthereumApi(
-            address="https://sepolia-rollup.arbitrum.io/rpc", chain_id=str(421614)
-        )
+    def pyth_contract(self) -> Contract:
+        """Get the Pyth contract."""
+        return self.strategy.pyth_contract
 
     @property
-    def crypto(self) -> EthereumCrypto:
-        """Get EthereumCrypto."""
-        return EthereumCrypto(private_key_path="ethereum_private_key.txt")
+    def pythora_entropy_contract(self) -> Contract:
+        """Get the Pythora Entropy contract."""
+        return self.strategy.pythora_entropy_contract
 
-    def build_transaction(self, func, value: int = 0):
-        """Build the transaction."""
+    @property
+    def multicall_contract(self) -> Contract:
+        """Get the Multicall3 contract."""
+        return self.strategy.multicall_contract
 
-        nonce = self.sepolia_ledger_api.api.eth.get_transaction_count(
-            self.crypto.address
-        )
-        return func.build_transaction(
-            {
-                "from": self.crypto.address,
-                "nonce": nonce,
-                "gas": GAS,
-                "gasPrice": int(
-                    self.sepolia_ledger_api.api.eth.gas_price * GAS_PREMIUM
-                ),
-                "value": value,
-            }
-        )
+    @property
+    def entropy_ledger_api(self) -> EthereumApi:
+        """Get the ledger api of the chain randomness is requested on."""
+        return self.strategy.ledger_api(self.strategy.entropy_chain)
 
-    def build_transaction_arbitrum_sepolia(self, func, value: int = 0):
-        """Build the transaction for Arbitrum Sepolia."""
+    @property
+    def entropy_chain_id(self) -> int:
+        """Get the id of the chain randomness is requested on."""
+        return self.strategy.entropy_chain["chain_id"]
 
-        nonce = self.arbitrum_sepolia_ledger_api.api.eth.get_transaction_count(
-            self.crypto.address
-        )
-        return func.build_transaction(
-            {
-                "from": self.crypto.address,
-                "nonce": nonce,
-                "gas": GAS,
-                "gasPrice": int(
-                    self.arbitrum_sepolia_ledger_api.api.eth.gas_price * GAS_PREMIUM
-                ),
-                "value": value,
-            }
-        )
+    @property
+    def pythora_entropy_contract_address(self) -> str:
+        """Get the address of the Pythora Entropy contract."""
+        return self.strategy.entropy_chain["pythora_entropy_address"]
+
+    @property
+    def entropy_address(self) -> str:
+        """Get the address of the Pyth Entropy contract the Pythora Entropy contract requests from."""
+        return self.strategy.entropy_chain["entropy_address"]
+
+    @property
+    def crypto(self) -> EthereumCrypto:
+        """Get EthereumCrypto."""
+        return self.strategy.ledger_apis.crypto
 
 
 class FetchPriceDataRound(BaseState):
@@ -253,37 +423,59 @@ class FetchPriceDataRound(BaseState):
         super().__init__(**kwargs)
         self._state = PythoraabciappStates.FETCHPRICEDATAROUND
 
-    def act(self) -> None:
+    def async_act(self) -> Generator[None, None, None]:
         """Perform the act."""
 
-        priceFeed_pythUsd = "0x0bbf28e9a841a1cc788f6a361b17ca072d0ea3098a1e5df1c3922d06719579ff"  # PYTH/USD price feed ID
-        requestUrl = f"https://hermes.pyth.network/v2/updates/price/latest?ids%5B%5D={priceFeed_pythUsd}&encoding=hex&parsed=false"
+        # Only fetch the feeds the schedulers found due on every chain, all of them otherwise
+        feeds_to_push = self.context.shared_state.pop("feeds_to_push", None) or {
+            chain["name"]: self.strategy.chain_feed_ids(chain) for chain in self.strategy.push_chains
+        }
 
+        # Chains pushing the same feeds share one update
+        feed_sets = {",".join(feed_ids): feed_ids for feed_ids in feeds_to_push.values()}
         try:
-            res = requests.get(requestUrl, timeout=10)
-            res_json = res.json()
+            updates = yield from self.gather(
+                {key: self.fetch_update(feed_ids) for key, feed_ids in feed_sets.items()}
+            )
+        except (KeyError, ValueError) as err:
+            self.context.logger.error("Error fetching price data: %s", err)
+            self._event = PythoraabciappEvents.TIMEOUT
+            return
+
+        # Store in shared state for next step (e.g., to call updatePriceFeeds on-chain)
+        self.context.shared_state["chain_updates"] = {
+            chain_name: updates[",".join(feed_ids)] for chain_name, feed_ids in feeds_to_push.items()
+        }
+        self._event = PythoraabciappEvents.DONE
+
+    def fetch_update(self, feed_ids: list[str]) -> Generator[None, None, dict[str, Any]]:
+        """Get the update data and prices of the given feeds.
+
+        The update cached from the Hermes price stream is used when it is fresh.
+        """
+        latest_update = self.strategy.latest_update(feed_ids)
+        if latest_update is not None:
+            update_data, prices = latest_update
+        else:
+            res_json = yield from self.fetch_hermes_update(feed_ids)
 
             # Validate that the expected structure is present
             binary = res_json.get("binary", {})
-            data_list = binary.get("data", [])
+            update_data = binary.get("data", [])
 
-            if not data_list or not isinstance(data_list, list) or not data_list[0]:
+            if not update_data or not isinstance(update_data, list) or not all(update_data):
                 raise ValueError(
                     "Missing or invalid price update data from Pyth response"
                 )
 
-            hex_data = data_list[0]
+            # Hermes returns one combined update covering every requested feed
+            prices = parse_update_prices(update_data)
 
-            # Store in shared state for next step (e.g., to call updatePriceFeeds on-chain)
-            self.context.shared_state["price_update_data"] = hex_data
-            # print(f"### FetchPriceDataRound: Fetched price update data: {hex_data}")
-
-            self._event = PythoraabciappEvents.DONE
-        except (KeyError, ValueError) as err:
-            self.context.logger.error("Error fetching price data: %s", err)
-            self._event = PythoraabciappEvents.TIMEOUT
-        finally:
-            self._is_done = True
+        return {
+            "price_update_data": update_data,
+            "price_feed_ids": feed_ids,
+            "price_updates": prices,
+        }
 
 
 class ConsumePriceAndPrintMessageRound(BaseState):
@@ -305,115 +497,256 @@ class ConsumePriceAndPrintMessageRound(BaseState):
             )
             raise ValueError("No transaction receipt status found in shared state.")
         elif tx_receipt_status == 1:
-            # Read price fron Pyth contract
-            pythUsdPrice = self.pyth_contract.get_price_no_older_than(
-                ledger_api=self.sepolia_ledger_api,
-                contract_address=self.pyth_address,
-                id=PYTH_USD_PRICEFEED_ID,
-                age=60,  # 60 seconds
-            )
-            pythUsdPrice = pythUsdPrice.get("price")
-            raw_price, _, exponent, _ = pythUsdPrice
+            chain_updates = self.context.shared_state.get("chain_updates", {})
+            push_results = self.context.shared_state.get("push_results", {})
+            for chain in self.strategy.push_chains:
+                result = push_results.get(chain["name"])
+                if result is None or result["tx_receipt_status"] != 1:
+                    continue
+                self.print_prices(
+                    chain,
+                    chain_updates[chain["name"]]["price_feed_ids"],
+                    result["pushed_prices"],
+                )
+
+        self._is_done = True
+        self._event = PythoraabciappEvents.DONE
+
+    def print_prices(
+        self, chain: dict[str, Any], feed_ids: list[str], pushed_prices: dict[str, dict[str, int]]
+    ) -> None:
+        """Print the prices of the feeds pushed to a chain.
+
+        The prices decoded from the push receipt are used, the others are read from the
+        Pyth contract in one call.
+        """
+        prices = dict(pushed_prices)
+        missing_feed_ids = [feed_id for feed_id in feed_ids if feed_id not in prices]
+        if missing_feed_ids:
+            results = self.multicall_contract.batch_read(
+                ledger_api=self.strategy.ledger_api(chain),
+                calls=[
+                    (self.pyth_contract, chain["pyth_address"], "getPriceNoOlderThan", (feed_id, 60))  # 60 seconds
+                    for feed_id in missing_feed_ids
+                ],
+            )["results"]
+            if len(results) != len(missing_feed_ids):
+                self.context.logger.warning(
+                    "Expected %s prices from Pyth contract on %s, got %s",
+                    len(missing_feed_ids),
+                    chain["name"],
+                    len(results),
+                )
+                results = [None] * len(missing_feed_ids)
+            for feed_id, price in zip(missing_feed_ids, results, strict=True):
+                if price is None:
+                    self.context.logger.warning(
+                        "No recent price in Pyth contract on %s for %s",
+                        chain["name"],
+                        self.strategy.symbol(feed_id),
+                    )
+                    continue
+                raw_price, _, exponent, _ = price
+                prices[feed_id] = {"price": raw_price, "expo": exponent}
+
+        for feed_id in feed_ids:
+            if feed_id not in prices:
+                continue
 
             # Calculate the actual price by shifting decimals
-            formatted_price = raw_price * (10**exponent)
+            formatted_price = prices[feed_id]["price"] * (10 ** prices[feed_id]["expo"])
 
             self.context.logger.info(
-                "Price consumed from Pyth contract | $PYTH: $%.8f", formatted_price
+                "Price consumed from Pyth contract on %s | %s: $%.8f",
+                chain["name"],
+                self.strategy.symbol(feed_id),
+                formatted_price,
             )
 
-        self._is_done = True
-        self._event = PythoraabciappEvents.DONE
-
 
 class RegistrationRound(BaseState):
-    """This class implements the behaviour of the state RegistrationRound."""
+    """This class implements the behaviour of the state RegistrationRound.
+
+    Random numbers are requested ahead of time into the randomness pool of the
+    strategy, so the round only takes a ready one and never waits on an entropy
+    request. The pool is refilled without waiting, once it runs low.
+    """
 
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self._state = PythoraabciappStates.REGISTRATIONROUND
+        self._pending_requests: list[dict[str, Any]] = []
 
-    def act(self) -> None:
+    def async_act(self) -> Generator[None, None, None]:
         """Perform the act."""
 
-        # Create entropy and consume random number
+        # Collect the random numbers that landed, consume one and refill the pool
+        self.collect_random_numbers()
+        self.consume_random_number()
+        unmined = sum(len(request["user_random_numbers"]) for request in self._pending_requests)
+        shortfall = self.strategy.randomness_pool.shortfall(unmined)
+        if shortfall and self.strategy.batch_entropy_requests:
+            self.request_random_numbers(shortfall)
+        else:
+            for _ in range(shortfall):
+                if not self.request_random_numbers(1):
+                    break
+
+        self._event = PythoraabciappEvents.DONE
+        yield
+
+    def request_random_numbers(self, count: int) -> bool:
+        """Request random numbers from the Pythora Entropy contract, in a single transaction."""
 
-        # 1. Generate userRandomNumber - a 32-byte random seed
-        user_random_number = token_bytes(32)  # bytes object
-        user_random_number_hex = "0x" + user_random_number.hex()
+        # 1. Generate a userRandomNumber - a 32-byte random seed - per random number
+        user_random_numbers = [token_bytes(32) for _ in range(count)]
 
-        # print(f"Requesting random number with user seed: {user_random_number.hex()}")
         self.context.logger.info(
-            "### Requesting random number with user seed: %s", user_random_number.hex()
+            "### Requesting random numbers with user seeds: %s",
+            ", ".join(user_random_number.hex() for user_random_number in user_random_numbers),
         )
 
-        # 2. Request a random number from the Pythora Entropy contract
-        w3_function = self.pythora_entropy_contract.request_random_number(
-            ledger_api=self.arbitrum_sepolia_ledger_api,
-            contract_address=self.pythora_entropy_contract_address,
-            user_random_number=to_bytes(hexstr=user_random_number.hex()),
-        )
-        fee_amount = 372357000000001  # got value over etherscan
-        raw_tx = self.build_transaction_arbitrum_sepolia(w3_function, value=fee_amount)
-        signed_tx = self.crypto.entity.sign_transaction(raw_tx)
-        signed_tx_dict = signed_tx_to_dict(signed_tx)
-
-        # 3. Send the signed transaction to the Arbitrum Sepolia network
-        tx_hash = try_send_signed_transaction(
-            self.arbitrum_sepolia_ledger_api, signed_tx_dict
-        )
-        self.context.logger.info(f"### Transaction hash: {tx_hash}")
-
-        # 4. Wait for the transaction receipt
-        tx_receipt = (
-            self.arbitrum_sepolia_ledger_api.api.eth.wait_for_transaction_receipt(
-                tx_hash, timeout=TX_TIMEOUT
+        # 2. Request the random numbers from the Pythora Entropy contract
+        if count == 1:
+            w3_function = self.pythora_entropy_contract.request_random_number(
+                ledger_api=self.entropy_ledger_api,
+                contract_address=self.pythora_entropy_contract_address,
+                user_random_number=user_random_numbers[0],
             )
-        )
-        print(f"Transaction receipt: {tx_receipt}")
-
-        if tx_receipt.status == 1:
-            self.context.logger.info(
-                "### Transaction successful! Random number requested from Pythora Entropy contract."
+        else:
+            w3_function = self.pythora_entropy_contract.request_random_numbers(
+                ledger_api=self.entropy_ledger_api,
+                contract_address=self.pythora_entropy_contract_address,
+                user_random_numbers=user_random_numbers,
             )
-            sequence_number = (
-                self.pythora_entropy_contract.sequence_numbers_by_user_random_number(
-                    ledger_api=self.arbitrum_sepolia_ledger_api,
-                    contract_address=self.pythora_entropy_contract_address,
-                    var_0=user_random_number_hex,
-                )
+        try:
+            fee_amount = self.strategy.entropy_fee_cache.get(
+                lambda: self.pythora_entropy_contract.get_fee(
+                    ledger_api=self.entropy_ledger_api,
+                    contract_address=self.entropy_address,
+                )["fee"],
+                block_number=self.entropy_ledger_api.api.eth.block_number,
             )
-            self.context.logger.info(
-                "### Sequence number for user random number %s: %s",
-                user_random_number_hex,
-                sequence_number,
+
+            # 3. Send the transaction to the entropy chain without waiting for it
+            pending_tx = self.submit_transaction(
+                self.entropy_ledger_api,
+                self.entropy_chain_id,
+                w3_function,
+                value=fee_amount * count,
+                shape=count,
             )
-        else:
+        except Exception as err:  # pylint: disable=broad-except
+            self.context.logger.warning("### Error requesting random numbers, retrying next cycle: %s", err)
+            return False
+        if pending_tx is None:
             self.context.logger.error(
                 "### Transaction failed! Random number not requested from Pythora Entropy contract."
             )
-            raise ValueError("Transaction failed.")
+            self.strategy.entropy_fee_cache.invalidate()
+            return False
 
-        time.sleep(15)  # Wait for the random number to be generated
-
-        # 5. Fetch the random number from the Pythora Entropy contract and print it
-        random_number = self.pythora_entropy_contract.random_numbers_by_sequence_number(
-            ledger_api=self.arbitrum_sepolia_ledger_api,
-            contract_address=self.pythora_entropy_contract_address,
-            var_0=sequence_number["int"],
+        self._pending_requests.append(
+            {
+                "user_random_numbers": [
+                    "0x" + user_random_number.hex() for user_random_number in user_random_numbers
+                ],
+                "pending_tx": pending_tx,
+            }
         )
+        return True
+
+    def collect_random_numbers(self) -> None:
+        """Add the random numbers whose entropy callback has landed to the pool."""
+        pool = self.strategy.randomness_pool
+
+        # 4. Check for the transaction receipts of the requests
+        for request in list(self._pending_requests):
+            try:
+                tx_receipt = self.poll_transaction(
+                    self.entropy_ledger_api,
+                    self.entropy_chain_id,
+                    request["pending_tx"],
+                )
+                if tx_receipt is None:
+                    continue
+                sequence_numbers = []
+                if tx_receipt.status == 1:
+                    sequence_numbers = self.get_sequence_numbers(tx_receipt, request["user_random_numbers"])
+            except Exception as err:  # pylint: disable=broad-except
+                # the request stays pending and is checked again next cycle
+                self.context.logger.warning("### Error checking an entropy request: %s", err)
+                continue
+            self._pending_requests.remove(request)
+            if tx_receipt.status != 1:
+                self.context.logger.error(
+                    "### Transaction failed! Random number not requested from Pythora Entropy contract."
+                )
+                # the fee of the provider may have changed
+                self.strategy.entropy_fee_cache.invalidate()
+                continue
 
-        raw_random_bytes = random_number["str"]
-        random_number_hex = "0x" + raw_random_bytes.hex()
+            self.context.logger.info(
+                "### Random numbers requested from Pythora Entropy contract, sequence numbers: %s",
+                sequence_numbers,
+            )
+            for sequence_number in sequence_numbers:
+                pool.watch(sequence_number, tx_receipt.blockNumber)
 
+        if not pool.watcher.watched:
+            return
+
+        # 5. Scan the new blocks for the entropy callbacks, from where the last scan stopped
+        ledger_api = self.entropy_ledger_api
+        try:
+            pool.poll(
+                ledger_api.api.eth.block_number,
+                lambda from_block, to_block: self.pythora_entropy_contract.get_pythora_entropy_callback_events(
+                    ledger_api=ledger_api,
+                    contract_address=self.pythora_entropy_contract_address,
+                    from_block=from_block,
+                    to_block=to_block,
+                )["events"],
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            self.context.logger.warning("### Error scanning for entropy callbacks: %s", err)
+
+    def consume_random_number(self) -> None:
+        """Take a random number from the pool and print it."""
+        pool = self.strategy.randomness_pool
+        entry = pool.take()
+        if entry is None:
+            self.context.logger.info("### Randomness pool is empty, entropy callbacks have not landed yet.")
+            return
+
+        sequence_number, raw_random_bytes = entry
         self.context.logger.info(
-            "### Random number consumed from Pythora Entropy contract (hex): %s", random_number_hex
+            "### Random number consumed from Pythora Entropy contract (hex): %s (sequence number %s, %s left)",
+            "0x" + raw_random_bytes.hex(),
+            sequence_number,
+            len(pool),
         )
 
-        # breakpoint()
+    def get_sequence_numbers(self, tx_receipt: Any, user_random_numbers: list[str]) -> list[int]:
+        """Get the sequence numbers of the requests from their RandomNumberRequested events."""
+        instance = self.pythora_entropy_contract.get_instance(
+            self.entropy_ledger_api, self.pythora_entropy_contract_address
+        )
+        events = instance.events.RandomNumberRequested().process_receipt(
+            tx_receipt, errors=DISCARD
+        )
+        if events:
+            return [event["args"]["sequenceNumber"] for event in events]
 
-        self._is_done = True
-        self._event = PythoraabciappEvents.DONE
+        # fall back to reading the mapping of the contract
+        return [
+            self.pythora_entropy_contract.sequence_numbers_by_user_random_number(
+                ledger_api=self.entropy_ledger_api,
+                contract_address=self.pythora_entropy_contract_address,
+                var_0=user_random_number,
+            )["int"]
+            for user_random_number in user_random_numbers
+        ]
 
 
 class ResetAndPauseRound(BaseState):
@@ -423,14 +756,54 @@ class ResetAndPauseRound(BaseState):
         super().__init__(**kwargs)
         self._state = PythoraabciappStates.RESETANDPAUSEROUND
 
-    def act(self) -> None:
+    def async_act(self) -> Generator[None, None, None]:
         """Perform the act."""
 
-        self._is_done = True
+        # Wait until a feed crosses its deviation threshold or heartbeat on a chain
+        while True:
+            due_feeds = yield from self.get_due_feeds()
+            if due_feeds:
+                break
+            yield from self.sleep(self.strategy.poll_interval)
+
+        for chain_name, chain_due_feeds in due_feeds.items():
+            for feed_id, reason in chain_due_feeds.items():
+                self.context.logger.info(
+                    "### Price feed %s is due for a push on %s (%s)",
+                    self.strategy.symbol(feed_id),
+                    chain_name,
+                    reason,
+                )
+        self.context.shared_state["feeds_to_push"] = {
+            chain_name: list(chain_due_feeds) for chain_name, chain_due_feeds in due_feeds.items()
+        }
         self._event = PythoraabciappEvents.DONE
-        time.sleep(
-            30
-        )  # Pause for 30 seconds before next round (we do not want to spend so much gas for now)
+
+    def get_due_feeds(self) -> Generator[None, None, dict[str, dict[str, str]]]:
+        """Get the feeds due for a push by chain, from the price stream or by polling Hermes."""
+        feed_ids = self.strategy.price_feed_ids
+        latest_update = self.strategy.latest_update(feed_ids)
+        if latest_update is not None:
+            _, prices = latest_update
+        else:
+            try:
+                res_json = yield from self.fetch_hermes_update(feed_ids)
+                prices = parse_update_prices(res_json.get("binary", {}).get("data", []))
+            except (KeyError, ValueError) as err:
+                self.context.logger.warning("Error polling price data: %s", err)
+                return {}
+
+        now = time.time()
+        due_feeds = {}
+        for chain in self.strategy.push_chains:
+            self.strategy.refresh_on_chain_prices(chain)
+            chain_prices = {
+                feed_id: prices[feed_id] for feed_id in self.strategy.chain_feed_ids(chain) if feed_id in prices
+            }
+            chain_due_feeds = self.strategy.schedulers[chain["name"]].due_feeds(chain_prices, now)
+            if chain_due_feeds:
+                due_feeds[chain["name"]] = chain_due_feeds
+        return due_feeds
 
 
 class UpdatePriceDataRound(BaseState):
@@ -440,77 +813,152 @@ class UpdatePriceDataRound(BaseState):
         super().__init__(**kwargs)
         self._state = PythoraabciappStates.UPDATEPRICEDATAROUND
 
-    def act(self) -> None:
-        """Perform the act."""
-        print("### UpdatePriceDataRound: Updating price data on-chain...")
+    def async_act(self) -> Generator[None, None, None]:
+        """Perform the act.
+
+        The prices are pushed to every chain concurrently, so the round takes as long
+        as the slowest chain.
+        """
+        self.context.logger.info("### UpdatePriceDataRound: Updating price data on-chain...")
 
-        # Get the hex-encoded price update data from the previous round
-        price_update_data = self.context.shared_state.get("price_update_data")
-        # print(f"### UpdatePriceDataRound: Fetched price update data: {price_update_data}")
+        # Get the hex-encoded price update data of every chain from the previous round
+        chain_updates = self.context.shared_state.get("chain_updates")
 
-        if price_update_data is None:
+        if chain_updates is None:
             raise ValueError("No price update data found in shared state.")
-        else:
-            # Get the update fee for the price update data
-            update_fee = self.pyth_contract.get_update_fee(
-                ledger_api=self.sepolia_ledger_api,
-                contract_address=self.pyth_address,
-                update_data=["0x" + price_update_data],
-            )
-            update_fee = update_fee.get("feeAmount")
-            print(f"### UpdatePriceDataRound: Update fees: {update_fee} Wei")
 
+        started_at = time.time()
+        chains = {chain["name"]: chain for chain in self.strategy.push_chains}
+        push_results = yield from self.gather(
+            {
+                chain_name: self.push_prices(chains[chain_name], update)
+                for chain_name, update in chain_updates.items()
+            }
+        )
+        self.context.shared_state["push_results"] = push_results
+        self.context.shared_state["tx_receipt_status"] = int(
+            any(result["tx_receipt_status"] == 1 for result in push_results.values())
+        )
+        self.context.logger.info(
+            "### Price push to %s chains took %.2f seconds", len(push_results), time.time() - started_at
+        )
+        self._event = PythoraabciappEvents.DONE
+
+    def push_prices(self, chain: dict[str, Any], update: dict[str, Any]) -> Generator[None, None, dict[str, Any]]:
+        """Push a price update to a chain and get the result of the push."""
+        started_at = time.time()
+        ledger_api = self.strategy.ledger_api(chain)
+        chain_id = chain["chain_id"]
+        pyth_address = chain["pyth_address"]
+        update_fee_cache = self.strategy.update_fee_caches[chain["name"]]
+        scheduler = self.strategy.schedulers[chain["name"]]
+        price_update_data = update["price_update_data"]
+        result = {"tx_receipt_status": 0, "pushed_prices": {}}
+
+        # Drop the feeds whose price is not newer than the one already on-chain
+        fetched_updates = update["price_updates"]
+        price_updates = {
+            feed_id: price
+            for feed_id, price in fetched_updates.items()
+            if scheduler.is_fresh(feed_id, price["publish_time"])
+        }
+        if fetched_updates and not price_updates:
+            self.context.logger.info(
+                "### No price feed is newer than on-chain on %s, skipping the price push.", chain["name"]
+            )
+        else:
             try:
-                # Create a signed transaction to update the price feeds
-                w3_function = self.pythUpdatePriceFeeds(data=price_update_data)
-                raw_tx = self.build_transaction(w3_function, value=update_fee)
-                signed_tx = self.crypto.entity.sign_transaction(raw_tx)
-                signed_tx_dict = signed_tx_to_dict(signed_tx)
-
-                # print(f"### UpdatePriceDataRound: Signed transaction: {signed_tx_dict['raw_transaction']}")
-                # self.context.logger.info({signed_tx})
-                # print(dir(signed_tx))
-                # print(dir(signed_tx_dict))
-                # breakpoint()
-
-                # Execute the transaction to update price data
-                tx_hash = try_send_signed_transaction(
-                    self.sepolia_ledger_api, signed_tx_dict
+                # Only push, and pay for, the messages of the fresh feeds
+                if len(price_updates) < len(fetched_updates):
+                    price_update_data = select_updates(price_update_data, price_updates)
+
+                # Compute the update fee locally, from the cached Pyth fee of a single message
+                num_updates = max(count_updates(price_update_data), 1)
+                update_fee = num_updates * update_fee_cache.get(
+                    lambda: self.pyth_contract.get_update_fee(
+                        ledger_api=ledger_api,
+                        contract_address=pyth_address,
+                        update_data=["0x" + data for data in price_update_data],
+                    )["feeAmount"]
+                    // num_updates
+                )
+                self.context.logger.info(
+                    "### UpdatePriceDataRound: Update fees on %s: %s Wei", chain["name"], update_fee
                 )
-                self.context.logger.info(f"Transaction hash: {tx_hash}")
 
-                tx_receipt = (
-                    self.sepolia_ledger_api.api.eth.wait_for_transaction_receipt(
-                        tx_hash, timeout=TX_TIMEOUT
+                # Send a single transaction updating every price feed
+                num_feeds = len(price_updates) or len(update["price_feed_ids"]) or 1
+                if price_updates:
+                    # Only update if a feed is still fresher on-chain when the transaction lands
+                    w3_function = self.pyth_contract.update_price_feeds_if_necessary(
+                        ledger_api=ledger_api,
+                        contract_address=pyth_address,
+                        update_data=["0x" + blob for blob in price_update_data],
+                        price_ids=list(price_updates),
+                        publish_times=[price["publish_time"] for price in price_updates.values()],
+                    )
+                else:
+                    w3_function = self.pyth_contract.update_price_feeds(
+                        ledger_api=ledger_api,
+                        contract_address=pyth_address,
+                        update_data=["0x" + blob for blob in price_update_data],
                     )
+                pending_tx = self.submit_transaction(
+                    ledger_api,
+                    chain_id,
+                    w3_function,
+                    value=update_fee,
+                    shape=num_feeds,
+                    default_gas=GAS + GAS_PER_EXTRA_FEED * (num_feeds - 1),
                 )
-                print(f"Transaction receipt: {tx_receipt}")
+                if pending_tx is None:
+                    raise ValueError("Transaction could not be sent.")
+
+                tx_receipt = yield from self.wait_for_transaction(ledger_api, chain_id, pending_tx)
+                self.context.logger.info("Transaction receipt: %s", tx_receipt)
                 if tx_receipt.status == 1:
                     self.context.logger.info(
-                        "### Transaction successful! Price feeds updated on-chain."
+                        "### Transaction successful! Price feeds updated on-chain on %s.", chain["name"]
                     )
-                    self.context.shared_state["tx_receipt_status"] = tx_receipt.status
+                    result["tx_receipt_status"] = tx_receipt.status
+                    result["pushed_prices"] = self.get_pushed_prices(chain, tx_receipt, price_updates)
+                    for feed_id, price in price_updates.items():
+                        scheduler.record_push(feed_id, price["price"], price["publish_time"])
                 elif tx_receipt.status == 0:
                     self.context.logger.error(
-                        "### Transaction failed! Price feeds not updated on-chain."
+                        "### Transaction failed! Price feeds not updated on-chain on %s.", chain["name"]
                     )
-                    self.context.shared_state["tx_receipt_status"] = tx_receipt.status
+                    # The fee may have changed since it was cached
+                    update_fee_cache.invalidate()
                 else:
                     raise ValueError("Transaction failed.")
             except Exception as e:
-                self.context.logger.error("### Error updating price feeds: %s", e)
-
-        self._is_done = True
-        self._event = PythoraabciappEvents.DONE
-
-    def pythUpdatePriceFeeds(self, data: str):
-        """Call "updatePriceFeeds" on Pyth contract"""
-
-        return self.pyth_contract.update_price_feeds(
-            ledger_api=self.sepolia_ledger_api,
-            contract_address=self.pyth_address,
-            update_data=["0x" + data],
-        )
+                self.context.logger.error("### Error updating price feeds on %s: %s", chain["name"], e)
+                update_fee_cache.invalidate()
+
+        result["duration"] = time.time() - started_at
+        return result
+
+    def get_pushed_prices(
+        self, chain: dict[str, Any], tx_receipt: Any, price_updates: dict[str, dict[str, int]]
+    ) -> dict[str, dict[str, int]]:
+        """Get the prices written on-chain by a push from its PriceFeedUpdate events.
+
+        The events do not carry the exponent, which is taken from the pushed update.
+        """
+        instance = self.pyth_contract.get_instance(self.strategy.ledger_api(chain), chain["pyth_address"])
+        events = instance.events.PriceFeedUpdate().process_receipt(tx_receipt, errors=DISCARD)
+        pushed_prices = {}
+        for event in events:
+            feed_id = "0x" + bytes(event["args"]["id"]).hex()
+            if feed_id not in price_updates:
+                continue
+            pushed_prices[feed_id] = {
+                "price": event["args"]["price"],
+                "expo": price_updates[feed_id]["expo"],
+                "publish_time": event["args"]["publishTime"],
+            }
+        return pushed_prices
 
 
 class PythoraabciappFsmBehaviour(FSMBehaviour):
@@ -518,6 +966,7 @@ class PythoraabciappFsmBehaviour(FSMBehaviour):
 
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
+        self._last_entered: str | None = None
         self.register_state(
             PythoraabciappStates.REGISTRATIONROUND.value,
             RegistrationRound(**kwargs),
@@ -584,9 +1033,89 @@ class PythoraabciappFsmBehaviour(FSMBehaviour):
         if self.current is None:
             self.context.logger.info("No state to act on.")
             self.terminate()
-        self.context.logger.info(f"Entering {self.current}")
+        if self.current != self._last_entered:
+            self.context.logger.info(f"Entering {self.current}")
+            self._last_entered = self.current
+            # the previous round may have written to the shared state
+            self.context.strategy.metrics.invalidate()
         super().act()
 
     def terminate(self) -> None:
         """Implement the termination."""
         os._exit(0)
+
+
+class EventIndexerBehaviour(TickerBehaviour):
+    """This class indexes the events of the Pyth and Pythora Entropy contracts.
+
+    Every tick pulls the logs emitted since the last indexed block into the local store
+    of the strategy.
+    """
+
+    def setup(self) -> None:
+        """Implement the setup."""
+        self.context.logger.info("Setting up event indexer behaviour.")
+
+    def act(self) -> None:
+        """Index the new events."""
+        strategy = cast(PythoraStrategy, self.context.strategy)
+        if not strategy.index_events:
+            return
+        # the price feed updates are indexed on the first chain prices are pushed to
+        push_chain = strategy.push_chains[0]
+        entropy_chain = strategy.entropy_chain
+        push_ledger_api = strategy.ledger_api(push_chain)
+        entropy_ledger_api = strategy.ledger_api(entropy_chain)
+        sources = (
+            (
+                PRICE_FEED_UPDATE,
+                push_chain["chain_id"],
+                push_ledger_api,
+                strategy.pyth_contract.get_price_feed_update_events,
+                push_chain["pyth_address"],
+            ),
+            (
+                RANDOM_NUMBER_REQUESTED,
+                entropy_chain["chain_id"],
+                entropy_ledger_api,
+                strategy.pythora_entropy_contract.get_random_number_requested_events,
+                entropy_chain["pythora_entropy_address"],
+            ),
+            (
+                PYTHORA_ENTROPY_CALLBACK,
+                entropy_chain["chain_id"],
+                entropy_ledger_api,
+                strategy.pythora_entropy_contract.get_pythora_entropy_callback_events,
+                entropy_chain["pythora_entropy_address"],
+            ),
+        )
+        for event, chain_id, ledger_api, get_events, contract_address in sources:
+            try:
+                stored = strategy.event_indexer.sync(
+                    chain_id,
+                    contract_address,
+                    event,
+                    ledger_api.api.eth.block_number,
+                    partial(self.fetch_events, get_events, ledger_api, contract_address),
+                )
+            except Exception as err:  # pylint: disable=broad-except
+                self.context.logger.warning("Error indexing %s events: %s", event, err)
+                continue
+            if stored:
+                self.context.logger.info("Indexed %s new %s events.", stored, event)
+
+    @staticmethod
+    def fetch_events(
+        get_events: Any, ledger_api: EthereumApi, contract_address: str, from_block: int, to_block: int
+    ) -> list[dict[str, Any]]:
+        """Fetch the events of a source emitted between two blocks."""
+        return get_events(
+            ledger_api=ledger_api,
+            contract_address=contract_address,
+            from_block=from_block,
+            to_block=to_block,
+        )["events"]
+
+    def teardown(self) -> None:
+        """Implement the teardown."""
+        self.context.logger.info("Tearing down event indexer behaviour.")
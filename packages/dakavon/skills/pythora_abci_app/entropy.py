@@ -0,0 +1,175 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the entropy fee cache, callback watcher and randomness pool."""
+
+import time
+from typing import Any
+from collections import deque
+from collections.abc import Callable
+
+
+DEFAULT_MAX_BLOCK_RANGE = 1000  # blocks scanned per eth_getLogs request
+DEFAULT_POOL_SIZE = 4
+DEFAULT_LOW_WATER_MARK = 2
+DEFAULT_CALLBACK_TIMEOUT = 300  # seconds before a callback is considered late
+GIVE_UP_FACTOR = 4  # callbacks later than this many callback timeouts are no longer watched
+DEFAULT_FEE_TTL = 12  # seconds
+
+
+class FeeCache:
+    """Cache a contract fee, e.g. of an entropy request.
+
+    A fee read at a block is cached for that block: the fee cannot change before the
+    next one, and is read again as soon as it is mined. A fee read without a block
+    number is cached for `ttl` seconds. Either way, it is read again right after it
+    was invalidated because a transaction paying the cached fee failed.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_FEE_TTL) -> None:
+        """Initialize the cache."""
+        self._ttl = ttl
+        self._fee: tuple[float, int | None, int] | None = None
+
+    def get(self, fetch: Callable[[], int], block_number: int | None = None) -> int:
+        """Get the fee cached for a block, or within the ttl without one, fetching it otherwise."""
+        if self._fee is not None:
+            expires_at, cached_block_number, fee = self._fee
+            if block_number is None and time.time() < expires_at:
+                return fee
+            if block_number is not None and block_number == cached_block_number:
+                return fee
+        fee = fetch()
+        self._fee = (time.time() + self._ttl, block_number, fee)
+        return fee
+
+    def invalidate(self) -> None:
+        """Fetch the fee again on its next use."""
+        self._fee = None
+
+
+class EntropyCallbackWatcher:
+    """Follow the entropy callbacks of the requested sequence numbers.
+
+    The callback events are scanned from a local block cursor, so every block is only
+    fetched once and a random number is picked up as soon as its callback is mined,
+    however late that is. Sequence numbers are watched until their callback is seen
+    or they are unwatched.
+    """
+
+    def __init__(self, max_block_range: int = DEFAULT_MAX_BLOCK_RANGE) -> None:
+        """Initialize the watcher."""
+        self._max_block_range = max_block_range
+        self._cursor: int | None = None
+        self._watched: set[int] = set()
+
+    @property
+    def watched(self) -> set[int]:
+        """Get the sequence numbers still waiting for their callback."""
+        return set(self._watched)
+
+    def watch(self, sequence_number: int, from_block: int) -> None:
+        """Watch for the callback of a sequence number requested in `from_block`."""
+        if self._cursor is None or not self._watched or from_block < self._cursor:
+            self._cursor = from_block
+        self._watched.add(sequence_number)
+
+    def unwatch(self, sequence_number: int) -> None:
+        """Stop watching for the callback of a sequence number."""
+        self._watched.discard(sequence_number)
+
+    def poll(self, latest_block: int, get_events: Callable[[int, int], list[Any]]) -> dict[int, bytes]:
+        """Scan the new blocks up to `latest_block` for the callbacks of the watched sequence numbers.
+
+        `get_events` returns the callback events emitted between two blocks, inclusive.
+        """
+        random_numbers = {}
+        while self._watched and self._cursor is not None and self._cursor <= latest_block:
+            to_block = min(latest_block, self._cursor + self._max_block_range - 1)
+            for event in get_events(self._cursor, to_block):
+                sequence_number = event["args"]["sequenceNumber"]
+                if sequence_number in self._watched:
+                    self._watched.discard(sequence_number)
+                    random_numbers[sequence_number] = event["args"]["randomNumber"]
+            self._cursor = to_block + 1
+        return random_numbers
+
+
+class RandomnessPool:
+    """Keep random numbers requested from the entropy contract ahead of their use.
+
+    Once the random numbers ready or on their way drop below `low_water_mark`, the pool
+    asks for enough requests to get back to `size`. A request whose callback is later
+    than `callback_timeout` no longer counts as on its way, but its random number is
+    still added to the pool if the callback lands within `GIVE_UP_FACTOR` timeouts.
+    Later callbacks are given up on, so their blocks are no longer scanned.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        low_water_mark: int = DEFAULT_LOW_WATER_MARK,
+        callback_timeout: float = DEFAULT_CALLBACK_TIMEOUT,
+        watcher: EntropyCallbackWatcher | None = None,
+    ) -> None:
+        """Initialize the pool."""
+        self.size = size
+        self.low_water_mark = low_water_mark
+        self.callback_timeout = callback_timeout
+        self.watcher = watcher or EntropyCallbackWatcher()
+        self._ready: deque[tuple[int, bytes]] = deque()
+        self._awaiting: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        """Get the number of random numbers ready to be used."""
+        return len(self._ready)
+
+    def watch(self, sequence_number: int, from_block: int) -> None:
+        """Wait for the random number of a request mined in `from_block`."""
+        self._awaiting[sequence_number] = time.time()
+        self.watcher.watch(sequence_number, from_block)
+
+    def poll(self, latest_block: int, get_events: Callable[[int, int], list[Any]]) -> dict[int, bytes]:
+        """Add the random numbers whose callback landed up to `latest_block`."""
+        give_up_at = time.time() - self.callback_timeout * GIVE_UP_FACTOR
+        for sequence_number, watched_at in list(self._awaiting.items()):
+            if watched_at < give_up_at:
+                del self._awaiting[sequence_number]
+                self.watcher.unwatch(sequence_number)
+        random_numbers = self.watcher.poll(latest_block, get_events)
+        for sequence_number, random_number in random_numbers.items():
+            self._awaiting.pop(sequence_number, None)
+            self._ready.append((sequence_number, random_number))
+        return random_numbers
+
+    def awaiting(self) -> int:
+        """Get the number of random numbers still expected in time."""
+        deadline = time.time() - self.callback_timeout
+        return sum(1 for watched_at in self._awaiting.values() if watched_at >= deadline)
+
+    def shortfall(self, unmined_requests: int = 0) -> int:
+        """Get the number of random numbers to request, given the requests not mined yet."""
+        available = len(self._ready) + self.awaiting() + unmined_requests
+        if available >= self.low_water_mark:
+            return 0
+        return self.size - available
+
+    def take(self) -> tuple[int, bytes] | None:
+        """Take the oldest ready random number with its sequence number, if any."""
+        return self._ready.popleft() if self._ready else None
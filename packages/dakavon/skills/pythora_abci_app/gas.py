@@ -0,0 +1,107 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the EIP-1559 gas oracle."""
+
+import math
+import time
+import logging
+from typing import Any
+from collections.abc import Callable, Hashable
+
+from aea_ledger_ethereum import EthereumApi
+
+
+DEFAULT_FEE_HISTORY_BLOCKS = 10
+DEFAULT_PRIORITY_FEE_PERCENTILE = 50
+DEFAULT_FEE_CACHE_TTL = 12  # seconds, about one block on Ethereum
+DEFAULT_BASE_FEE_MULTIPLIER = 2  # headroom for the base fee to rise over the next blocks
+DEFAULT_GAS_ESTIMATE_MARGIN = 1.2
+LEGACY_GAS_PREMIUM = 1.1  # used when the chain does not support eth_feeHistory
+
+_default_logger = logging.getLogger("aea.packages.dakavon.skills.pythora_abci_app.gas")
+
+
+class GasOracle:
+    """Price transactions from a cached fee history and cached gas estimates.
+
+    The fee history of every chain is fetched at most once per `fee_cache_ttl`, which
+    should be set to about one block time. Gas estimates are cached per chain and per
+    calldata shape, e.g. the function called and the number of price feeds updated.
+    """
+
+    def __init__(
+        self,
+        fee_history_blocks: int = DEFAULT_FEE_HISTORY_BLOCKS,
+        priority_fee_percentile: int = DEFAULT_PRIORITY_FEE_PERCENTILE,
+        fee_cache_ttl: float = DEFAULT_FEE_CACHE_TTL,
+        gas_estimate_margin: float = DEFAULT_GAS_ESTIMATE_MARGIN,
+        logger: logging.Logger = _default_logger,
+    ) -> None:
+        """Initialize the gas oracle."""
+        self._fee_history_blocks = fee_history_blocks
+        self._priority_fee_percentile = priority_fee_percentile
+        self._fee_cache_ttl = fee_cache_ttl
+        self._gas_estimate_margin = gas_estimate_margin
+        self.logger = logger
+        self._fees: dict[int, tuple[float, dict[str, int]]] = {}
+        self._gas_estimates: dict[tuple[int, Hashable], int] = {}
+
+    def fees(self, chain_id: int, ledger_api: EthereumApi) -> dict[str, int]:
+        """Get the fee fields of a transaction on a chain."""
+        cached = self._fees.get(chain_id)
+        if cached is not None and time.time() < cached[0]:
+            return cached[1]
+
+        try:
+            fees = self._fees_from_history(ledger_api)
+        except Exception as err:  # pylint: disable=broad-except
+            self.logger.warning(f"Falling back to legacy gas price on chain {chain_id}: {err}")
+            fees = {"gasPrice": int(ledger_api.api.eth.gas_price * LEGACY_GAS_PREMIUM)}
+        self._fees[chain_id] = (time.time() + self._fee_cache_ttl, fees)
+        return fees
+
+    def _fees_from_history(self, ledger_api: EthereumApi) -> dict[str, int]:
+        """Compute the EIP-1559 fees from the recent fee history."""
+        history = ledger_api.api.eth.fee_history(
+            self._fee_history_blocks, "latest", [self._priority_fee_percentile]
+        )
+        # the last entry is the base fee of the next block
+        base_fee = history["baseFeePerGas"][-1]
+        rewards = sorted(reward[0] for reward in history.get("reward") or [] if reward)
+        priority_fee = rewards[len(rewards) // 2] if rewards else 0
+        return {
+            "maxFeePerGas": base_fee * DEFAULT_BASE_FEE_MULTIPLIER + priority_fee,
+            "maxPriorityFeePerGas": priority_fee,
+        }
+
+    def estimate_gas(self, chain_id: int, shape: Hashable, estimate: Callable[[], Any], default: int) -> int:
+        """Get the gas limit of a transaction with the given calldata shape."""
+        key = (chain_id, shape)
+        gas = self._gas_estimates.get(key)
+        if gas is not None:
+            return gas
+
+        try:
+            gas = math.ceil(estimate() * self._gas_estimate_margin)
+        except Exception as err:  # pylint: disable=broad-except
+            self.logger.warning(f"Gas estimation failed for {shape} on chain {chain_id}: {err}")
+            return default
+        self._gas_estimates[key] = gas
+        return gas
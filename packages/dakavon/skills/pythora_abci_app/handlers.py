@@ -19,7 +19,6 @@
 
 """This module contains the handler for the 'metrics' skill."""
 
-import json
 from typing import cast
 
 from aea.skills.base import Handler
@@ -32,6 +31,7 @@ from packages.dakavon.skills.pythora_abci_app.dialogues import (
     HttpDialogues,
     DefaultDialogues,
 )
+from packages.dakavon.skills.pythora_abci_app.metrics import etag_matches
 
 
 class HttpHandler(Handler):
@@ -56,6 +56,8 @@ class HttpHandler(Handler):
         # handle message
         if http_msg.performative == HttpMessage.Performative.REQUEST:
             self._handle_request(http_msg, http_dialogue)
+        elif http_msg.performative == HttpMessage.Performative.RESPONSE:
+            self._handle_response(http_msg, http_dialogue)
         else:
             self._handle_invalid(http_msg, http_dialogue)
 
@@ -82,26 +84,53 @@ class HttpHandler(Handler):
         else:
             self._handle_invalid(http_msg, http_dialogue)
 
-    def _handle_get(self, http_msg: HttpMessage, http_dialogue: HttpDialogue) -> None:
-        """Handle a Http request of verb GET."""
+    def _handle_response(self, http_msg: HttpMessage, http_dialogue: HttpDialogue) -> None:
+        """Handle a Http response to a request sent through the http client connection."""
+        pending_http_requests = self.context.strategy.pending_http_requests
+        nonce = http_dialogue.dialogue_label.dialogue_reference[0]
+        if nonce not in pending_http_requests:
+            self.context.logger.warning(
+                f"received http response to an expired request, dialogue={http_dialogue.dialogue_label}."
+            )
+            return
+        pending_http_requests[nonce] = http_msg
+
+    def _metrics_headers(self, etag: str) -> dict[str, str]:
+        """Get the headers of a response serving the metrics."""
+        headers = {}
         if self.enable_cors:
-            cors_headers = "Access-Control-Allow-Origin: *\n"
-            cors_headers += "Access-Control-Allow-Methods: POST\n"
-            cors_headers += "Access-Control-Allow-Headers: Content-Type,Accept\n"
-            headers = cors_headers + http_msg.headers
+            headers["Access-Control-Allow-Origin"] = "*"
+            headers["Access-Control-Allow-Methods"] = "POST"
+            headers["Access-Control-Allow-Headers"] = "Content-Type,Accept,If-None-Match"
+            headers["Access-Control-Expose-Headers"] = "ETag"
+        headers["ETag"] = etag
+        headers["Content-Type"] = "application/json"
+        return headers
+
+    def _handle_get(self, http_msg: HttpMessage, http_dialogue: HttpDialogue) -> None:
+        """Handle a Http request of verb GET.
+
+        The shared state is served from its cached snapshot, and not at all if the
+        client already has the current version.
+        """
+        etag, body = self.context.strategy.metrics.get(self.context.shared_state)
+        headers = HttpMessage.Headers(self._metrics_headers(etag))
+
+        if etag_matches(http_msg.headers.get("If-None-Match"), etag):
+            status_code, status_text, body = 304, "Not Modified", b""
         else:
-            headers = http_msg.headers
+            status_code, status_text = 200, "Success"
 
         http_response = http_dialogue.reply(
             performative=HttpMessage.Performative.RESPONSE,
             target_message=http_msg,
             version=http_msg.version,
-            status_code=200,
-            status_text="Success",
+            status_code=status_code,
+            status_text=status_text,
             headers=headers,
-            body=json.dumps(self.context.shared_state).encode("utf-8"),
+            body=body,
         )
-        self.context.logger.info(f"responding with: {http_response}")
+        self.context.logger.debug(f"responding with: {http_response}")
         self.context.outbox.put_message(message=http_response)
 
     def _handle_post(self, http_msg: HttpMessage, http_dialogue: HttpDialogue) -> None:
@@ -0,0 +1,167 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the streaming Hermes price ingestion."""
+
+import json
+import time
+import logging
+import threading
+from typing import Any
+from urllib.parse import urlencode
+
+import requests
+
+
+DEFAULT_MAX_STALENESS = 5  # seconds
+DEFAULT_CONNECT_TIMEOUT = 10  # seconds
+DEFAULT_READ_TIMEOUT = 30  # seconds, Hermes sends an update at least every few seconds
+INITIAL_BACKOFF = 1  # seconds
+MAX_BACKOFF = 60  # seconds
+
+_default_logger = logging.getLogger("aea.packages.dakavon.skills.pythora_abci_app.hermes")
+
+
+def normalise_feed_id(feed_id: str) -> str:
+    """Normalise a price feed id to its lower case, 0x-prefixed form."""
+    feed_id = feed_id.lower()
+    return feed_id if feed_id.startswith("0x") else "0x" + feed_id
+
+
+def parse_hermes_prices(res_json: dict[str, Any]) -> dict[str, dict[str, int]]:
+    """Extract the price, exponent and publish time of every feed in a parsed Hermes response."""
+    prices = {}
+    for parsed in res_json.get("parsed") or []:
+        price = parsed["price"]
+        prices[normalise_feed_id(parsed["id"])] = {
+            "price": int(price["price"]),
+            "expo": int(price["expo"]),
+            "publish_time": int(price["publish_time"]),
+        }
+    return prices
+
+
+class HermesPriceStream:
+    """Keep one server-sent events connection to Hermes open.
+
+    The latest update data and parsed price of every feed are cached in memory, so
+    they can be read without a round-trip. The connection is re-established with an
+    exponential backoff whenever it drops.
+    """
+
+    def __init__(
+        self,
+        hermes_url: str,
+        feed_ids: list[str],
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        logger: logging.Logger = _default_logger,
+    ) -> None:
+        """Initialize the stream."""
+        query = [("ids[]", feed_id) for feed_id in feed_ids]
+        query += [("encoding", "hex"), ("parsed", "true")]
+        self.url = f"{hermes_url}/v2/updates/price/stream?{urlencode(query)}"
+        self.logger = logger
+        self._timeout = (connect_timeout, read_timeout)
+        self._lock = threading.Lock()
+        self._latest: dict[str, dict[str, Any]] = {}
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start streaming in a background thread."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="hermes-price-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop streaming."""
+        self._stopped.set()
+        self._thread = None
+
+    def prices(self, max_age: float = DEFAULT_MAX_STALENESS) -> dict[str, dict[str, int]]:
+        """Get the parsed prices of all the feeds received within `max_age` seconds."""
+        oldest = time.time() - max_age
+        with self._lock:
+            return {
+                feed_id: latest["price"] for feed_id, latest in self._latest.items() if latest["received_at"] >= oldest
+            }
+
+    def latest_update(
+        self, feed_ids: list[str], max_age: float = DEFAULT_MAX_STALENESS
+    ) -> tuple[list[str], dict[str, dict[str, int]]] | None:
+        """Get the update data and prices of the given feeds, if all of them are fresh."""
+        oldest = time.time() - max_age
+        update_data: list[str] = []
+        prices = {}
+        with self._lock:
+            for feed_id in feed_ids:
+                latest = self._latest.get(normalise_feed_id(feed_id))
+                if latest is None or latest["received_at"] < oldest:
+                    return None
+                prices[normalise_feed_id(feed_id)] = latest["price"]
+                update_data.extend(data for data in latest["update_data"] if data not in update_data)
+        return update_data, prices
+
+    def _run(self) -> None:
+        """Read the stream until stopped, reconnecting with backoff."""
+        backoff = INITIAL_BACKOFF
+        while not self._stopped.is_set():
+            try:
+                with requests.get(self.url, stream=True, timeout=self._timeout) as response:
+                    response.raise_for_status()
+                    self.logger.info("Connected to the Hermes price stream.")
+                    for event in self._events(response):
+                        self._handle_event(event)
+                        backoff = INITIAL_BACKOFF
+                        if self._stopped.is_set():
+                            return
+            except (requests.RequestException, ValueError) as err:
+                self.logger.warning(f"Hermes price stream dropped, reconnecting in {backoff}s: {err}")
+            if self._stopped.wait(backoff):
+                return
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    @staticmethod
+    def _events(response: requests.Response):
+        """Yield the data of every server-sent event."""
+        data_lines: list[str] = []
+        for line in response.iter_lines(decode_unicode=True):
+            if line:
+                if line.startswith("data:"):
+                    data_lines.append(line[len("data:") :].strip())
+                continue
+            if data_lines:
+                yield json.loads("\n".join(data_lines))
+                data_lines = []
+
+    def _handle_event(self, event: dict[str, Any]) -> None:
+        """Cache the update data and prices of an event."""
+        update_data = event.get("binary", {}).get("data", [])
+        prices = parse_hermes_prices(event)
+        received_at = time.time()
+        with self._lock:
+            for feed_id, price in prices.items():
+                self._latest[feed_id] = {
+                    "update_data": update_data,
+                    "price": price,
+                    "received_at": received_at,
+                }
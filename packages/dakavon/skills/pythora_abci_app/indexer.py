@@ -0,0 +1,223 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the incremental indexer of the contract events."""
+
+import sqlite3
+from typing import Any
+from collections.abc import Callable
+
+
+DEFAULT_DB_PATH = "pythora_events.db"
+DEFAULT_LOOK_BACK = 1000  # blocks indexed before the first sync
+DEFAULT_INITIAL_CHUNK_SIZE = 1000  # blocks per eth_getLogs request
+DEFAULT_MAX_CHUNK_SIZE = 10_000
+DEFAULT_MAX_CHUNKS_PER_SYNC = 10
+DEFAULT_GROW_AFTER = 4  # consecutive successful requests before the block range is doubled
+
+PRICE_FEED_UPDATE = "PriceFeedUpdate"
+RANDOM_NUMBER_REQUESTED = "RandomNumberRequested"
+PYTHORA_ENTROPY_CALLBACK = "PythoraEntropyCallback"
+
+# the table and the columns, by event argument, every event is stored in
+EVENT_TABLES: dict[str, tuple[str, dict[str, str]]] = {
+    PRICE_FEED_UPDATE: (
+        "price_feed_updates",
+        {"id": "feed_id", "publishTime": "publish_time", "price": "price", "conf": "conf"},
+    ),
+    RANDOM_NUMBER_REQUESTED: (
+        "entropy_requests",
+        {"sequenceNumber": "sequence_number", "provider": "provider", "userRandomNumber": "user_random_number"},
+    ),
+    PYTHORA_ENTROPY_CALLBACK: (
+        "entropy_callbacks",
+        {"sequenceNumber": "sequence_number", "provider": "provider", "randomNumber": "random_number"},
+    ),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS event_cursors (
+    chain_id INTEGER NOT NULL, contract_address TEXT NOT NULL, event TEXT NOT NULL, last_block INTEGER NOT NULL,
+    PRIMARY KEY (chain_id, contract_address, event)
+);
+CREATE TABLE IF NOT EXISTS price_feed_updates (
+    feed_id TEXT NOT NULL, publish_time INTEGER NOT NULL, price INTEGER NOT NULL, conf INTEGER NOT NULL,
+    block_number INTEGER NOT NULL, tx_hash TEXT NOT NULL, log_index INTEGER NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS price_feed_updates_feed_id ON price_feed_updates (feed_id, block_number);
+CREATE INDEX IF NOT EXISTS price_feed_updates_block ON price_feed_updates (block_number);
+CREATE TABLE IF NOT EXISTS entropy_requests (
+    sequence_number INTEGER NOT NULL, provider TEXT NOT NULL, user_random_number TEXT NOT NULL,
+    block_number INTEGER NOT NULL, tx_hash TEXT NOT NULL, log_index INTEGER NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS entropy_requests_sequence_number ON entropy_requests (sequence_number);
+CREATE INDEX IF NOT EXISTS entropy_requests_block ON entropy_requests (block_number);
+CREATE TABLE IF NOT EXISTS entropy_callbacks (
+    sequence_number INTEGER NOT NULL, provider TEXT NOT NULL, random_number TEXT NOT NULL,
+    block_number INTEGER NOT NULL, tx_hash TEXT NOT NULL, log_index INTEGER NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS entropy_callbacks_sequence_number ON entropy_callbacks (sequence_number);
+CREATE INDEX IF NOT EXISTS entropy_callbacks_block ON entropy_callbacks (block_number);
+"""
+
+
+def _to_column(value: Any) -> Any:
+    """Convert an event argument to a value SQLite can store, keeping the hex form of bytes."""
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    if isinstance(value, int) and not -(2**63) <= value < 2**63:
+        return str(value)
+    return value
+
+
+class EventIndexer:
+    """Index contract events incrementally into a local SQLite store.
+
+    Every event of a contract on a chain keeps its own cursor, the last block it was
+    indexed up to, so a sync only requests the new blocks. The block range of each request
+    adapts: it is halved when the node rejects it, e.g. for returning too many logs, and
+    doubled after `grow_after` consecutive successes.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        look_back: int = DEFAULT_LOOK_BACK,
+        initial_chunk_size: int = DEFAULT_INITIAL_CHUNK_SIZE,
+        max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE,
+        max_chunks_per_sync: int = DEFAULT_MAX_CHUNKS_PER_SYNC,
+        grow_after: int = DEFAULT_GROW_AFTER,
+    ) -> None:
+        """Initialize the indexer."""
+        self._db_path = db_path
+        self._look_back = look_back
+        self._initial_chunk_size = initial_chunk_size
+        self._max_chunk_size = max_chunk_size
+        self._max_chunks_per_sync = max_chunks_per_sync
+        self._grow_after = grow_after
+        # the block range and the consecutive successes, by cursor
+        self._chunk_sizes: dict[tuple[int, str, str], tuple[int, int]] = {}
+        self._connection: sqlite3.Connection | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get the connection to the store, creating its tables on first use."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self._db_path)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        """Close the connection to the store."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def last_indexed_block(self, chain_id: int, contract_address: str, event: str) -> int | None:
+        """Get the block an event of a contract is indexed up to, if it was ever indexed."""
+        row = self.connection.execute(
+            "SELECT last_block FROM event_cursors WHERE chain_id = ? AND contract_address = ? AND event = ?",
+            (chain_id, contract_address.lower(), event),
+        ).fetchone()
+        return None if row is None else row["last_block"]
+
+    def sync(
+        self,
+        chain_id: int,
+        contract_address: str,
+        event: str,
+        latest_block: int,
+        get_events: Callable[[int, int], list[Any]],
+    ) -> int:
+        """Index the new `event` logs of a contract up to `latest_block` and get the number of logs stored.
+
+        `get_events` returns the decoded logs emitted between two blocks, inclusive. At
+        most `max_chunks_per_sync` requests are made, so a long backlog is caught up over
+        several syncs.
+        """
+        table, columns = EVENT_TABLES[event]
+        cursor = (chain_id, contract_address.lower(), event)
+        last_block = self.last_indexed_block(*cursor)
+        from_block = max(latest_block - self._look_back, 0) if last_block is None else last_block + 1
+        chunk_size, successes = self._chunk_sizes.get(cursor, (self._initial_chunk_size, 0))
+        stored = 0
+        requests = 0
+        while from_block <= latest_block and requests < self._max_chunks_per_sync:
+            to_block = min(latest_block, from_block + chunk_size - 1)
+            requests += 1
+            try:
+                logs = get_events(from_block, to_block)
+            except Exception:  # pylint: disable=broad-except
+                if chunk_size == 1:
+                    raise
+                chunk_size = max(chunk_size // 2, 1)
+                successes = 0
+                continue
+
+            rows = [
+                [_to_column(log["args"][arg]) for arg in columns]
+                + [log["blockNumber"], _to_column(bytes(log["transactionHash"])), log["logIndex"]]
+                for log in logs
+            ]
+            with self.connection:
+                self.connection.executemany(
+                    f"INSERT OR IGNORE INTO {table} ({', '.join(columns.values())}, block_number, tx_hash, log_index) "  # noqa: S608
+                    f"VALUES ({', '.join('?' * (len(columns) + 3))})",
+                    rows,
+                )
+                self.connection.execute(
+                    "INSERT INTO event_cursors (chain_id, contract_address, event, last_block) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (chain_id, contract_address, event) DO UPDATE SET last_block = excluded.last_block",
+                    (*cursor, to_block),
+                )
+            stored += len(rows)
+            from_block = to_block + 1
+            successes += 1
+            if successes >= self._grow_after:
+                chunk_size = min(chunk_size * 2, self._max_chunk_size)
+                successes = 0
+        self._chunk_sizes[cursor] = (chunk_size, successes)
+        return stored
+
+    def price_feed_updates(self, feed_id: str, from_block: int = 0) -> list[dict[str, Any]]:
+        """Get the indexed updates of a price feed since a block, oldest first."""
+        rows = self.connection.execute(
+            "SELECT * FROM price_feed_updates WHERE feed_id = ? AND block_number >= ? "
+            "ORDER BY block_number, log_index",
+            (feed_id.lower(), from_block),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def entropy_request(self, sequence_number: int) -> dict[str, Any] | None:
+        """Get the indexed request of a sequence number."""
+        row = self.connection.execute(
+            "SELECT * FROM entropy_requests WHERE sequence_number = ?", (sequence_number,)
+        ).fetchone()
+        return None if row is None else dict(row)
+
+    def entropy_callback(self, sequence_number: int) -> dict[str, Any] | None:
+        """Get the indexed callback of a sequence number."""
+        row = self.connection.execute(
+            "SELECT * FROM entropy_callbacks WHERE sequence_number = ?", (sequence_number,)
+        ).fetchone()
+        return None if row is None else dict(row)
@@ -0,0 +1,145 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the registry of long-lived ledger clients."""
+
+from typing import Any
+
+import requests
+from web3 import HTTPProvider
+from requests.adapters import HTTPAdapter
+from aea_ledger_ethereum import EthereumApi, EthereumCrypto
+
+from packages.dakavon.skills.pythora_abci_app.rpc import (
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_MAX_BLOCK_LAG,
+    RpcPoolProvider,
+)
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RPC_TIMEOUT = 10  # seconds
+
+
+class CachingEthereumApi(EthereumApi):
+    """An Ethereum api building the web3 instance of every contract only once.
+
+    Contract wrappers call `get_contract_instance` on every method call, which parses
+    the contract ABI again each time. The instances are cached per chain and contract
+    address instead, and rebuilt if the address is used with another contract interface.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Initialize the api."""
+        super().__init__(**kwargs)
+        self._contract_instances: dict[tuple[str, str | None], tuple[dict[str, str], Any]] = {}
+
+    def get_contract_instance(self, contract_interface: dict[str, str], contract_address: str | None = None) -> Any:
+        """Get the cached instance of a contract."""
+        key = (str(self._chain_id), contract_address)
+        cached = self._contract_instances.get(key)
+        # contract interfaces are loaded once per contract class, so they are mostly the same object
+        if cached is None or (cached[0] is not contract_interface and cached[0] != contract_interface):
+            instance = super().get_contract_instance(contract_interface, contract_address)
+            self._contract_instances[key] = (contract_interface, instance)
+            return instance
+        return cached[1]
+
+
+class LedgerApiRegistry:
+    """Share one ledger api per chain, each backed by a keep-alive connection pool.
+
+    The private key is loaded once and the resulting crypto is shared as well, and every
+    ledger api caches its contract instances. A chain with several RPC endpoints is
+    served by a `RpcPoolProvider` over all of them.
+    """
+
+    def __init__(
+        self,
+        private_key_path: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        rpc_timeout: float = DEFAULT_RPC_TIMEOUT,
+        hedge_requests: bool = True,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+        max_block_lag: int = DEFAULT_MAX_BLOCK_LAG,
+    ) -> None:
+        """Initialize the registry."""
+        self._private_key_path = private_key_path
+        self._pool_size = pool_size
+        self._rpc_timeout = rpc_timeout
+        self._hedge_requests = hedge_requests
+        self._hedge_delay = hedge_delay
+        self._max_block_lag = max_block_lag
+        self._ledger_apis: dict[tuple[tuple[str, ...], int], EthereumApi] = {}
+        self._providers: list[RpcPoolProvider] = []
+        self._sessions: list[requests.Session] = []
+        self._crypto: EthereumCrypto | None = None
+
+    @property
+    def crypto(self) -> EthereumCrypto:
+        """Get the crypto of the agent, loading the private key on first use."""
+        if self._crypto is None:
+            self._crypto = EthereumCrypto(private_key_path=self._private_key_path)
+        return self._crypto
+
+    def get(self, address: str | list[str], chain_id: int) -> EthereumApi:
+        """Get the ledger api of a chain, given one or several RPC endpoints, creating it on first use."""
+        urls = (address,) if isinstance(address, str) else tuple(address)
+        key = (urls, chain_id)
+        ledger_api = self._ledger_apis.get(key)
+        if ledger_api is None:
+            ledger_api = CachingEthereumApi(address=urls[0], chain_id=str(chain_id))
+            if len(urls) == 1:
+                ledger_api.api.provider = HTTPProvider(
+                    urls[0],
+                    request_kwargs={"timeout": self._rpc_timeout},
+                    session=self._make_session(),
+                )
+            else:
+                provider = RpcPoolProvider(
+                    list(urls),
+                    [self._make_session() for _ in urls],
+                    timeout=self._rpc_timeout,
+                    hedge=self._hedge_requests,
+                    hedge_delay=self._hedge_delay,
+                    max_block_lag=self._max_block_lag,
+                )
+                self._providers.append(provider)
+                ledger_api.api.provider = provider
+            self._ledger_apis[key] = ledger_api
+        return ledger_api
+
+    def _make_session(self) -> requests.Session:
+        """Make a session keeping up to `pool_size` connections alive."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        self._sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        for provider in self._providers:
+            provider.close()
+        self._providers.clear()
+        for session in self._sessions:
+            session.close()
+        self._sessions.clear()
+        self._ledger_apis.clear()
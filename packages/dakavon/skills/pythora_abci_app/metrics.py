@@ -0,0 +1,75 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the versioned snapshot of the metrics served over http."""
+
+import json
+import hashlib
+from typing import Any
+from threading import Lock
+
+
+class MetricsSnapshot:
+    """Serialize the shared state once per version, along with its ETag.
+
+    The shared state is only written by the rounds of the FSM, so the FSM behaviour
+    bumps the version whenever it enters a new round. Between two bumps, every request
+    is served the same serialized body. The version and the snapshot are swapped under
+    a lock, so the snapshot may be shared across threads.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the snapshot."""
+        self._lock = Lock()
+        self._version = 0
+        self._snapshot: tuple[int, str, bytes] | None = None
+
+    @property
+    def version(self) -> int:
+        """Get the current version of the shared state."""
+        with self._lock:
+            return self._version
+
+    def invalidate(self) -> None:
+        """Serialize the shared state again on its next use."""
+        with self._lock:
+            self._version += 1
+
+    def get(self, shared_state: dict[str, Any]) -> tuple[str, bytes]:
+        """Get the ETag and the serialized body of the current version of the shared state."""
+        with self._lock:
+            version, snapshot = self._version, self._snapshot
+        if snapshot is None or snapshot[0] != version:
+            body = json.dumps(shared_state).encode("utf-8")
+            # derived from the content, so an ETag stays valid across restarts
+            etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+            snapshot = (version, etag, body)
+            with self._lock:
+                # keep a snapshot of a newer version, if one was taken meanwhile
+                if self._snapshot is None or self._snapshot[0] <= version:
+                    self._snapshot = snapshot
+        return snapshot[1], snapshot[2]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check whether an If-None-Match header value matches an ETag."""
+    if if_none_match is None:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
@@ -0,0 +1,160 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the local nonce manager."""
+
+import math
+import time
+from typing import Any
+
+from aea_ledger_ethereum import EthereumApi
+
+
+DEFAULT_STUCK_TIMEOUT = 30  # seconds
+DEFAULT_FEE_BUMP = 1.125  # nodes require at least a 10% bump to replace a transaction
+DEFAULT_RESYNC_INTERVAL = 60  # seconds
+FEE_FIELDS = ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas")
+
+
+class PendingTransaction:
+    """A transaction in flight, together with all the replacements sent for its nonce."""
+
+    def __init__(self, transaction: dict[str, Any], tx_hash: str) -> None:
+        """Initialize the pending transaction."""
+        self.transaction = transaction
+        self.tx_hashes = [tx_hash]
+        self.sent_at = time.time()
+
+    @property
+    def nonce(self) -> int:
+        """Get the nonce of the transaction."""
+        return self.transaction["nonce"]
+
+    def replace(self, transaction: dict[str, Any], tx_hash: str) -> None:
+        """Record a replacement of the transaction."""
+        self.transaction = transaction
+        self.tx_hashes.append(tx_hash)
+        self.sent_at = time.time()
+
+
+class NonceManager:
+    """Hand out nonces locally so several transactions can be in flight at once.
+
+    Nonces are tracked per chain. The local counter is synchronised with the chain
+    on first use and whenever the chain is idle for longer than the resync interval.
+    Nonces whose transaction never reached the mempool are handed out again first,
+    unless the chain has used them in the meantime. Transactions given up on by their
+    sender stay tracked as abandoned, so they are bumped until they are mined.
+    """
+
+    def __init__(
+        self,
+        stuck_timeout: float = DEFAULT_STUCK_TIMEOUT,
+        fee_bump: float = DEFAULT_FEE_BUMP,
+        resync_interval: float = DEFAULT_RESYNC_INTERVAL,
+    ) -> None:
+        """Initialize the nonce manager."""
+        self._stuck_timeout = stuck_timeout
+        self._fee_bump = fee_bump
+        self._resync_interval = resync_interval
+        self._next_nonce: dict[int, int] = {}
+        self._synced_at: dict[int, float] = {}
+        self._released: dict[int, set[int]] = {}
+        self._pending: dict[int, dict[int, PendingTransaction]] = {}
+        self._abandoned: dict[int, set[int]] = {}
+
+    def next_nonce(self, chain_id: int, ledger_api: EthereumApi, address: str) -> int:
+        """Get the next free nonce of a chain."""
+        released = self._released.get(chain_id)
+        if released and min(released) < ledger_api.api.eth.get_transaction_count(address):
+            # another transaction took the nonce, so the local counter is stale as well
+            self.reconcile(chain_id, ledger_api, address)
+            released = self._released[chain_id]
+        if released:
+            nonce = min(released)
+            released.remove(nonce)
+            return nonce
+
+        idle = not self._pending.get(chain_id)
+        if chain_id not in self._next_nonce or (
+            idle and time.time() - self._synced_at[chain_id] >= self._resync_interval
+        ):
+            self.reconcile(chain_id, ledger_api, address)
+        nonce = self._next_nonce[chain_id]
+        self._next_nonce[chain_id] = nonce + 1
+        return nonce
+
+    def reconcile(self, chain_id: int, ledger_api: EthereumApi, address: str) -> None:
+        """Synchronise with the chain, forgetting the transactions that have been mined."""
+        mined = ledger_api.api.eth.get_transaction_count(address)
+        in_mempool = ledger_api.api.eth.get_transaction_count(address, "pending")
+        pending = self._pending.setdefault(chain_id, {})
+        for nonce in [nonce for nonce in pending if nonce < mined]:
+            self.confirm(chain_id, nonce)
+        next_nonce = max(in_mempool, max(pending, default=mined - 1) + 1)
+        self._released[chain_id] = {
+            nonce for nonce in self._released.get(chain_id, set()) if mined <= nonce < next_nonce
+        }
+        self._next_nonce[chain_id] = next_nonce
+        self._synced_at[chain_id] = time.time()
+
+    def release(self, chain_id: int, nonce: int) -> None:
+        """Give back a nonce whose transaction could not be sent."""
+        self._released.setdefault(chain_id, set()).add(nonce)
+
+    def track(self, chain_id: int, transaction: dict[str, Any], tx_hash: str) -> PendingTransaction:
+        """Track a transaction which has been sent."""
+        pending_tx = PendingTransaction(transaction, tx_hash)
+        self._pending.setdefault(chain_id, {})[pending_tx.nonce] = pending_tx
+        return pending_tx
+
+    def get(self, chain_id: int, nonce: int) -> PendingTransaction | None:
+        """Get the transaction in flight for a nonce."""
+        return self._pending.get(chain_id, {}).get(nonce)
+
+    def confirm(self, chain_id: int, nonce: int) -> None:
+        """Stop tracking a transaction which has been mined."""
+        self._pending.get(chain_id, {}).pop(nonce, None)
+        self._abandoned.get(chain_id, set()).discard(nonce)
+
+    def abandon(self, chain_id: int, nonce: int) -> None:
+        """Hand over a transaction its sender stopped waiting for to later cycles."""
+        if nonce in self._pending.get(chain_id, {}):
+            self._abandoned.setdefault(chain_id, set()).add(nonce)
+
+    def abandoned(self, chain_id: int) -> list[PendingTransaction]:
+        """Get the abandoned transactions of a chain which are still in flight."""
+        pending = self._pending.get(chain_id, {})
+        return [pending[nonce] for nonce in sorted(self._abandoned.get(chain_id, set())) if nonce in pending]
+
+    def in_flight(self, chain_id: int) -> int:
+        """Get the number of transactions in flight on a chain."""
+        return len(self._pending.get(chain_id, {}))
+
+    def is_stuck(self, pending_tx: PendingTransaction) -> bool:
+        """Check whether a transaction has waited too long to be mined."""
+        return time.time() - pending_tx.sent_at >= self._stuck_timeout
+
+    def replacement(self, pending_tx: PendingTransaction) -> dict[str, Any]:
+        """Get a copy of a pending transaction with its fees bumped, reusing its nonce."""
+        transaction = dict(pending_tx.transaction)
+        for field in FEE_FIELDS:
+            if field in transaction:
+                transaction[field] = math.ceil(transaction[field] * self._fee_bump)
+        return transaction
@@ -0,0 +1,185 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the health-scored pool of the RPC endpoints of a chain."""
+
+import time
+import threading
+from typing import Any
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import requests
+from web3.types import RPCEndpoint, RPCResponse
+from web3.providers.base import JSONBaseProvider
+
+
+DEFAULT_HEDGE_DELAY = 0.25  # seconds without a response before a hedged request is sent again
+DEFAULT_MAX_BLOCK_LAG = 5  # blocks an endpoint may trail the highest block seen
+EWMA_ALPHA = 0.2
+ERROR_PENALTY = 10  # how many times slower an endpoint failing every request is considered
+ERROR_COOLDOWN = 30  # seconds a failed endpoint is only used as a last resort
+# latency-critical calls, sent to a second endpoint when the first is slow to respond
+HEDGED_METHODS = frozenset({"eth_sendRawTransaction", "eth_getTransactionReceipt"})
+
+
+class RpcEndpoint:
+    """Track the latency, error rate and block height of an RPC endpoint."""
+
+    def __init__(self, url: str, session: requests.Session) -> None:
+        """Initialize the endpoint."""
+        self.url = url
+        self.session = session
+        self.latency: float | None = None  # seconds, moving average
+        self.error_rate = 0.0  # moving average
+        self.block_number: int | None = None
+        self.failed_at: float | None = None
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful request."""
+        self.latency = latency if self.latency is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency
+        self.error_rate *= 1 - EWMA_ALPHA
+
+    def record_error(self) -> None:
+        """Record a failed request."""
+        self.error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.error_rate
+        self.failed_at = time.time()
+
+    def score(self, highest_block: int | None, max_block_lag: int) -> tuple[bool, float]:
+        """Get the score of the endpoint, lower being healthier.
+
+        Endpoints that failed recently or trail the chain come last. The others are
+        ranked by their latency, penalised by their error rate; an endpoint never used
+        comes first, so that every endpoint gets measured.
+        """
+        cooling_down = self.failed_at is not None and time.time() - self.failed_at < ERROR_COOLDOWN
+        lagging = (
+            highest_block is not None
+            and self.block_number is not None
+            and highest_block - self.block_number > max_block_lag
+        )
+        return cooling_down or lagging, (self.latency or 0.0) * (1 + ERROR_PENALTY * self.error_rate)
+
+
+class RpcPoolProvider(JSONBaseProvider):
+    """A web3 provider sending the requests of a chain to the healthiest of its endpoints.
+
+    A request failing on an endpoint is retried on the next healthiest one. The
+    `HEDGED_METHODS` are also sent to the runner-up endpoint once the first has not
+    answered within `hedge_delay`, and the first answer wins.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        sessions: list[requests.Session],
+        timeout: float,
+        hedge: bool = True,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+        max_block_lag: int = DEFAULT_MAX_BLOCK_LAG,
+    ) -> None:
+        """Initialize the provider."""
+        super().__init__()
+        self.endpoints = [RpcEndpoint(url, session) for url, session in zip(urls, sessions, strict=True)]
+        self._timeout = timeout
+        self._hedge_delay = hedge_delay
+        self._max_block_lag = max_block_lag
+        self._highest_block: int | None = None
+        self._lock = threading.Lock()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=2 * len(urls), thread_name_prefix="rpc_hedge")
+            if hedge and len(urls) > 1
+            else None
+        )
+
+    def ranked_endpoints(self) -> list[RpcEndpoint]:
+        """Get the endpoints, healthiest first."""
+        with self._lock:
+            return sorted(self.endpoints, key=lambda endpoint: endpoint.score(self._highest_block, self._max_block_lag))
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        """Send a request to the healthiest endpoint, failing over to the others."""
+        request_data = self.encode_rpc_request(method, params)
+        endpoints = self.ranked_endpoints()
+        if self._executor is not None and method in HEDGED_METHODS:
+            response, endpoints = self._make_hedged_request(method, request_data, endpoints)
+            if response is not None:
+                return response
+
+        last_error: Exception | None = None
+        for endpoint in endpoints:
+            try:
+                return self._send(endpoint, method, request_data)
+            except (requests.RequestException, ValueError) as err:
+                last_error = err
+        raise last_error or requests.ConnectionError("No RPC endpoint left to try")
+
+    def _make_hedged_request(
+        self, method: RPCEndpoint, request_data: bytes, endpoints: list[RpcEndpoint]
+    ) -> tuple[RPCResponse | None, list[RpcEndpoint]]:
+        """Send a request to the two healthiest endpoints, the second one only if the first is slow.
+
+        A response without error is preferred. Returns the response, or None along with
+        the endpoints left to fail over to if both requests failed.
+        """
+        futures = [self._executor.submit(self._send, endpoints[0], method, request_data)]
+        done, _ = wait(futures, timeout=self._hedge_delay)
+        if not done or futures[0].exception() is not None:
+            futures.append(self._executor.submit(self._send, endpoints[1], method, request_data))
+
+        error_response: RPCResponse | None = None
+        pending: set[Future] = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    continue
+                response = future.result()
+                if "error" not in response:
+                    return response, []
+                error_response = error_response or response
+        return error_response, endpoints[len(futures) :]
+
+    def _send(self, endpoint: RpcEndpoint, method: RPCEndpoint, request_data: bytes) -> RPCResponse:
+        """Send a request to an endpoint and record how it went."""
+        started_at = time.monotonic()
+        try:
+            response = endpoint.session.post(
+                endpoint.url,
+                data=request_data,
+                headers={"Content-Type": "application/json"},
+                timeout=self._timeout,
+            )
+            response.raise_for_status()
+            rpc_response = self.decode_rpc_response(response.content)
+        except (requests.RequestException, ValueError):
+            with self._lock:
+                endpoint.record_error()
+            raise
+
+        with self._lock:
+            endpoint.record_success(time.monotonic() - started_at)
+            if method == "eth_blockNumber" and "result" in rpc_response:
+                endpoint.block_number = int(rpc_response["result"], 16)
+                self._highest_block = max(self._highest_block or 0, endpoint.block_number)
+        return rpc_response
+
+    def close(self) -> None:
+        """Stop the threads sending the hedged requests."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,98 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the deviation and heartbeat based push scheduler."""
+
+from typing import Any
+
+
+DEFAULT_DEVIATION_THRESHOLD = 0.5  # percent
+DEFAULT_HEARTBEAT = 60  # seconds
+
+
+class PushScheduler:
+    """Decide which price feeds need to be pushed on-chain.
+
+    A feed is due when its off-chain price deviates from the last on-chain price by
+    at least the deviation threshold, or when the last on-chain update is older than
+    the heartbeat. Feeds without a known on-chain price are always due, while a price
+    not published after the last on-chain one never is.
+    """
+
+    def __init__(
+        self,
+        deviation_thresholds: dict[str, float],
+        heartbeats: dict[str, int],
+        default_deviation_threshold: float = DEFAULT_DEVIATION_THRESHOLD,
+        default_heartbeat: int = DEFAULT_HEARTBEAT,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._deviation_thresholds = deviation_thresholds
+        self._heartbeats = heartbeats
+        self._default_deviation_threshold = default_deviation_threshold
+        self._default_heartbeat = default_heartbeat
+        self._on_chain: dict[str, dict[str, int]] = {}
+
+    def on_chain_price(self, feed_id: str) -> dict[str, int] | None:
+        """Get the last known on-chain price and publish time of a feed."""
+        return self._on_chain.get(feed_id)
+
+    def record_push(self, feed_id: str, price: int, publish_time: int) -> None:
+        """Record a price that has landed on-chain, pushed by the agent or read from the chain."""
+        last = self._on_chain.get(feed_id)
+        if last is not None and last["publish_time"] >= publish_time:
+            return
+        self._on_chain[feed_id] = {"price": price, "publish_time": publish_time}
+
+    def is_fresh(self, feed_id: str, publish_time: int) -> bool:
+        """Check whether a price was published after the last known on-chain price."""
+        last = self._on_chain.get(feed_id)
+        return last is None or publish_time > last["publish_time"]
+
+    def push_reason(self, feed_id: str, price: int, now: float, publish_time: int | None = None) -> str | None:
+        """Get the reason a feed needs a push, or None if it does not."""
+        last = self._on_chain.get(feed_id)
+        if last is None:
+            return "unknown on-chain price"
+        if publish_time is not None and not self.is_fresh(feed_id, publish_time):
+            return None
+
+        heartbeat = self._heartbeats.get(feed_id, self._default_heartbeat)
+        if now - last["publish_time"] >= heartbeat:
+            return "heartbeat"
+
+        threshold = self._deviation_thresholds.get(feed_id, self._default_deviation_threshold)
+        if last["price"] == 0:
+            return "deviation" if price != 0 else None
+        deviation = abs(price - last["price"]) / abs(last["price"]) * 100
+        if deviation >= threshold:
+            return "deviation"
+        return None
+
+    def due_feeds(self, prices: dict[str, dict[str, Any]], now: float) -> dict[str, str]:
+        """Get the feeds that need a push, mapped to the reason they are due."""
+        due = {}
+        for feed_id, price in prices.items():
+            publish_time = price.get("publish_time")
+            reason = self.push_reason(
+                feed_id, int(price["price"]), now, None if publish_time is None else int(publish_time)
+            )
+            if reason is not None:
+                due[feed_id] = reason
+        return due
@@ -0,0 +1,414 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023
+#   Copyright 2023 valory-xyz
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""This module contains the strategy model of the pythora_abci_app skill."""
+
+from typing import Any
+from pathlib import Path
+from urllib.parse import urlencode
+
+from aea.skills.base import Model
+from aea.contracts.base import Contract, contract_registry
+from aea.configurations.loader import ComponentType, load_component_configuration
+from aea_ledger_ethereum import EthereumApi
+
+from packages.dakavon.contracts.pyth import PUBLIC_ID as PYTH_PUBLIC_ID
+from packages.eightballer.protocols.http.message import HttpMessage
+from packages.dakavon.contracts.multicall3 import PUBLIC_ID as MULTICALL3_PUBLIC_ID
+from packages.dakavon.contracts.pythoraentropy import PUBLIC_ID as PYTHORA_ENTROPY_PUBLIC_ID
+
+from packages.dakavon.skills.pythora_abci_app.rpc import DEFAULT_HEDGE_DELAY, DEFAULT_MAX_BLOCK_LAG
+from packages.dakavon.skills.pythora_abci_app.ledger import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RPC_TIMEOUT,
+    LedgerApiRegistry,
+)
+from packages.dakavon.skills.pythora_abci_app.gas import (
+    DEFAULT_FEE_CACHE_TTL,
+    DEFAULT_FEE_HISTORY_BLOCKS,
+    DEFAULT_GAS_ESTIMATE_MARGIN,
+    DEFAULT_PRIORITY_FEE_PERCENTILE,
+    GasOracle,
+)
+from packages.dakavon.skills.pythora_abci_app.hermes import (
+    DEFAULT_MAX_STALENESS,
+    HermesPriceStream,
+    normalise_feed_id,
+)
+from packages.dakavon.skills.pythora_abci_app.entropy import (
+    DEFAULT_CALLBACK_TIMEOUT,
+    DEFAULT_LOW_WATER_MARK,
+    DEFAULT_POOL_SIZE as DEFAULT_RANDOMNESS_POOL_SIZE,
+    FeeCache,
+    RandomnessPool,
+)
+from packages.dakavon.skills.pythora_abci_app.indexer import (
+    DEFAULT_DB_PATH,
+    DEFAULT_LOOK_BACK,
+    EventIndexer,
+)
+from packages.dakavon.skills.pythora_abci_app.metrics import MetricsSnapshot
+from packages.dakavon.skills.pythora_abci_app.nonce import (
+    DEFAULT_FEE_BUMP,
+    DEFAULT_STUCK_TIMEOUT,
+    NonceManager,
+)
+from packages.dakavon.skills.pythora_abci_app.scheduler import (
+    DEFAULT_HEARTBEAT,
+    DEFAULT_DEVIATION_THRESHOLD,
+    PushScheduler,
+)
+
+
+ROOT = Path(__file__).parent.parent.parent.parent
+
+DEFAULT_HERMES_URL = "https://hermes.pyth.network"
+DEFAULT_POLL_INTERVAL = 0.5  # seconds
+DEFAULT_PRIVATE_KEY_PATH = "ethereum_private_key.txt"
+DEFAULT_UPDATE_FEE_TTL = 300  # seconds, the Pyth fee only changes through governance
+DEFAULT_PRICE_FEEDS = [
+    {
+        "id": "0x0bbf28e9a841a1cc788f6a361b17ca072d0ea3098a1e5df1c3922d06719579ff",
+        "symbol": "PYTH/USD",
+    },
+]
+# the chains prices are pushed to, with a Pyth contract, and the chain randomness is
+# requested on, with the Pythora Entropy contract and the Pyth Entropy contract it uses
+DEFAULT_CHAINS = [
+    {
+        "name": "sepolia",
+        "chain_id": 11155111,
+        "rpc": ["https://sepolia.drpc.org", "https://ethereum-sepolia-rpc.publicnode.com"],
+        "pyth_address": "0xDd24F84d36BF92C65F92307595335bdFab5Bbd21",
+    },
+    {
+        "name": "arbitrum_sepolia",
+        "chain_id": 421614,
+        "rpc": ["https://sepolia-rollup.arbitrum.io/rpc", "https://arbitrum-sepolia-rpc.publicnode.com"],
+        "pythora_entropy_address": "0xb2Fa94AEe40Ad375D1bb65F5442f36DBFc0bD35a",
+        "entropy_address": "0x549Ebba8036Ab746611B4fFA1423eb0A4Df61440",
+    },
+]
+
+
+def load_contract(contract_path: Path) -> Contract:
+    """Helper function to load a contract."""
+    configuration = load_component_configuration(ComponentType.CONTRACT, contract_path)
+    configuration._directory = contract_path  # noqa
+    if str(configuration.public_id) not in contract_registry.specs:
+        # load contract into sys modules
+        Contract.from_config(configuration)
+    return contract_registry.make(str(configuration.public_id))
+
+
+class PythoraStrategy(Model):
+    """This class models the configuration of the Pythora agent."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Initialize the strategy."""
+        self.hermes_url = kwargs.pop("hermes_url", DEFAULT_HERMES_URL)
+        self.price_feeds = kwargs.pop("price_feeds", DEFAULT_PRICE_FEEDS)
+        self.chains = kwargs.pop("chains", DEFAULT_CHAINS)
+        self.poll_interval = kwargs.pop("poll_interval", DEFAULT_POLL_INTERVAL)
+        self.deviation_threshold = kwargs.pop("deviation_threshold", DEFAULT_DEVIATION_THRESHOLD)
+        self.heartbeat = kwargs.pop("heartbeat", DEFAULT_HEARTBEAT)
+        self.private_key_path = kwargs.pop("private_key_path", DEFAULT_PRIVATE_KEY_PATH)
+        self.rpc_pool_size = kwargs.pop("rpc_pool_size", DEFAULT_POOL_SIZE)
+        self.rpc_timeout = kwargs.pop("rpc_timeout", DEFAULT_RPC_TIMEOUT)
+        self.hedge_rpc_requests = kwargs.pop("hedge_rpc_requests", True)
+        self.hedge_delay = kwargs.pop("hedge_delay", DEFAULT_HEDGE_DELAY)
+        self.max_block_lag = kwargs.pop("max_block_lag", DEFAULT_MAX_BLOCK_LAG)
+        self.stuck_transaction_timeout = kwargs.pop("stuck_transaction_timeout", DEFAULT_STUCK_TIMEOUT)
+        self.fee_bump = kwargs.pop("fee_bump", DEFAULT_FEE_BUMP)
+        self.fee_history_blocks = kwargs.pop("fee_history_blocks", DEFAULT_FEE_HISTORY_BLOCKS)
+        self.priority_fee_percentile = kwargs.pop("priority_fee_percentile", DEFAULT_PRIORITY_FEE_PERCENTILE)
+        self.fee_cache_ttl = kwargs.pop("fee_cache_ttl", DEFAULT_FEE_CACHE_TTL)
+        self.gas_estimate_margin = kwargs.pop("gas_estimate_margin", DEFAULT_GAS_ESTIMATE_MARGIN)
+        self.use_price_stream = kwargs.pop("use_price_stream", True)
+        self.max_price_staleness = kwargs.pop("max_price_staleness", DEFAULT_MAX_STALENESS)
+        self.randomness_pool_size = kwargs.pop("randomness_pool_size", DEFAULT_RANDOMNESS_POOL_SIZE)
+        self.randomness_low_water_mark = kwargs.pop("randomness_low_water_mark", DEFAULT_LOW_WATER_MARK)
+        self.entropy_callback_timeout = kwargs.pop("entropy_callback_timeout", DEFAULT_CALLBACK_TIMEOUT)
+        self.batch_entropy_requests = kwargs.pop("batch_entropy_requests", False)
+        self.update_fee_ttl = kwargs.pop("update_fee_ttl", DEFAULT_UPDATE_FEE_TTL)
+        self.index_events = kwargs.pop("index_events", True)
+        self.events_db_path = kwargs.pop("events_db_path", DEFAULT_DB_PATH)
+        self.events_look_back = kwargs.pop("events_look_back", DEFAULT_LOOK_BACK)
+
+        Model.__init__(self, **kwargs)
+
+        self._validate_config()
+        self._symbols = {normalise_feed_id(feed["id"]): feed.get("symbol", feed["id"]) for feed in self.price_feeds}
+        # every chain has its own on-chain prices, so its own scheduler and update fee
+        self.schedulers = {
+            chain["name"]: PushScheduler(
+                deviation_thresholds={
+                    normalise_feed_id(feed["id"]): feed["deviation_threshold"]
+                    for feed in self.price_feeds
+                    if "deviation_threshold" in feed
+                },
+                heartbeats={
+                    normalise_feed_id(feed["id"]): feed["heartbeat"]
+                    for feed in self.price_feeds
+                    if "heartbeat" in feed
+                },
+                default_deviation_threshold=self.deviation_threshold,
+                default_heartbeat=self.heartbeat,
+            )
+            for chain in self.push_chains
+        }
+        self.ledger_apis = LedgerApiRegistry(
+            private_key_path=self.private_key_path,
+            pool_size=self.rpc_pool_size,
+            rpc_timeout=self.rpc_timeout,
+            hedge_requests=self.hedge_rpc_requests,
+            hedge_delay=self.hedge_delay,
+            max_block_lag=self.max_block_lag,
+        )
+        self.nonce_manager = NonceManager(
+            stuck_timeout=self.stuck_transaction_timeout,
+            fee_bump=self.fee_bump,
+        )
+        self.gas_oracle = GasOracle(
+            fee_history_blocks=self.fee_history_blocks,
+            priority_fee_percentile=self.priority_fee_percentile,
+            fee_cache_ttl=self.fee_cache_ttl,
+            gas_estimate_margin=self.gas_estimate_margin,
+        )
+        self.price_stream = HermesPriceStream(self.hermes_url, self.price_feed_ids)
+        self.randomness_pool = RandomnessPool(
+            size=self.randomness_pool_size,
+            low_water_mark=self.randomness_low_water_mark,
+            callback_timeout=self.entropy_callback_timeout,
+        )
+        # the fee of an entropy request, read once per block of the entropy chain
+        self.entropy_fee_cache = FeeCache()
+        # the Pyth fee of a single accumulator message, see `accumulator.count_updates`
+        self.update_fee_caches = {chain["name"]: FeeCache(ttl=self.update_fee_ttl) for chain in self.push_chains}
+        self.event_indexer = EventIndexer(db_path=self.events_db_path, look_back=self.events_look_back)
+        self.metrics = MetricsSnapshot()
+        # responses to the requests sent through the http client connection, by dialogue nonce
+        self.pending_http_requests: dict[str, HttpMessage | None] = {}
+        self.pyth_contract: Contract | None = None
+        self.pythora_entropy_contract: Contract | None = None
+        self.multicall_contract: Contract | None = None
+
+    def setup(self) -> None:
+        """Set up the strategy."""
+        # load the contracts, and parse their ABIs, once for all states
+        self.pyth_contract = load_contract(ROOT / PYTH_PUBLIC_ID.author / "contracts" / PYTH_PUBLIC_ID.name)
+        self.pythora_entropy_contract = load_contract(
+            ROOT / PYTHORA_ENTROPY_PUBLIC_ID.author / "contracts" / PYTHORA_ENTROPY_PUBLIC_ID.name
+        )
+        self.multicall_contract = load_contract(
+            ROOT / MULTICALL3_PUBLIC_ID.author / "contracts" / MULTICALL3_PUBLIC_ID.name
+        )
+        self.gas_oracle.logger = self.context.logger
+        self.price_stream.logger = self.context.logger
+        if self.use_price_stream:
+            self.price_stream.start()
+        # seed the schedulers with the prices already on-chain, e.g. pushed before a restart
+        for chain in self.push_chains:
+            self.refresh_on_chain_prices(chain)
+
+    def teardown(self) -> None:
+        """Tear down the strategy."""
+        self.price_stream.stop()
+        self.ledger_apis.close()
+        self.event_indexer.close()
+
+    def _validate_config(self) -> None:
+        """Ensure the configuration settings are all valid."""
+        msg = []
+        if not isinstance(self.hermes_url, str):
+            msg.append("'hermes_url' must be provided as a string")
+        if not isinstance(self.price_feeds, list) or not self.price_feeds:
+            msg.append("'price_feeds' must be provided as a non-empty list")
+        else:
+            for ind, feed in enumerate(self.price_feeds):
+                if not isinstance(feed, dict) or not isinstance(feed.get("id"), str):
+                    msg.append(f"price feed {ind} must be a dict including the key 'id'")
+        msg.extend(self._validate_chains())
+        if not isinstance(self.poll_interval, int | float) or self.poll_interval <= 0:
+            msg.append("'poll_interval' must be provided as a positive number")
+        if not isinstance(self.deviation_threshold, int | float) or self.deviation_threshold < 0:
+            msg.append("'deviation_threshold' must be provided as a non-negative number")
+        if not isinstance(self.heartbeat, int) or self.heartbeat <= 0:
+            msg.append("'heartbeat' must be provided as a positive integer")
+        if not isinstance(self.private_key_path, str):
+            msg.append("'private_key_path' must be provided as a string")
+        if not isinstance(self.rpc_pool_size, int) or self.rpc_pool_size <= 0:
+            msg.append("'rpc_pool_size' must be provided as a positive integer")
+        if not isinstance(self.rpc_timeout, int | float) or self.rpc_timeout <= 0:
+            msg.append("'rpc_timeout' must be provided as a positive number")
+        if not isinstance(self.hedge_rpc_requests, bool):
+            msg.append("'hedge_rpc_requests' must be provided as a bool")
+        if not isinstance(self.hedge_delay, int | float) or self.hedge_delay < 0:
+            msg.append("'hedge_delay' must be provided as a non-negative number")
+        if not isinstance(self.max_block_lag, int) or self.max_block_lag < 0:
+            msg.append("'max_block_lag' must be provided as a non-negative integer")
+        if not isinstance(self.stuck_transaction_timeout, int | float) or self.stuck_transaction_timeout <= 0:
+            msg.append("'stuck_transaction_timeout' must be provided as a positive number")
+        if not isinstance(self.fee_bump, int | float) or self.fee_bump < 1.1:
+            msg.append("'fee_bump' must be provided as a number of at least 1.1")
+        if not isinstance(self.fee_history_blocks, int) or self.fee_history_blocks <= 0:
+            msg.append("'fee_history_blocks' must be provided as a positive integer")
+        if not isinstance(self.priority_fee_percentile, int | float) or not 0 <= self.priority_fee_percentile <= 100:
+            msg.append("'priority_fee_percentile' must be provided as a number between 0 and 100")
+        if not isinstance(self.fee_cache_ttl, int | float) or self.fee_cache_ttl < 0:
+            msg.append("'fee_cache_ttl' must be provided as a non-negative number")
+        if not isinstance(self.gas_estimate_margin, int | float) or self.gas_estimate_margin < 1:
+            msg.append("'gas_estimate_margin' must be provided as a number of at least 1")
+        if not isinstance(self.use_price_stream, bool):
+            msg.append("'use_price_stream' must be provided as a bool")
+        if not isinstance(self.max_price_staleness, int | float) or self.max_price_staleness <= 0:
+            msg.append("'max_price_staleness' must be provided as a positive number")
+        if not isinstance(self.randomness_pool_size, int) or self.randomness_pool_size <= 0:
+            msg.append("'randomness_pool_size' must be provided as a positive integer")
+        if (
+            not isinstance(self.randomness_low_water_mark, int)
+            or not 0 < self.randomness_low_water_mark <= self.randomness_pool_size
+        ):
+            msg.append("'randomness_low_water_mark' must be provided as a positive integer up to the pool size")
+        if not isinstance(self.entropy_callback_timeout, int | float) or self.entropy_callback_timeout <= 0:
+            msg.append("'entropy_callback_timeout' must be provided as a positive number")
+        if not isinstance(self.batch_entropy_requests, bool):
+            msg.append("'batch_entropy_requests' must be provided as a bool")
+        if not isinstance(self.update_fee_ttl, int | float) or self.update_fee_ttl < 0:
+            msg.append("'update_fee_ttl' must be provided as a non-negative number")
+        if not isinstance(self.index_events, bool):
+            msg.append("'index_events' must be provided as a bool")
+        if not isinstance(self.events_db_path, str):
+            msg.append("'events_db_path' must be provided as a string")
+        if not isinstance(self.events_look_back, int) or self.events_look_back < 0:
+            msg.append("'events_look_back' must be provided as a non-negative integer")
+
+        if msg:
+            raise ValueError("Invalid skill configuration: " + ",".join(msg))
+
+    def _validate_chains(self) -> list[str]:
+        """Ensure the chain registry is valid."""
+        if not isinstance(self.chains, list) or not self.chains:
+            return ["'chains' must be provided as a non-empty list"]
+        msg = []
+        feed_ids = {
+            normalise_feed_id(feed["id"])
+            for feed in self.price_feeds
+            if isinstance(feed, dict) and isinstance(feed.get("id"), str)
+        }
+        names = set()
+        for ind, chain in enumerate(self.chains):
+            if (
+                not isinstance(chain, dict)
+                or not isinstance(chain.get("name"), str)
+                or not isinstance(chain.get("chain_id"), int)
+                or not (
+                    isinstance(chain.get("rpc"), str)
+                    or isinstance(chain.get("rpc"), list)
+                    and chain["rpc"]
+                    and all(isinstance(url, str) for url in chain["rpc"])
+                )
+            ):
+                msg.append(
+                    f"chain {ind} must be a dict including the keys 'name', 'chain_id' and 'rpc', "
+                    "one RPC url or a list of them"
+                )
+                continue
+            if chain["name"] in names:
+                msg.append(f"chain name '{chain['name']}' must be unique")
+            names.add(chain["name"])
+            if "pythora_entropy_address" in chain and "entropy_address" not in chain:
+                msg.append(f"chain '{chain['name']}' must include the key 'entropy_address'")
+            chain_feeds = chain.get("price_feeds", [])
+            if not isinstance(chain_feeds, list) or not {
+                normalise_feed_id(feed_id) for feed_id in chain_feeds if isinstance(feed_id, str)
+            } <= feed_ids:
+                msg.append(f"the price feeds of chain '{chain['name']}' must be configured in 'price_feeds'")
+        if not msg and not self.push_chains:
+            msg.append("a chain must include the key 'pyth_address'")
+        if not msg and sum(1 for chain in self.chains if "pythora_entropy_address" in chain) != 1:
+            msg.append("exactly one chain must include the key 'pythora_entropy_address'")
+        return msg
+
+    @property
+    def push_chains(self) -> list[dict[str, Any]]:
+        """Get the chains the prices are pushed to."""
+        return [chain for chain in self.chains if "pyth_address" in chain]
+
+    @property
+    def entropy_chain(self) -> dict[str, Any]:
+        """Get the chain randomness is requested on."""
+        return next(chain for chain in self.chains if "pythora_entropy_address" in chain)
+
+    def chain_feed_ids(self, chain: dict[str, Any]) -> list[str]:
+        """Get the ids of the price feeds pushed to a chain, all configured feeds by default."""
+        if "price_feeds" not in chain:
+            return self.price_feed_ids
+        return [normalise_feed_id(feed_id) for feed_id in chain["price_feeds"]]
+
+    def ledger_api(self, chain: dict[str, Any]) -> EthereumApi:
+        """Get the shared ledger api of a chain."""
+        return self.ledger_apis.get(chain["rpc"], chain["chain_id"])
+
+    def refresh_on_chain_prices(self, chain: dict[str, Any]) -> None:
+        """Record the prices of the Pyth contract of a chain in its scheduler, in one call.
+
+        The scheduler then also knows the prices pushed by other agents. A feed never
+        pushed to the chain reverts, and stays unknown.
+        """
+        feed_ids = self.chain_feed_ids(chain)
+        try:
+            results = self.multicall_contract.batch_read(
+                ledger_api=self.ledger_api(chain),
+                calls=[
+                    (self.pyth_contract, chain["pyth_address"], "getPriceUnsafe", (feed_id,)) for feed_id in feed_ids
+                ],
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            self.context.logger.warning("Error reading the on-chain prices on %s: %s", chain["name"], err)
+            return
+
+        scheduler = self.schedulers[chain["name"]]
+        for feed_id, price in zip(feed_ids, results["results"], strict=True):
+            if price is None:
+                continue
+            raw_price, _, _, publish_time = price
+            if publish_time > 0:
+                scheduler.record_push(feed_id, raw_price, publish_time)
+
+    @property
+    def price_feed_ids(self) -> list[str]:
+        """Get the ids of all configured price feeds."""
+        return list(self._symbols)
+
+    def symbol(self, feed_id: str) -> str:
+        """Get the human readable symbol of a price feed."""
+        return self._symbols.get(normalise_feed_id(feed_id), feed_id)
+
+    def latest_update(self, feed_ids: list[str]) -> tuple[list[str], dict[str, dict[str, int]]] | None:
+        """Get fresh update data and prices of the given feeds from the price stream, if available."""
+        if not self.use_price_stream:
+            return None
+        return self.price_stream.latest_update(feed_ids, self.max_price_staleness)
+
+    def hermes_latest_url(self, feed_ids: list[str], parsed: bool = False) -> str:
+        """Build the Hermes url returning one combined update for all the given feeds."""
+        query = [("ids[]", feed_id) for feed_id in feed_ids]
+        query += [("encoding", "hex"), ("parsed", str(parsed).lower())]
+        return f"{self.hermes_url}/v2/updates/price/latest?{urlencode(query)}"
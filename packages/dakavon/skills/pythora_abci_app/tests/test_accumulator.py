@@ -0,0 +1,94 @@
+"""Test the accumulator update decoder of the pythora_abci_app skill."""
+
+import pytest
+
+from packages.dakavon.skills.pythora_abci_app.accumulator import (
+    MERKLE_LEAF_PREFIX,
+    MERKLE_NODE_PREFIX,
+    AccumulatorError,
+    keccak160,
+    count_updates,
+    select_updates,
+    parse_update_prices,
+    parse_accumulator_update,
+)
+
+
+FEED_A = "0x" + "aa" * 32
+FEED_B = "0x" + "bb" * 32
+
+
+def price_feed_message(feed_id: str, price: int, publish_time: int) -> bytes:
+    """Encode a price feed message."""
+    return (
+        b"\x00"
+        + bytes.fromhex(feed_id[2:])
+        + price.to_bytes(8, "big", signed=True)
+        + (5).to_bytes(8, "big")
+        + (-8).to_bytes(4, "big", signed=True)
+        + publish_time.to_bytes(8, "big", signed=True)
+        + (publish_time - 1).to_bytes(8, "big", signed=True)
+        + price.to_bytes(8, "big", signed=True)
+        + (5).to_bytes(8, "big")
+    )
+
+
+def accumulator_update(messages: list[bytes], tamper: bool = False) -> str:
+    """Encode a hex accumulator update of two messages with their merkle proofs."""
+    leaves = [keccak160(MERKLE_LEAF_PREFIX + message) for message in messages]
+    root = keccak160(MERKLE_NODE_PREFIX + min(leaves) + max(leaves))
+    payload = b"AUWV" + b"\x00" + (42).to_bytes(8, "big") + (10_000).to_bytes(4, "big") + root
+    vaa = b"\x01" + (4).to_bytes(4, "big") + b"\x01" + b"\x00" * 66 + b"\x00" * (4 + 4 + 2 + 32 + 8 + 1) + payload
+    data = b"PNAU" + b"\x01\x00" + b"\x00" + b"\x00" + len(vaa).to_bytes(2, "big") + vaa
+    data += len(messages).to_bytes(1, "big")
+    for message, sibling in zip(messages, reversed(leaves), strict=True):
+        encoded = message[:-1] + b"\xff" if tamper else message
+        data += len(encoded).to_bytes(2, "big") + encoded + b"\x01" + sibling
+    return data.hex()
+
+
+def test_parse_accumulator_update():
+    """Test the messages, slot and merkle root of an update are decoded."""
+    messages = [price_feed_message(FEED_A, 100, 1000), price_feed_message(FEED_B, -7, 1001)]
+    update = parse_accumulator_update("0x" + accumulator_update(messages))
+    assert update["slot"] == 42
+    assert [u["price_feed"]["id"] for u in update["updates"]] == [FEED_A, FEED_B]
+    assert update["updates"][1]["price_feed"]["price"] == -7
+    assert update["updates"][1]["price_feed"]["expo"] == -8
+
+
+def test_parse_update_prices():
+    """Test the prices have the shape of the prices parsed by Hermes, and the fee counts every message."""
+    update_data = [accumulator_update([price_feed_message(FEED_A, 100, 1000), price_feed_message(FEED_B, 7, 1001)])]
+    assert parse_update_prices(update_data) == {
+        FEED_A: {"price": 100, "expo": -8, "publish_time": 1000},
+        FEED_B: {"price": 7, "expo": -8, "publish_time": 1001},
+    }
+    assert count_updates(update_data) == 2
+
+
+def test_invalid_proof_is_rejected():
+    """Test a message not committed to by the merkle root fails verification."""
+    update_data = accumulator_update(
+        [price_feed_message(FEED_A, 100, 1000), price_feed_message(FEED_B, 7, 1001)], tamper=True
+    )
+    with pytest.raises(AccumulatorError):
+        parse_accumulator_update(update_data)
+    assert len(parse_accumulator_update(update_data, verify=False)["updates"]) == 2
+
+
+def test_truncated_update_is_rejected():
+    """Test a truncated update raises instead of being misread."""
+    update_data = accumulator_update([price_feed_message(FEED_A, 100, 1000), price_feed_message(FEED_B, 7, 1001)])
+    with pytest.raises(AccumulatorError):
+        parse_accumulator_update(update_data[:-10])
+
+
+def test_select_updates():
+    """Test an update re-encoded for some of its feeds keeps their verified messages only."""
+    update_data = [accumulator_update([price_feed_message(FEED_A, 100, 1000), price_feed_message(FEED_B, 7, 1001)])]
+    selected = select_updates(update_data, [FEED_B.upper().replace("0X", "0x")])
+    assert parse_update_prices(selected) == {FEED_B: {"price": 7, "expo": -8, "publish_time": 1001}}
+    assert count_updates(selected) == 1
+    assert select_updates(update_data, [FEED_A, FEED_B]) == update_data
+    assert select_updates(update_data, []) == []
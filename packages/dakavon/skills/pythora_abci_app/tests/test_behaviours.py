@@ -0,0 +1,224 @@
+"""Test the behaviours of the pythora_abci_app skill."""
+
+from typing import Any, cast
+from pathlib import Path
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import pytest
+from aea.test_tools.test_skill import BaseSkillTestCase
+
+from packages.dakavon.skills.pythora_abci_app import PUBLIC_ID
+from packages.dakavon.skills.pythora_abci_app.strategy import PythoraStrategy
+from packages.dakavon.skills.pythora_abci_app.accumulator import count_updates, parse_update_prices
+from packages.dakavon.skills.pythora_abci_app.behaviours import (
+    BaseState,
+    RegistrationRound,
+    ResetAndPauseRound,
+    PythoraabciappEvents,
+    PythoraabciappStates,
+    UpdatePriceDataRound,
+    PythoraabciappFsmBehaviour,
+    ConsumePriceAndPrintMessageRound,
+)
+from packages.dakavon.skills.pythora_abci_app.tests.test_accumulator import accumulator_update, price_feed_message
+
+
+ROOT_DIR = Path(__file__).parent.parent.parent.parent.parent.parent
+
+FEED_ID = "0x" + "ab" * 32
+
+
+def one_step(value=None):
+    """Make a generator which yields once and returns the given value."""
+    yield
+    return value
+
+
+def loaded_globals(state: BaseState) -> dict[str, Any]:
+    """Get the globals of the behaviours module a state was loaded from.
+
+    aea loads the skill modules under names of their own, so these are not the globals imported by the tests.
+    """
+    return type(state).sleep.__globals__
+
+
+class TestPythoraabciappFsmBehaviour(BaseSkillTestCase):
+    """Test the states of PythoraabciappFsmBehaviour."""
+
+    path_to_skill = Path(ROOT_DIR, "packages", PUBLIC_ID.author, "skills", PUBLIC_ID.name)
+
+    @classmethod
+    def setup(cls):  # pylint: disable=W0221
+        """Setup the test class."""
+        super().setup_class()
+        cls.fsm_behaviour = cast(PythoraabciappFsmBehaviour, cls._skill.skill_context.behaviours.main)
+        cls.strategy = cast(PythoraStrategy, cls._skill.skill_context.strategy)
+        cls.strategy.pyth_contract = MagicMock()
+        cls.strategy.pythora_entropy_contract = MagicMock()
+        cls.strategy.multicall_contract = MagicMock()
+
+    def get_state(self, state: PythoraabciappStates):
+        """Get a state of the fsm."""
+        return self.fsm_behaviour.get_state(state.value)
+
+    def test_waiting_state_yields_to_the_agent_loop(self):
+        """Test a state waiting for due feeds returns from act instead of blocking it."""
+        state = cast(ResetAndPauseRound, self.get_state(PythoraabciappStates.RESETANDPAUSEROUND))
+        due_feeds = iter([{}, {"sepolia": {FEED_ID: "heartbeat"}}])
+        with patch.object(state, "get_due_feeds", side_effect=lambda: one_step(next(due_feeds))), patch.object(
+            state, "sleep", side_effect=lambda _: one_step()
+        ):
+            state.act()
+            assert not state.is_done()
+            state.act()
+            state.act()
+            assert not state.is_done()
+            state.act()
+        assert state.is_done()
+        assert state.event == loaded_globals(state)["PythoraabciappEvents"].DONE
+        assert state.event.value == PythoraabciappEvents.DONE.value
+        assert self.skill.skill_context.shared_state.pop("feeds_to_push") == {"sepolia": [FEED_ID]}
+
+    def test_wait_for_transaction_polls_without_blocking(self):
+        """Test waiting for a receipt polls once per step until the transaction is mined."""
+        state = cast(UpdatePriceDataRound, self.get_state(PythoraabciappStates.UPDATEPRICEDATAROUND))
+        receipt = MagicMock(status=1)
+        with patch.object(
+            state, "poll_transaction", side_effect=[None, None, receipt]
+        ) as poll_transaction, patch.dict(loaded_globals(state), RECEIPT_POLL_INTERVAL=0), patch.object(
+            state, "sleep", side_effect=lambda _: one_step()
+        ) as sleep:
+            steps = state.wait_for_transaction(MagicMock(), 1, MagicMock(nonce=0))
+            next(steps)
+            assert poll_transaction.call_count == 1
+            next(steps)
+            try:
+                next(steps)
+            except StopIteration as stop:
+                assert stop.value is receipt
+        assert poll_transaction.call_count == 3
+        sleep.assert_called_with(0)
+
+    def test_states_share_ledger_apis_and_crypto(self):
+        """Test every state gets the same pooled ledger api and crypto."""
+        registration = cast(RegistrationRound, self.get_state(PythoraabciappStates.REGISTRATIONROUND))
+        update = cast(UpdatePriceDataRound, self.get_state(PythoraabciappStates.UPDATEPRICEDATAROUND))
+        assert registration.entropy_ledger_api is update.entropy_ledger_api
+        assert registration.entropy_ledger_api is self.strategy.ledger_api(self.strategy.entropy_chain)
+        with patch.object(self.strategy.ledger_apis, "_crypto", MagicMock()):
+            assert registration.crypto is update.crypto
+
+    def test_random_numbers_are_requested_in_one_transaction(self):
+        """Test a batch of random numbers is requested by a single transaction paying every fee."""
+        state = cast(RegistrationRound, self.get_state(PythoraabciappStates.REGISTRATIONROUND))
+        entropy_contract = self.strategy.pythora_entropy_contract
+        entropy_contract.get_fee.reset_mock()
+        entropy_contract.get_fee.return_value = {"fee": 10}
+        self.strategy.entropy_fee_cache.invalidate()
+        ledger_api = MagicMock()
+        ledger_api.api.eth.block_number = 20
+        with patch.object(state, "submit_transaction", return_value=MagicMock()) as submit_transaction, patch.object(
+            type(state), "entropy_ledger_api", new_callable=PropertyMock, return_value=ledger_api
+        ):
+            assert state.request_random_numbers(3)
+            assert state.request_random_numbers(1)
+        user_random_numbers = entropy_contract.request_random_numbers.call_args.kwargs["user_random_numbers"]
+        assert len(user_random_numbers) == 3
+        assert submit_transaction.call_args_list[0].kwargs["value"] == 30
+        assert submit_transaction.call_args_list[0].kwargs["shape"] == 3
+        # the fee is read once per block
+        entropy_contract.get_fee.assert_called_once()
+
+    def test_pushed_prices_are_printed_without_a_read(self):
+        """Test the prices decoded from the push receipt are printed without reading the Pyth contract."""
+        state = cast(
+            ConsumePriceAndPrintMessageRound, self.get_state(PythoraabciappStates.CONSUMEPRICEANDPRINTMESSAGEROUND)
+        )
+        chain = self.strategy.push_chains[0]
+        multicall_contract = self.strategy.multicall_contract
+        multicall_contract.reset_mock()
+        state.print_prices(chain, [FEED_ID], {FEED_ID: {"price": 12345, "expo": -2}})
+        multicall_contract.batch_read.assert_not_called()
+
+        multicall_contract.batch_read.return_value = {"results": [(678, 0, -1, 0)]}
+        state.print_prices(chain, [FEED_ID], {})
+        multicall_contract.batch_read.assert_called_once()
+
+        # a read not answering every feed is logged, not zipped short
+        multicall_contract.batch_read.return_value = {"results": []}
+        with patch.object(state.context.logger, "warning") as warning:
+            state.print_prices(chain, [FEED_ID], {})
+        assert warning.call_args_list[0].args[0].startswith("Expected %s prices")
+
+    def test_pushed_prices_are_decoded_from_the_receipt(self):
+        """Test the prices of a push are read from its PriceFeedUpdate events."""
+        state = cast(UpdatePriceDataRound, self.get_state(PythoraabciappStates.UPDATEPRICEDATAROUND))
+        instance = self.strategy.pyth_contract.get_instance.return_value
+        instance.events.PriceFeedUpdate.return_value.process_receipt.return_value = [
+            {"args": {"id": bytes.fromhex(FEED_ID[2:]), "price": 12345, "publishTime": 100}},
+            {"args": {"id": b"\x01" * 32, "price": 1, "publishTime": 100}},
+        ]
+        pushed_prices = state.get_pushed_prices(
+            self.strategy.push_chains[0], MagicMock(), {FEED_ID: {"price": 12000, "expo": -2, "publish_time": 99}}
+        )
+        assert pushed_prices == {FEED_ID: {"price": 12345, "expo": -2, "publish_time": 100}}
+
+    def test_entropy_rpc_errors_are_retried_next_cycle(self):
+        """Test an RPC error while requesting or collecting random numbers does not stop the round."""
+        state = cast(RegistrationRound, self.get_state(PythoraabciappStates.REGISTRATIONROUND))
+        entropy_contract = self.strategy.pythora_entropy_contract
+        entropy_contract.get_fee.side_effect = ConnectionError("rpc down")
+        self.strategy.entropy_fee_cache.invalidate()
+        with patch.object(state, "submit_transaction") as submit_transaction:
+            assert not state.request_random_numbers(1)
+        submit_transaction.assert_not_called()
+        entropy_contract.get_fee.side_effect = None
+
+        request = {"user_random_numbers": ["0x01"], "pending_tx": MagicMock()}
+        state._pending_requests.append(request)  # pylint: disable=W0212
+        with patch.object(state, "poll_transaction", side_effect=ConnectionError("rpc down")):
+            state.collect_random_numbers()
+        assert state._pending_requests == [request]  # pylint: disable=W0212
+        state._pending_requests.clear()  # pylint: disable=W0212
+
+        ledger_api = MagicMock()
+        ledger_api.api.eth.block_number = 20
+        entropy_contract.get_pythora_entropy_callback_events.side_effect = ConnectionError("rpc down")
+        self.strategy.randomness_pool.watch(1, from_block=10)
+        with patch.object(type(state), "entropy_ledger_api", new_callable=PropertyMock, return_value=ledger_api):
+            state.collect_random_numbers()
+        entropy_contract.get_pythora_entropy_callback_events.side_effect = None
+        assert self.strategy.randomness_pool.watcher.watched == {1}
+
+    def test_only_fresh_feeds_are_pushed_and_paid_for(self):
+        """Test the feeds already up to date on-chain are dropped from the pushed update and its fee."""
+        state = cast(UpdatePriceDataRound, self.get_state(PythoraabciappStates.UPDATEPRICEDATAROUND))
+        chain = self.strategy.push_chains[0]
+        stale_feed, fresh_feed = "0x" + "aa" * 32, "0x" + "bb" * 32
+        update_data = [
+            accumulator_update([price_feed_message(stale_feed, 100, 1000), price_feed_message(fresh_feed, 7, 1001)])
+        ]
+        self.strategy.schedulers[chain["name"]].record_push(stale_feed, 100, 1000)
+        self.strategy.update_fee_caches[chain["name"]].invalidate()
+        pyth_contract = self.strategy.pyth_contract
+        pyth_contract.get_update_fee.return_value = {"feeAmount": 5}
+        with patch.object(state, "submit_transaction", return_value=MagicMock()) as submit_transaction, patch.object(
+            state, "wait_for_transaction", side_effect=lambda *_: one_step(MagicMock(status=1))
+        ), patch.object(state, "get_pushed_prices", return_value={}):
+            steps = state.push_prices(
+                chain,
+                {
+                    "price_update_data": update_data,
+                    "price_feed_ids": [stale_feed, fresh_feed],
+                    "price_updates": parse_update_prices(update_data),
+                },
+            )
+            next(steps)
+            with pytest.raises(StopIteration):
+                next(steps)
+        pushed_update = pyth_contract.update_price_feeds_if_necessary.call_args.kwargs["update_data"]
+        pushed_data = [data[2:] for data in pushed_update]
+        assert list(parse_update_prices(pushed_data)) == [fresh_feed]
+        assert count_updates(pushed_data) == 1
+        assert pyth_contract.get_update_fee.call_args.kwargs["update_data"] == pushed_update
+        assert submit_transaction.call_args.kwargs["value"] == 5
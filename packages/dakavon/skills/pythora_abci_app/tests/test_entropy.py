@@ -0,0 +1,122 @@
+"""Test the entropy helpers of the pythora_abci_app skill."""
+
+from unittest.mock import MagicMock
+
+from packages.dakavon.skills.pythora_abci_app.entropy import (
+    FeeCache,
+    RandomnessPool,
+    EntropyCallbackWatcher,
+)
+
+
+def callback(sequence_number: int, random_number: bytes) -> dict:
+    """Make a PythoraEntropyCallback event."""
+    return {"args": {"sequenceNumber": sequence_number, "randomNumber": random_number}}
+
+
+class TestEntropyCallbackWatcher:
+    """Test EntropyCallbackWatcher."""
+
+    def setup_method(self):
+        """Set up the test."""
+        self.watcher = EntropyCallbackWatcher(max_block_range=10)
+
+    def test_nothing_is_scanned_when_not_watching(self):
+        """Test no logs are requested without a watched sequence number."""
+        get_events = MagicMock(return_value=[])
+        assert self.watcher.poll(100, get_events) == {}
+        get_events.assert_not_called()
+
+    def test_blocks_are_scanned_once(self):
+        """Test the cursor moves past the scanned blocks, in chunks of the maximum range."""
+        get_events = MagicMock(return_value=[])
+        self.watcher.watch(7, from_block=100)
+        self.watcher.poll(115, get_events)
+        self.watcher.poll(115, get_events)
+        self.watcher.poll(116, get_events)
+        assert [call.args for call in get_events.call_args_list] == [(100, 109), (110, 115), (116, 116)]
+
+    def test_callback_is_consumed(self):
+        """Test the random number of a watched sequence number is returned once."""
+        self.watcher.watch(7, from_block=100)
+        get_events = MagicMock(return_value=[callback(6, b"\x01"), callback(7, b"\x02")])
+        assert self.watcher.poll(105, get_events) == {7: b"\x02"}
+        assert not self.watcher.watched
+
+    def test_late_callback_is_consumed(self):
+        """Test an older sequence number stays watched until its callback lands."""
+        self.watcher.watch(7, from_block=100)
+        self.watcher.poll(105, MagicMock(return_value=[]))
+        self.watcher.watch(8, from_block=110)
+        get_events = MagicMock(return_value=[callback(7, b"\x01")])
+        assert self.watcher.poll(112, get_events) == {7: b"\x01"}
+        assert get_events.call_args.args == (106, 112)
+        assert self.watcher.watched == {8}
+
+
+class TestRandomnessPool:
+    """Test RandomnessPool."""
+
+    def setup_method(self):
+        """Set up the test."""
+        self.pool = RandomnessPool(size=4, low_water_mark=2, callback_timeout=60)
+
+    def test_refill_below_low_water_mark(self):
+        """Test the pool is refilled to its size once it drops below the low water mark."""
+        assert self.pool.shortfall() == 4
+        assert self.pool.shortfall(unmined_requests=1) == 3
+        assert self.pool.shortfall(unmined_requests=2) == 0
+
+    def test_random_numbers_are_handed_out_in_order(self):
+        """Test the random numbers are added once their callback lands and taken oldest first."""
+        self.pool.watch(1, from_block=10)
+        self.pool.watch(2, from_block=11)
+        assert self.pool.shortfall() == 0
+        self.pool.poll(20, MagicMock(return_value=[callback(2, b"\x02"), callback(1, b"\x01")]))
+        assert len(self.pool) == 2
+        assert self.pool.take() == (2, b"\x02")
+        assert self.pool.take() == (1, b"\x01")
+        assert self.pool.take() is None
+
+    def test_late_requests_are_replaced(self):
+        """Test a request whose callback is late no longer counts towards the pool."""
+        self.pool.watch(1, from_block=10)
+        self.pool.watch(2, from_block=10)
+        self.pool._awaiting[1] -= 120  # pylint: disable=W0212
+        assert self.pool.awaiting() == 1
+        assert self.pool.shortfall() == 3
+        self.pool.poll(20, MagicMock(return_value=[callback(1, b"\x01")]))
+        assert self.pool.take() == (1, b"\x01")
+
+    def test_lost_callbacks_are_given_up(self):
+        """Test a request whose callback never lands stops being watched and scanned for."""
+        self.pool.watch(1, from_block=10)
+        self.pool._awaiting[1] -= 60 * 4 + 1  # pylint: disable=W0212
+        get_events = MagicMock(return_value=[])
+        assert self.pool.poll(20, get_events) == {}
+        get_events.assert_not_called()
+        assert not self.pool.watcher.watched
+        assert self.pool.shortfall() == 4
+
+
+class TestFeeCache:
+    """Test FeeCache."""
+
+    def test_fee_is_cached_until_invalidated(self):
+        """Test the fee is fetched once within the ttl and again after invalidation."""
+        cache = FeeCache(ttl=60)
+        fetch = MagicMock(side_effect=[100, 200])
+        assert cache.get(fetch) == 100
+        assert cache.get(fetch) == 100
+        cache.invalidate()
+        assert cache.get(fetch) == 200
+        assert fetch.call_count == 2
+
+    def test_fee_is_cached_per_block(self):
+        """Test a fee read at a block is fetched again at the next block only."""
+        cache = FeeCache(ttl=0)
+        fetch = MagicMock(side_effect=[100, 200])
+        assert cache.get(fetch, block_number=10) == 100
+        assert cache.get(fetch, block_number=10) == 100
+        assert cache.get(fetch, block_number=11) == 200
+        assert fetch.call_count == 2
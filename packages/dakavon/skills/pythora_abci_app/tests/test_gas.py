@@ -0,0 +1,61 @@
+"""Test the gas oracle of the pythora_abci_app skill."""
+
+from unittest.mock import MagicMock
+
+from packages.dakavon.skills.pythora_abci_app.gas import GasOracle
+
+
+CHAIN_ID = 11155111
+
+
+def make_ledger_api() -> MagicMock:
+    """Make a ledger api with a fixed fee history."""
+    ledger_api = MagicMock()
+    ledger_api.api.eth.fee_history.return_value = {
+        "baseFeePerGas": [90, 95, 100],
+        "reward": [[3], [1], [2]],
+    }
+    ledger_api.api.eth.gas_price = 1000
+    return ledger_api
+
+
+class TestGasOracle:
+    """Test GasOracle."""
+
+    def setup_method(self):
+        """Set up the test."""
+        self.gas_oracle = GasOracle(fee_cache_ttl=60, gas_estimate_margin=1.5)
+
+    def test_fees_from_history(self):
+        """Test the fees are computed from the next base fee and the median reward."""
+        ledger_api = make_ledger_api()
+        assert self.gas_oracle.fees(CHAIN_ID, ledger_api) == {"maxFeePerGas": 202, "maxPriorityFeePerGas": 2}
+
+    def test_fees_are_cached(self):
+        """Test the fee history is only fetched once within the cache ttl."""
+        ledger_api = make_ledger_api()
+        self.gas_oracle.fees(CHAIN_ID, ledger_api)
+        self.gas_oracle.fees(CHAIN_ID, ledger_api)
+        assert ledger_api.api.eth.fee_history.call_count == 1
+
+    def test_legacy_fallback(self):
+        """Test the legacy gas price is used when the fee history is not available."""
+        ledger_api = make_ledger_api()
+        ledger_api.api.eth.fee_history.side_effect = ValueError("not supported")
+        assert self.gas_oracle.fees(CHAIN_ID, ledger_api) == {"gasPrice": 1100}
+
+    def test_gas_estimates_are_cached_per_shape(self):
+        """Test gas is estimated once per calldata shape."""
+        estimate = MagicMock(return_value=100_000)
+        assert self.gas_oracle.estimate_gas(CHAIN_ID, ("updatePriceFeeds", 1), estimate, default=1) == 150_000
+        assert self.gas_oracle.estimate_gas(CHAIN_ID, ("updatePriceFeeds", 1), estimate, default=1) == 150_000
+        assert estimate.call_count == 1
+        self.gas_oracle.estimate_gas(CHAIN_ID, ("updatePriceFeeds", 2), estimate, default=1)
+        assert estimate.call_count == 2
+
+    def test_failed_estimate_uses_default(self):
+        """Test the default gas is used, and not cached, when the estimation fails."""
+        estimate = MagicMock(side_effect=ValueError("execution reverted"))
+        assert self.gas_oracle.estimate_gas(CHAIN_ID, "shape", estimate, default=500_000) == 500_000
+        self.gas_oracle.estimate_gas(CHAIN_ID, "shape", estimate, default=500_000)
+        assert estimate.call_count == 2
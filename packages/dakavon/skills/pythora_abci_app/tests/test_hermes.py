@@ -0,0 +1,56 @@
+"""Test the Hermes price stream of the pythora_abci_app skill."""
+
+from unittest.mock import MagicMock
+
+from packages.dakavon.skills.pythora_abci_app.hermes import HermesPriceStream
+
+
+FEED_A = "0x" + "aa" * 32
+FEED_B = "0x" + "bb" * 32
+
+
+def make_event(feed_ids: list[str], data: str, publish_time: int = 1) -> dict:
+    """Make a parsed Hermes update event."""
+    return {
+        "binary": {"encoding": "hex", "data": [data]},
+        "parsed": [
+            {"id": feed_id[2:], "price": {"price": "100", "expo": -8, "publish_time": publish_time}}
+            for feed_id in feed_ids
+        ],
+    }
+
+
+class TestHermesPriceStream:
+    """Test HermesPriceStream."""
+
+    def setup_method(self):
+        """Set up the test."""
+        self.stream = HermesPriceStream("https://hermes.pyth.network", [FEED_A, FEED_B])
+
+    def test_events_are_parsed(self):
+        """Test server-sent events are split on blank lines."""
+        response = MagicMock()
+        response.iter_lines.return_value = [":ping", "", 'data:{"a": 1}', "", "data: {", 'data: "b": 2}', ""]
+        assert list(self.stream._events(response)) == [{"a": 1}, {"b": 2}]  # pylint: disable=W0212
+
+    def test_latest_update(self):
+        """Test the update data of every requested feed is returned once all feeds are cached."""
+        self.stream._handle_event(make_event([FEED_A], "0x01"))  # pylint: disable=W0212
+        assert self.stream.latest_update([FEED_A, FEED_B]) is None
+        self.stream._handle_event(make_event([FEED_B], "0x02"))  # pylint: disable=W0212
+        update_data, prices = self.stream.latest_update([FEED_A, FEED_B])
+        assert update_data == ["0x01", "0x02"]
+        assert prices[FEED_A] == {"price": 100, "expo": -8, "publish_time": 1}
+
+    def test_shared_update_data_is_deduplicated(self):
+        """Test an update covering several feeds is only submitted once."""
+        self.stream._handle_event(make_event([FEED_A, FEED_B], "0x01"))  # pylint: disable=W0212
+        update_data, _ = self.stream.latest_update([FEED_A, FEED_B])
+        assert update_data == ["0x01"]
+
+    def test_stale_prices_are_ignored(self):
+        """Test prices older than the maximum staleness are not returned."""
+        self.stream._handle_event(make_event([FEED_A], "0x01"))  # pylint: disable=W0212
+        self.stream._latest[FEED_A]["received_at"] -= 10  # pylint: disable=W0212
+        assert self.stream.prices(max_age=5) == {}
+        assert self.stream.latest_update([FEED_A], max_age=5) is None
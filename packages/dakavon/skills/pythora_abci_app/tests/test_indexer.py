@@ -0,0 +1,92 @@
+"""Test the event indexer of the pythora_abci_app skill."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from packages.dakavon.skills.pythora_abci_app.indexer import (
+    PRICE_FEED_UPDATE,
+    PYTHORA_ENTROPY_CALLBACK,
+    EventIndexer,
+)
+
+
+FEED_ID = bytes.fromhex("ab" * 32)
+CHAIN_ID = 11155111
+ADDRESS = "0xDd24F84d36BF92C65F92307595335bdFab5Bbd21"
+
+
+def price_feed_update(block_number: int, log_index: int = 0) -> dict:
+    """Make a decoded PriceFeedUpdate log."""
+    return {
+        "args": {"id": FEED_ID, "publishTime": 1000 + block_number, "price": 42, "conf": 1},
+        "blockNumber": block_number,
+        "transactionHash": bytes([block_number % 256]) * 32,
+        "logIndex": log_index,
+    }
+
+
+class TestEventIndexer:
+    """Test EventIndexer."""
+
+    def setup_method(self):
+        """Set up the test."""
+        self.indexer = EventIndexer(db_path=":memory:", look_back=100, initial_chunk_size=50, max_chunk_size=200)
+
+    def teardown_method(self):
+        """Tear down the test."""
+        self.indexer.close()
+
+    def test_only_new_blocks_are_requested(self):
+        """Test the first sync looks back and the next ones start after the cursor."""
+        get_events = MagicMock(return_value=[])
+        self.indexer.sync(CHAIN_ID, ADDRESS, PRICE_FEED_UPDATE, 1000, get_events)
+        assert [call.args for call in get_events.call_args_list] == [(900, 949), (950, 999), (1000, 1000)]
+        assert self.indexer.last_indexed_block(CHAIN_ID, ADDRESS.lower(), PRICE_FEED_UPDATE) == 1000
+        get_events.reset_mock()
+        self.indexer.sync(CHAIN_ID, ADDRESS, PRICE_FEED_UPDATE, 1010, get_events)
+        get_events.assert_called_once_with(1001, 1010)
+        assert self.indexer.last_indexed_block(CHAIN_ID, ADDRESS, PYTHORA_ENTROPY_CALLBACK) is None
+
+    def test_cursors_are_kept_per_chain_and_contract(self):
+        """Test the same event of another contract or chain is indexed from its own cursor."""
+        self.indexer.sync(CHAIN_ID, ADDRESS, PRICE_FEED_UPDATE, 1000, MagicMock(return_value=[]))
+        assert self.indexer.last_indexed_block(1, ADDRESS, PRICE_FEED_UPDATE) is None
+        assert self.indexer.last_indexed_block(CHAIN_ID, "0x" + "01" * 20, PRICE_FEED_UPDATE) is None
+        get_events = MagicMock(return_value=[])
+        self.indexer.sync(1, ADDRESS, PRICE_FEED_UPDATE, 500, get_events)
+        assert get_events.call_args_list[0].args == (400, 449)
+
+    def test_chunks_shrink_on_errors(self):
+        """Test a rejected block range is retried with half its size, and only grows back after several successes."""
+        get_events = MagicMock(side_effect=[ValueError("too many logs"), [price_feed_update(860)], [], [], [], []])
+        assert self.indexer.sync(CHAIN_ID, ADDRESS, PRICE_FEED_UPDATE, 1000, get_events) == 1
+        assert [call.args for call in get_events.call_args_list] == [
+            (900, 949),
+            (900, 924),
+            (925, 949),
+            (950, 974),
+            (975, 999),
+            (1000, 1000),
+        ]
+
+    def test_smallest_chunk_errors_are_raised(self):
+        """Test an error on a single block is not swallowed."""
+        indexer = EventIndexer(db_path=":memory:", look_back=0, initial_chunk_size=1)
+        with pytest.raises(ValueError):
+            indexer.sync(CHAIN_ID, ADDRESS, PRICE_FEED_UPDATE, 10, MagicMock(side_effect=ValueError("node down")))
+
+    def test_events_are_queried_locally(self):
+        """Test indexed events are stored once and can be looked up by feed id and block."""
+        logs = [price_feed_update(950), price_feed_update(990)]
+        self.indexer.sync(
+            CHAIN_ID,
+            ADDRESS,
+            PRICE_FEED_UPDATE,
+            1000,
+            lambda from_block, to_block: [log for log in logs if from_block <= log["blockNumber"] <= to_block],
+        )
+        updates = self.indexer.price_feed_updates("0x" + FEED_ID.hex().upper(), from_block=960)
+        assert [(update["block_number"], update["publish_time"], update["price"]) for update in updates] == [
+            (990, 1990, 42)
+        ]
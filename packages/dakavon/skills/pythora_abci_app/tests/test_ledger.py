@@ -0,0 +1,42 @@
+"""Test the ledger api registry of the pythora_abci_app skill."""
+
+from unittest.mock import MagicMock, patch
+
+from aea_ledger_ethereum import EthereumApi
+
+from packages.dakavon.skills.pythora_abci_app.ledger import LedgerApiRegistry
+
+
+RPC = "http://localhost:8545"
+CHAIN_ID = 11155111
+ADDRESS = "0x0000000000000000000000000000000000000001"
+
+
+class TestLedgerApiRegistry:
+    """Test LedgerApiRegistry."""
+
+    def setup_method(self):
+        """Set up the test."""
+        self.registry = LedgerApiRegistry(private_key_path="ethereum_private_key.txt")
+
+    def teardown_method(self):
+        """Tear down the test."""
+        self.registry.close()
+
+    def test_ledger_apis_are_shared(self):
+        """Test one ledger api is created per chain."""
+        assert self.registry.get(RPC, CHAIN_ID) is self.registry.get(RPC, CHAIN_ID)
+        assert self.registry.get(RPC, CHAIN_ID) is not self.registry.get(RPC, 1)
+
+    def test_contract_instances_are_cached(self):
+        """Test a contract instance is built once per chain, contract address and interface."""
+        ledger_api = self.registry.get(RPC, CHAIN_ID)
+        pyth_interface = {"abi": [{"name": "getPrice"}]}
+        entropy_interface = {"abi": [{"name": "getFee"}]}
+        with patch.object(EthereumApi, "get_contract_instance", side_effect=lambda *_: MagicMock()) as mock_get:
+            instance = ledger_api.get_contract_instance(pyth_interface, ADDRESS)
+            assert ledger_api.get_contract_instance(pyth_interface, ADDRESS) is instance
+            assert ledger_api.get_contract_instance(dict(pyth_interface), ADDRESS) is instance
+            assert self.registry.get(RPC, 1).get_contract_instance(pyth_interface, ADDRESS) is not instance
+            assert ledger_api.get_contract_instance(entropy_interface, ADDRESS) is not instance
+        assert mock_get.call_count == 3
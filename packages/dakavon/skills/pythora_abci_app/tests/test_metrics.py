@@ -12,6 +12,7 @@ from aea.protocols.dialogue.base import DialogueMessage
 from packages.dakavon.skills.pythora_abci_app import PUBLIC_ID
 from packages.eightballer.protocols.http.message import HttpMessage
 from packages.dakavon.skills.pythora_abci_app.handlers import HttpHandler
+from packages.dakavon.skills.pythora_abci_app.metrics import MetricsSnapshot
 from packages.dakavon.skills.pythora_abci_app.dialogues import HttpDialogues
 
 
@@ -98,6 +99,7 @@ class TestHttpHandler(BaseSkillTestCase):
             + f"url={incoming_message.url} and body={incoming_message.body}",
         )
 
+        etag, _ = self._skill.skill_context.strategy.metrics.get({})
         message = self.get_message_from_outbox()
         has_attributes, error_str = self.message_has_attributes(
             actual_message=message,
@@ -108,16 +110,91 @@ class TestHttpHandler(BaseSkillTestCase):
             version=incoming_message.version,
             status_code=200,
             status_text="Success",
-            headers=incoming_message.headers,
+            headers=HttpMessage.Headers({"ETag": etag, "Content-Type": "application/json"}),
             body=json.dumps({}).encode("utf-8"),
         )
         assert has_attributes, error_str
 
         mock_logger.assert_any_call(
-            logging.INFO,
+            logging.DEBUG,
             f"responding with: {message}",
         )
 
+    def test_handle_request_get_not_modified(self):
+        """Test a client with the current version of the metrics gets no body back."""
+        etag, _ = self._skill.skill_context.strategy.metrics.get({})
+        incoming_message = cast(
+            HttpMessage,
+            self.build_incoming_message(
+                message_type=HttpMessage,
+                performative=HttpMessage.Performative.REQUEST,
+                to=self.skill_id,
+                sender=self.sender,
+                method=self.get_method,
+                url=self.url,
+                version=self.version,
+                headers=HttpMessage.Headers({"Accept": "application/json", "If-None-Match": etag}),
+                body=b"",
+            ),
+        )
+
+        self.http_handler.handle(incoming_message)
+
+        self.assert_quantity_in_outbox(1)
+        message = self.get_message_from_outbox()
+        has_attributes, error_str = self.message_has_attributes(
+            actual_message=message,
+            message_type=HttpMessage,
+            performative=HttpMessage.Performative.RESPONSE,
+            status_code=304,
+            status_text="Not Modified",
+            body=b"",
+        )
+        assert has_attributes, error_str
+
+    def test_handle_response(self):
+        """Test a response from the http client connection is routed to the waiting request."""
+        request, dialogue = self.http_dialogues.create(
+            counterparty="eightballer/http_client:0.1.0",
+            performative=HttpMessage.Performative.REQUEST,
+            method=self.get_method,
+            url=self.url,
+            headers="",
+            version="",
+            body=b"",
+        )
+        nonce = dialogue.dialogue_label.dialogue_reference[0]
+        pending_http_requests = self._skill.skill_context.strategy.pending_http_requests
+        pending_http_requests[nonce] = None
+        incoming_message = cast(
+            HttpMessage,
+            self.build_incoming_message_for_skill_dialogue(
+                dialogue=dialogue,
+                performative=HttpMessage.Performative.RESPONSE,
+                version="",
+                status_code=200,
+                status_text="OK",
+                headers="",
+                body=self.content,
+            ),
+        )
+
+        self.http_handler.handle(incoming_message)
+
+        assert request.url == self.url
+        assert pending_http_requests.pop(nonce) is incoming_message
+        self.assert_quantity_in_outbox(0)
+
+    def test_metrics_snapshot(self):
+        """Test the shared state is only serialized again once the snapshot is invalidated."""
+        snapshot = MetricsSnapshot()
+        shared_state = {"tx_receipt_status": 1}
+        etag, body = snapshot.get(shared_state)
+        shared_state["tx_receipt_status"] = 0
+        assert snapshot.get(shared_state) == (etag, body)
+        snapshot.invalidate()
+        assert snapshot.get(shared_state)[0] != etag
+
     @classmethod
     def teardown(cls, *args, **kwargs):  # noqa
         """Teardown the test class."""
@@ -0,0 +1,94 @@
+"""Test the nonce manager of the pythora_abci_app skill."""
+
+from unittest.mock import MagicMock
+
+from packages.dakavon.skills.pythora_abci_app.nonce import NonceManager
+
+
+CHAIN_ID = 11155111
+ADDRESS = "0x0000000000000000000000000000000000000001"
+
+
+def make_ledger_api(mined: int, in_mempool: int) -> MagicMock:
+    """Make a ledger api returning the given transaction counts."""
+    ledger_api = MagicMock()
+    ledger_api.api.eth.get_transaction_count.side_effect = lambda address, block="latest": (
+        in_mempool if block == "pending" else mined
+    )
+    return ledger_api
+
+
+class TestNonceManager:
+    """Test NonceManager."""
+
+    def setup_method(self):
+        """Set up the test."""
+        self.nonce_manager = NonceManager(stuck_timeout=30, fee_bump=1.125)
+
+    def test_nonces_are_handed_out_locally(self):
+        """Test the chain is only queried once for consecutive transactions."""
+        ledger_api = make_ledger_api(mined=5, in_mempool=6)
+        assert [self.nonce_manager.next_nonce(CHAIN_ID, ledger_api, ADDRESS) for _ in range(3)] == [6, 7, 8]
+        assert ledger_api.api.eth.get_transaction_count.call_count == 2
+
+    def test_released_nonce_is_reused(self):
+        """Test a nonce whose transaction was not sent is handed out again first."""
+        ledger_api = make_ledger_api(mined=0, in_mempool=0)
+        first = self.nonce_manager.next_nonce(CHAIN_ID, ledger_api, ADDRESS)
+        self.nonce_manager.next_nonce(CHAIN_ID, ledger_api, ADDRESS)
+        self.nonce_manager.release(CHAIN_ID, first)
+        assert self.nonce_manager.next_nonce(CHAIN_ID, ledger_api, ADDRESS) == first
+        assert self.nonce_manager.next_nonce(CHAIN_ID, ledger_api, ADDRESS) == 2
+
+    def test_released_nonce_used_by_the_chain_is_dropped(self):
+        """Test a released nonce the chain has used meanwhile is not handed out again."""
+        self.nonce_manager.next_nonce(CHAIN_ID, make_ledger_api(mined=0, in_mempool=0), ADDRESS)
+        self.nonce_manager.next_nonce(CHAIN_ID, make_ledger_api(mined=0, in_mempool=0), ADDRESS)
+        self.nonce_manager.release(CHAIN_ID, 0)
+        assert self.nonce_manager.next_nonce(CHAIN_ID, make_ledger_api(mined=3, in_mempool=3), ADDRESS) == 3
+
+    def test_track_and_confirm(self):
+        """Test transactions in flight are tracked until confirmed."""
+        pending_tx = self.nonce_manager.track(CHAIN_ID, {"nonce": 3, "gasPrice": 100}, "0xhash")
+        assert self.nonce_manager.get(CHAIN_ID, 3) is pending_tx
+        assert self.nonce_manager.in_flight(CHAIN_ID) == 1
+        self.nonce_manager.confirm(CHAIN_ID, 3)
+        assert self.nonce_manager.in_flight(CHAIN_ID) == 0
+
+    def test_reconcile_drops_mined_transactions(self):
+        """Test reconciling forgets mined transactions and keeps the ones in flight."""
+        self.nonce_manager.track(CHAIN_ID, {"nonce": 3}, "0x3")
+        self.nonce_manager.track(CHAIN_ID, {"nonce": 4}, "0x4")
+        self.nonce_manager.reconcile(CHAIN_ID, make_ledger_api(mined=4, in_mempool=4), ADDRESS)
+        assert self.nonce_manager.get(CHAIN_ID, 3) is None
+        assert self.nonce_manager.get(CHAIN_ID, 4) is not None
+        assert self.nonce_manager.next_nonce(CHAIN_ID, make_ledger_api(mined=4, in_mempool=4), ADDRESS) == 5
+
+    def test_replacement_bumps_fees(self):
+        """Test a replacement keeps the nonce and bumps every fee field."""
+        pending_tx = self.nonce_manager.track(
+            CHAIN_ID, {"nonce": 1, "maxFeePerGas": 1000, "maxPriorityFeePerGas": 10, "gas": 21000}, "0x1"
+        )
+        replacement = self.nonce_manager.replacement(pending_tx)
+        assert replacement == {"nonce": 1, "maxFeePerGas": 1125, "maxPriorityFeePerGas": 12, "gas": 21000}
+        pending_tx.replace(replacement, "0x2")
+        assert pending_tx.tx_hashes == ["0x1", "0x2"]
+
+    def test_is_stuck(self):
+        """Test a transaction is stuck once it waited for longer than the timeout."""
+        pending_tx = self.nonce_manager.track(CHAIN_ID, {"nonce": 1}, "0x1")
+        assert not self.nonce_manager.is_stuck(pending_tx)
+        pending_tx.sent_at -= 30
+        assert self.nonce_manager.is_stuck(pending_tx)
+
+    def test_abandoned_transaction_stays_tracked(self):
+        """Test an abandoned transaction is tracked until mined and keeps the chain busy."""
+        self.nonce_manager.track(CHAIN_ID, {"nonce": 3}, "0x3")
+        pending_tx = self.nonce_manager.track(CHAIN_ID, {"nonce": 4}, "0x4")
+        self.nonce_manager.abandon(CHAIN_ID, 4)
+        self.nonce_manager.abandon(CHAIN_ID, 5)
+        assert self.nonce_manager.abandoned(CHAIN_ID) == [pending_tx]
+        assert self.nonce_manager.in_flight(CHAIN_ID) == 2
+        self.nonce_manager.reconcile(CHAIN_ID, make_ledger_api(mined=5, in_mempool=5), ADDRESS)
+        assert self.nonce_manager.abandoned(CHAIN_ID) == []
+        assert self.nonce_manager.in_flight(CHAIN_ID) == 0
@@ -0,0 +1,75 @@
+"""Test the RPC endpoint pool of the pythora_abci_app skill."""
+
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from packages.dakavon.skills.pythora_abci_app.rpc import RpcPoolProvider
+
+
+URLS = ["https://rpc-a.example", "https://rpc-b.example"]
+
+
+def make_session(result: str | None = None, error: Exception | None = None, delay: float = 0) -> MagicMock:
+    """Make a session answering every request with a result, or failing with an error."""
+
+    def post(*_args, **_kwargs):
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        response = MagicMock()
+        response.content = json.dumps({"jsonrpc": "2.0", "id": 0, "result": result}).encode()
+        return response
+
+    session = MagicMock()
+    session.post.side_effect = post
+    return session
+
+
+def make_provider(sessions: list[MagicMock], **kwargs) -> RpcPoolProvider:
+    """Make a provider over the given sessions."""
+    return RpcPoolProvider(URLS, sessions, timeout=1, **kwargs)
+
+
+def test_failover():
+    """Test a failing endpoint is skipped and ranked last afterwards."""
+    failing, healthy = make_session(error=requests.ConnectionError()), make_session(result="0x1")
+    provider = make_provider([failing, healthy], hedge=False)
+    assert provider.make_request("eth_chainId", [])["result"] == "0x1"
+    assert [endpoint.url for endpoint in provider.ranked_endpoints()] == URLS[::-1]
+    provider.make_request("eth_chainId", [])
+    assert failing.post.call_count == 1
+
+
+def test_lagging_endpoint_is_ranked_last():
+    """Test an endpoint trailing the highest block seen is ranked last."""
+    provider = make_provider([make_session(result="0x10"), make_session(result="0x1")], hedge=False)
+    provider.endpoints[1].latency = 0.001
+    provider.make_request("eth_blockNumber", [])
+    provider.endpoints[0].latency = 1.0
+    provider.make_request("eth_blockNumber", [])
+    assert provider.endpoints[1].block_number == 1
+    assert [endpoint.url for endpoint in provider.ranked_endpoints()] == URLS
+
+
+def test_all_endpoints_failing():
+    """Test the error is raised once no endpoint is left."""
+    provider = make_provider([make_session(error=requests.Timeout()), make_session(error=requests.Timeout())])
+    with pytest.raises(requests.Timeout):
+        provider.make_request("eth_chainId", [])
+
+
+def test_hedged_request():
+    """Test a slow latency-critical request is answered by the second endpoint."""
+    slow, fast = make_session(result="0xslow", delay=0.5), make_session(result="0xfast")
+    provider = make_provider([slow, fast], hedge_delay=0.01)
+    try:
+        assert provider.make_request("eth_getTransactionReceipt", ["0x"])["result"] == "0xfast"
+        time.sleep(0.6)  # the slow response still lands and is measured
+        assert provider.make_request("eth_chainId", [])["result"] == "0xfast"
+        assert slow.post.call_count == 1
+    finally:
+        provider.close()
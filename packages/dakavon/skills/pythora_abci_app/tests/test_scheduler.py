@@ -0,0 +1,67 @@
+"""Test the push scheduler of the pythora_abci_app skill."""
+
+from packages.dakavon.skills.pythora_abci_app.scheduler import PushScheduler
+
+
+FEED_ID = "0x" + "0b" * 32
+OTHER_FEED_ID = "0x" + "ff" * 32
+
+
+class TestPushScheduler:
+    """Test PushScheduler."""
+
+    def setup_method(self):
+        """Set up the test."""
+        self.scheduler = PushScheduler(
+            deviation_thresholds={OTHER_FEED_ID: 5.0},
+            heartbeats={OTHER_FEED_ID: 600},
+            default_deviation_threshold=1.0,
+            default_heartbeat=60,
+        )
+
+    def test_unknown_feed_is_due(self):
+        """Test a feed without an on-chain price is always due."""
+        assert self.scheduler.push_reason(FEED_ID, 100, now=0) == "unknown on-chain price"
+
+    def test_deviation(self):
+        """Test a push is only due once the deviation threshold is crossed."""
+        self.scheduler.record_push(FEED_ID, 1000, publish_time=100)
+        assert self.scheduler.push_reason(FEED_ID, 1009, now=110) is None
+        assert self.scheduler.push_reason(FEED_ID, 1010, now=110) == "deviation"
+        assert self.scheduler.push_reason(FEED_ID, 990, now=110) == "deviation"
+
+    def test_heartbeat(self):
+        """Test a push is due once the on-chain price is older than the heartbeat."""
+        self.scheduler.record_push(FEED_ID, 1000, publish_time=100)
+        assert self.scheduler.push_reason(FEED_ID, 1000, now=159) is None
+        assert self.scheduler.push_reason(FEED_ID, 1000, now=160) == "heartbeat"
+
+    def test_per_feed_overrides(self):
+        """Test per feed thresholds override the defaults."""
+        self.scheduler.record_push(OTHER_FEED_ID, 1000, publish_time=100)
+        assert self.scheduler.push_reason(OTHER_FEED_ID, 1040, now=600) is None
+        assert self.scheduler.push_reason(OTHER_FEED_ID, 1050, now=600) == "deviation"
+        assert self.scheduler.push_reason(OTHER_FEED_ID, 1000, now=700) == "heartbeat"
+
+    def test_record_push_ignores_older_prices(self):
+        """Test an older publish time never overwrites a newer on-chain price."""
+        self.scheduler.record_push(FEED_ID, 1000, publish_time=100)
+        self.scheduler.record_push(FEED_ID, 2000, publish_time=90)
+        assert self.scheduler.on_chain_price(FEED_ID) == {"price": 1000, "publish_time": 100}
+
+    def test_due_feeds(self):
+        """Test only the due feeds are returned."""
+        self.scheduler.record_push(FEED_ID, 1000, publish_time=100)
+        prices = {
+            FEED_ID: {"price": 1001, "publish_time": 101},
+            OTHER_FEED_ID: {"price": 5, "publish_time": 101},
+        }
+        assert self.scheduler.due_feeds(prices, now=101) == {OTHER_FEED_ID: "unknown on-chain price"}
+
+    def test_stale_publish_time_is_not_due(self):
+        """Test a price not published after the on-chain one is never pushed."""
+        self.scheduler.record_push(FEED_ID, 1000, publish_time=100)
+        assert not self.scheduler.is_fresh(FEED_ID, 100)
+        assert self.scheduler.is_fresh(FEED_ID, 101)
+        assert self.scheduler.push_reason(FEED_ID, 2000, now=110, publish_time=100) is None
+        assert self.scheduler.push_reason(FEED_ID, 2000, now=110, publish_time=101) == "deviation"
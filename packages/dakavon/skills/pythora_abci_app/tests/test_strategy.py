@@ -0,0 +1,81 @@
+"""Test the strategy of the pythora_abci_app skill."""
+
+from typing import cast
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from aea.test_tools.test_skill import BaseSkillTestCase
+
+from packages.dakavon.skills.pythora_abci_app import PUBLIC_ID
+from packages.dakavon.skills.pythora_abci_app.hermes import normalise_feed_id
+from packages.dakavon.skills.pythora_abci_app.strategy import (
+    DEFAULT_PRICE_FEEDS,
+    PythoraStrategy,
+)
+
+
+ROOT_DIR = Path(__file__).parent.parent.parent.parent.parent.parent
+
+FEED_ID = DEFAULT_PRICE_FEEDS[0]["id"]
+
+
+class TestPythoraStrategy(BaseSkillTestCase):
+    """Test PythoraStrategy of pythora_abci_app."""
+
+    path_to_skill = Path(ROOT_DIR, "packages", PUBLIC_ID.author, "skills", PUBLIC_ID.name)
+
+    @classmethod
+    def setup(cls):  # pylint: disable=W0221
+        """Setup the test class."""
+        super().setup_class()
+        cls.strategy = cast(PythoraStrategy, cls._skill.skill_context.strategy)
+
+    def test_price_feed_ids(self):
+        """Test the configured price feed ids are normalised."""
+        assert self.strategy.price_feed_ids == [normalise_feed_id(FEED_ID)]
+        assert self.strategy.symbol(FEED_ID[2:].upper()) == "PYTH/USD"
+
+    def test_hermes_latest_url(self):
+        """Test a single Hermes request carries every requested feed."""
+        feed_ids = [FEED_ID, "0x" + "ab" * 32]
+        url = urlparse(self.strategy.hermes_latest_url(feed_ids))
+        query = parse_qs(url.query)
+        assert url.path == "/v2/updates/price/latest"
+        assert query["ids[]"] == feed_ids
+        assert query["encoding"] == ["hex"]
+        assert query["parsed"] == ["false"]
+
+    def test_chains(self):
+        """Test the chain registry is split into the chains prices are pushed to and the entropy chain."""
+        assert [chain["name"] for chain in self.strategy.push_chains] == ["sepolia"]
+        assert self.strategy.entropy_chain["name"] == "arbitrum_sepolia"
+        assert self.strategy.chain_feed_ids(self.strategy.push_chains[0]) == self.strategy.price_feed_ids
+        assert set(self.strategy.schedulers) == {"sepolia"}
+
+    def test_refresh_on_chain_prices(self):
+        """Test the scheduler of a chain learns the prices of its Pyth contract, the reverted reads aside."""
+        chain = self.strategy.push_chains[0]
+        feed_ids = self.strategy.chain_feed_ids(chain)
+        scheduler = self.strategy.schedulers[chain["name"]]
+        multicall_contract = MagicMock()
+        multicall_contract.batch_read.return_value = {"results": [(123, 1, -8, 1000)] + [None] * (len(feed_ids) - 1)}
+        with patch.multiple(self.strategy, multicall_contract=multicall_contract, pyth_contract=MagicMock()):
+            self.strategy.refresh_on_chain_prices(chain)
+            calls = multicall_contract.batch_read.call_args.kwargs["calls"]
+            assert [call[2:] for call in calls] == [("getPriceUnsafe", (feed_id,)) for feed_id in feed_ids]
+            assert scheduler.on_chain_price(feed_ids[0]) == {"price": 123, "publish_time": 1000}
+            assert scheduler.push_reason(feed_ids[0], 123, now=1001, publish_time=1000) is None
+
+            # a failing read keeps the known prices
+            multicall_contract.batch_read.side_effect = ConnectionError("rpc down")
+            self.strategy.refresh_on_chain_prices(chain)
+            assert scheduler.on_chain_price(feed_ids[0]) == {"price": 123, "publish_time": 1000}
+
+    def test_fee_bump_validation(self):
+        """Test a fee bump of 10%, the minimum replacement bump of the nodes, is accepted."""
+        with patch.object(self.strategy, "fee_bump", 1.1):
+            self.strategy._validate_config()  # pylint: disable=protected-access
+        with patch.object(self.strategy, "fee_bump", 1.05), pytest.raises(ValueError, match="fee_bump"):
+            self.strategy._validate_config()  # pylint: disable=protected-access
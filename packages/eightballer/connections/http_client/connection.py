@@ -19,7 +19,6 @@
 """HTTP client connection and channel."""
 
 import ssl
-import email
 import asyncio
 import logging
 from typing import Any, Optional, cast
@@ -59,14 +58,6 @@ RequestId = str
 ssl_context = ssl.create_default_context(cafile=certifi.where())
 
 
-def headers_to_string(headers: CIMultiDictProxy) -> str:
-    """Convert headers to string."""
-    msg = email.message.Message()
-    for name, value in headers.items():
-        msg.add_header(name, value)
-    return msg.as_string()
-
-
 HttpDialogue = BaseHttpDialogue
 
 
@@ -96,6 +87,10 @@ class HTTPClientAsyncChannel:
 
     DEFAULT_TIMEOUT = 300  # default timeout in seconds
     DEFAULT_EXCEPTION_CODE = 600  # custom code to indicate there was exception during request
+    DEFAULT_CONNECTION_LIMIT = 100  # open connections across all hosts
+    DEFAULT_CONNECTION_LIMIT_PER_HOST = 10  # open connections to a single host
+    DEFAULT_DNS_CACHE_TTL = 300  # seconds
+    DEFAULT_KEEPALIVE_TIMEOUT = 30  # seconds an idle connection is kept open
 
     def __init__(
         self,
@@ -103,13 +98,22 @@ class HTTPClientAsyncChannel:
         address: str,
         port: int,
         connection_id: PublicId,
+        connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+        connection_limit_per_host: int = DEFAULT_CONNECTION_LIMIT_PER_HOST,
+        dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
     ):
         """Initialize an http client channel."""
         self.agent_address = agent_address
         self.address = address
         self.port = port
         self.connection_id = connection_id
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
         self._dialogues = HttpDialogues()
+        self._session: aiohttp.ClientSession | None = None
 
         self._in_queue = None  # type: Optional[asyncio.Queue]  # pragma: no cover
         self._loop = None  # type: Optional[asyncio.AbstractEventLoop]  # pragma: no cover
@@ -123,6 +127,15 @@ class HTTPClientAsyncChannel:
         """Connect channel using loop."""
         self._loop = loop
         self._in_queue = asyncio.Queue()
+        # one session for the lifetime of the channel, so connections are pooled and kept alive
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            limit_per_host=self.connection_limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+            ssl=ssl_context,
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
         self.is_stopped = False
 
     def _get_message_and_dialogue(self, envelope: Envelope) -> tuple[HttpMessage, HttpDialogue | None]:
@@ -174,21 +187,22 @@ class HTTPClientAsyncChannel:
 
     async def _perform_http_request(self, request_http_message: HttpMessage) -> ClientResponse:
         """Perform http request and return response."""
+        if self._session is None:  # pragma: nocover
+            msg = "Channel is not connected"
+            raise ValueError(msg)
         try:
             if request_http_message.is_set("headers") and request_http_message.headers:
-                headers: dict | None = dict(email.message_from_string(request_http_message.headers).items())
+                headers: list[tuple[str, str]] | None = request_http_message.headers.items()
             else:
                 headers = None
-            async with aiohttp.ClientSession() as session:
-                async with session.request(
-                    method=request_http_message.method,
-                    url=request_http_message.url,
-                    headers=headers,
-                    data=request_http_message.body,
-                    ssl=ssl_context,
-                ) as resp:
-                    await resp.read()
-                return resp
+            async with self._session.request(
+                method=request_http_message.method,
+                url=request_http_message.url,
+                headers=headers,
+                data=request_http_message.body,
+            ) as resp:
+                await resp.read()
+            return resp
         except Exception:  # pragma: nocover # pylint: disable=broad-except
             self.logger.exception(
                 f"Exception raised during http call: {request_http_message.method} {request_http_message.url}"
@@ -264,7 +278,7 @@ class HTTPClientAsyncChannel:
             performative=HttpMessage.Performative.RESPONSE,
             target_message=http_request_message,
             status_code=status_code,
-            headers=headers_to_string(headers),
+            headers=HttpMessage.Headers(headers.items()),
             status_text=status_text,
             body=body,
             version="",
@@ -297,6 +311,9 @@ class HTTPClientAsyncChannel:
             self.is_stopped = True
 
             await self._cancel_tasks()
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
 
 
 class HTTPClientConnection(Connection):
@@ -317,6 +334,16 @@ class HTTPClientConnection(Connection):
             host,
             port,
             connection_id=self.connection_id,
+            connection_limit=self.configuration.config.get(
+                "connection_limit", HTTPClientAsyncChannel.DEFAULT_CONNECTION_LIMIT
+            ),
+            connection_limit_per_host=self.configuration.config.get(
+                "connection_limit_per_host", HTTPClientAsyncChannel.DEFAULT_CONNECTION_LIMIT_PER_HOST
+            ),
+            dns_cache_ttl=self.configuration.config.get("dns_cache_ttl", HTTPClientAsyncChannel.DEFAULT_DNS_CACHE_TTL),
+            keepalive_timeout=self.configuration.config.get(
+                "keepalive_timeout", HTTPClientAsyncChannel.DEFAULT_KEEPALIVE_TIMEOUT
+            ),
         )
 
     async def connect(self) -> None:
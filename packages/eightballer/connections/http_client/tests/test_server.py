@@ -85,3 +85,14 @@ class TestClientServer:
     def teardown(self):
         """Tear down test case."""
         self.loop.run_until_complete(self.client.disconnect())
+
+    def test_session_is_shared(self):
+        """Test the channel keeps one pooled session open while connected."""
+        self.loop = asyncio.get_event_loop()
+        self.setup_client()
+        session = self.client.channel._session  # noqa: SLF001
+        assert session is not None
+        assert not session.closed
+        assert session.connector.limit_per_host == self.client.channel.connection_limit_per_host
+        self.loop.run_until_complete(self.client.disconnect())
+        assert session.closed
@@ -20,11 +20,13 @@
 """HTTP server connection, channel, server, and handler."""
 
 import ssl
-import email
+import time
 import asyncio
 import logging
 from abc import ABC, abstractmethod
 from typing import Any, Optional, cast
+from collections import OrderedDict
+from collections.abc import Iterator
 from asyncio import CancelledError
 from textwrap import dedent
 from traceback import format_exc
@@ -55,20 +57,35 @@ from openapi_core.validation.request.datatypes import (
     OpenAPIRequest,
     RequestParameters,
 )
+from openapi_core.templating.datatypes import TemplateResult
+from openapi_core.templating.paths.finders import PathFinder
 from openapi_core.validation.request.shortcuts import validate_request
+from openapi_core.unmarshalling.schemas.enums import UnmarshalContext
 from openapi_core.validation.request.validators import RequestValidator
+from openapi_core.templating.util import ExtendedParser, parse_path_parameter
+from openapi_core.unmarshalling.schemas.factories import SchemaUnmarshallersFactory
+from openapi_core.templating.paths.exceptions import PathNotFound, ServerNotFound, OperationNotFound
 
 from packages.eightballer.protocols.http.message import HttpMessage
 from packages.eightballer.protocols.http.dialogues import (
     HttpDialogue,
     BaseHttpDialogues,
 )
+from packages.eightballer.connections.http_server.routes import RouteTable, CachedRoute, RouteHandler
 
 
 SUCCESS = 200
 NOT_FOUND = 404
 REQUEST_TIMEOUT = 408
 SERVER_ERROR = 500
+SERVICE_UNAVAILABLE = 503
+
+DEFAULT_HEALTH_PATH = "/healthz"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 100
+DEFAULT_RETRY_AFTER = 1  # seconds a client is asked to wait after being turned away
+WAIT_TIME_ALPHA = 0.2  # weight of the latest request in the moving average of the wait time
+OPERATION_CACHE_SIZE = 1024  # (method, path template, server url) whose resolved operation is kept
+OPENAPI_CORE_VERSION = "0.14.5"  # the version whose private validator hooks are overridden
 
 _default_logger = logging.getLogger("aea.packages.eightballer.connections.http_server")
 
@@ -97,14 +114,6 @@ class HttpDialogues(BaseHttpDialogues):
         )
 
 
-def headers_to_string(headers: dict) -> str:
-    """Convert headers to string."""
-    msg = email.message.Message()
-    for name, value in headers.items():
-        msg.add_header(name, value)
-    return msg.as_string()
-
-
 class Request(OpenAPIRequest):
     """Generic request object."""
 
@@ -151,12 +160,14 @@ class Request(OpenAPIRequest):
             body=body,
             mimetype=mimetype,
         )
-        all_headers = dict(http_request.headers)
+        all_headers = HttpMessage.Headers(http_request.headers.items())
         if extra_headers:
-            all_headers.update(extra_headers)
-            del all_headers["Sec-Fetch-Mode"]
-            del all_headers["Sec-Fetch-Site"]
-        request.parameters.header = headers_to_string(all_headers)
+            for name, value in extra_headers.items():
+                all_headers.set(name, value)
+            all_headers = HttpMessage.Headers(
+                (name, value) for name, value in all_headers.items() if name not in {"Sec-Fetch-Mode", "Sec-Fetch-Site"}
+            )
+        request.parameters.header = all_headers
         return request
 
     def to_envelope_and_set_id(
@@ -192,25 +203,131 @@ class Response(web.Response):
         """Turn an envelope into a response."""
         if http_message.performative == HttpMessage.Performative.RESPONSE:
             if http_message.is_set("headers") and http_message.headers:
-                headers: dict | None = dict(email.message_from_string(http_message.headers).items())
+                headers: HttpMessage.Headers | None = HttpMessage.Headers(http_message.headers.items())
             else:
                 headers = None
 
             # if content length header provided, it should correspond to actuyal body length
             if headers and "Content-Length" in headers:
-                headers["Content-Length"] = str(len(http_message.body or ""))
+                headers.set("Content-Length", str(len(http_message.body or "")))
 
             response = cls(
                 status=http_message.status_code,
                 reason=http_message.status_text,
                 body=http_message.body,
-                headers=headers,
+                headers=headers.items() if headers else None,
             )
         else:  # pragma: nocover
             response = cls(status=SERVER_ERROR, text="Server error")
         return response
 
 
+class CachedPathFinder(PathFinder):
+    """A path finder matching urls against path templates compiled once.
+
+    The operation and server found are kept by method, path template and server url,
+    for the last `cache_size` of them, so that the urls differing only in their path
+    parameters share an entry. The paths are tried in the order of PathFinder.
+    """
+
+    def __init__(self, spec: Any, base_url: str | None = None, cache_size: int = OPERATION_CACHE_SIZE) -> None:
+        """Initialize the finder, compiling the path templates of the spec."""
+        super().__init__(spec, base_url=base_url)
+        self._cache_size = cache_size
+        self._operations: OrderedDict[tuple[str, str, str], tuple | None] = OrderedDict()
+        self._paths = []
+        for path_pattern, path in (spec / "paths").items():
+            parser = ExtendedParser(path_pattern, {parse_path_parameter.name: parse_path_parameter})
+            parser._expression += "$"  # pylint: disable=protected-access
+            self._paths.append((path_pattern, path, parser))
+
+    def _get_paths_iter(self, full_url_pattern: str) -> Iterator[tuple[Any, TemplateResult]]:
+        """Iterate over the paths matching a url, the most concrete first."""
+        template_paths = []
+        for path_pattern, path, parser in self._paths:
+            if full_url_pattern.endswith(path_pattern):
+                yield path, TemplateResult(path_pattern, {})
+            else:
+                result = parser.search(full_url_pattern)
+                if result:
+                    template_paths.append((path, TemplateResult(path_pattern, result.named)))
+        yield from sorted(template_paths, key=lambda template_path: len(template_path[1].variables))
+
+    def _find_operation(
+        self, method: str, path: Any, path_result: TemplateResult, full_url_pattern: str
+    ) -> tuple | None:
+        """Find the path, operation, server and server result of a path template, if a server matches."""
+        server_url_pattern = full_url_pattern.rsplit(path_result.resolved, 1)[0]
+        key = (method, path_result.pattern, server_url_pattern)
+        if key in self._operations:
+            self._operations.move_to_end(key)
+            return self._operations[key]
+
+        operations = [(path, path / method, path_result)]
+        found = next(self._get_servers_iter(full_url_pattern, operations), None)
+        operation = None if found is None else (found[0], found[1], found[2], found[4])
+        self._operations[key] = operation
+        if len(self._operations) > self._cache_size:
+            self._operations.popitem(last=False)
+        return operation
+
+    def find(self, request: OpenAPIRequest) -> tuple:
+        """Find the path, operation, server and template results of a request, raising a PathError if there is none."""
+        full_url_pattern = request.full_url_pattern
+        path_found = operation_found = False
+        for path, path_result in self._get_paths_iter(full_url_pattern):
+            path_found = True
+            if request.method not in path:
+                continue
+            operation_found = True
+            operation = self._find_operation(request.method, path, path_result, full_url_pattern)
+            if operation is not None:
+                path, operation, server, server_result = operation
+                return path, operation, server, path_result, server_result
+        if not path_found:
+            raise PathNotFound(full_url_pattern)
+        if not operation_found:
+            raise OperationNotFound(full_url_pattern, request.method)
+        raise ServerNotFound(full_url_pattern)
+
+
+class CachedRequestValidator(RequestValidator):
+    """A request validator resolving the operations, and compiling the validators of a schema, only once.
+
+    The operations are resolved by a CachedPathFinder. The unmarshallers, which hold
+    the compiled JSON schema validators, are kept for every schema of the spec they
+    were needed for. Both override private hooks of openapi-core, which is pinned to
+    OPENAPI_CORE_VERSION for that reason.
+    """
+
+    def __init__(self, spec: Any, cache_size: int = OPERATION_CACHE_SIZE, **kwargs: Any) -> None:
+        """Initialize the validator."""
+        super().__init__(spec, **kwargs)
+        self._path_finder = CachedPathFinder(spec, base_url=self.base_url, cache_size=cache_size)
+        self._unmarshallers: dict[Any, Any] = {}
+
+    def _find_path(self, request: OpenAPIRequest) -> tuple:
+        """Find the path, operation and server of a request, raising a PathError if there is none."""
+        return self._path_finder.find(request)
+
+    def _unmarshal(self, param_or_media_type: Any, value: Any) -> Any:
+        """Unmarshal and validate a value of a request against the schema of a parameter or media type."""
+        if "schema" not in param_or_media_type:
+            return value
+
+        schema = param_or_media_type / "schema"
+        unmarshaller = self._unmarshallers.get(schema)
+        if unmarshaller is None:
+            unmarshallers_factory = SchemaUnmarshallersFactory(
+                self.spec.accessor.dereferencer.resolver_manager.resolver,
+                self.format_checker,
+                self.custom_formatters,
+                context=UnmarshalContext.REQUEST,
+            )
+            unmarshaller = self._unmarshallers[schema] = unmarshallers_factory.create(schema)
+        return unmarshaller(value)
+
+
 class APISpec:
     """API Spec class to verify a request against an OpenAPI/Swagger spec."""
 
@@ -229,7 +346,7 @@ class APISpec:
                 if server is not None:
                     api_spec_dict["servers"].append({"url": server})
                 api_spec = create_spec(api_spec_dict)
-                self._validator = RequestValidator(api_spec)
+                self._validator = CachedRequestValidator(api_spec)
             except OpenAPIValidationError as error:
                 self.logger.exception(f"API specification YAML source file not correctly formatted: {error!s}")
             except Exception:
@@ -312,6 +429,11 @@ class HTTPChannel(BaseAsyncChannel):  # pylint: disable=too-many-instance-attrib
         logger: logging.Logger = _default_logger,
         ssl_cert_path: str | None = None,
         ssl_key_path: str | None = None,
+        health_path: str | None = DEFAULT_HEALTH_PATH,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        retry_after: int = DEFAULT_RETRY_AFTER,
+        route_timeouts: dict[str, float] | None = None,
+        cached_routes: dict[str, float] | None = None,
     ):
         """Initialize a channel and process the initial API specification from the file path (if given)."""
         super().__init__(address=address, connection_id=connection_id)
@@ -331,6 +453,20 @@ class HTTPChannel(BaseAsyncChannel):  # pylint: disable=too-many-instance-attrib
         self.pending_requests: dict[RequestId, Future] = {}
         self._dialogues = HttpDialogues(str(HTTPServerConnection.connection_id))
         self.logger = logger
+        self.routes = RouteTable()
+        if health_path is not None:
+            self.routes.register("GET", health_path, self._handle_health)
+        # read-only routes answered from the last response of the agent, for max age seconds
+        self.cached_routes = {path: CachedRoute(max_age) for path, max_age in (cached_routes or {}).items()}
+        for path, cached_route in self.cached_routes.items():
+            self.routes.register("GET", path, cached_route)
+        # requests over the limit are turned away rather than left to pile up on the agent
+        self.max_concurrent_requests = max_concurrent_requests
+        self.retry_after = retry_after
+        self.route_timeouts = route_timeouts or {}
+        self.in_flight = 0
+        self.rejected_requests = 0
+        self.wait_time: float | None = None  # seconds waited on the agent, moving average
 
     @property
     def api_spec(self) -> APISpec:
@@ -354,7 +490,70 @@ class HTTPChannel(BaseAsyncChannel):  # pylint: disable=too-many-instance-attrib
                 self._in_queue = None
                 self.logger.exception(f"Failed to start server on {self.host}:{self.port}.")
 
-    async def _http_handler(self, http_request: BaseRequest) -> Response:
+    def find_route(self, method: str, path: str) -> RouteHandler | None:
+        """Find the handler of a route."""
+        return self.routes.get(method, path)
+
+    @property
+    def queue_depth(self) -> int:
+        """Get the number of requests not yet picked up by the agent."""
+        return 0 if self._in_queue is None else self._in_queue.qsize()
+
+    def get_timeout(self, path: str) -> float:
+        """Get how long to wait on the agent for the response to a request to a path."""
+        return self.route_timeouts.get(path, self.timeout_window)
+
+    async def _handle_health(self, http_request: BaseRequest) -> web.Response:
+        """Answer a health check, along with the load of the channel."""
+        del http_request
+        return web.json_response(
+            {
+                "status": "ok",
+                "pending_requests": len(self.pending_requests),
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "wait_time": self.wait_time,
+                "rejected_requests": self.rejected_requests,
+            }
+        )
+
+    def _record_wait_time(self, wait_time: float) -> None:
+        """Update the moving average of the time waited on the agent."""
+        if self.wait_time is None:
+            self.wait_time = wait_time
+        else:
+            self.wait_time = WAIT_TIME_ALPHA * wait_time + (1 - WAIT_TIME_ALPHA) * self.wait_time
+
+    async def _http_handler(self, http_request: BaseRequest) -> web.StreamResponse:
+        """Answer the request from its route if it has one, else forward it to the agent."""
+        route_handler = self.find_route(http_request.method, http_request.path)
+        if route_handler is not None:
+            try:
+                response = await route_handler(http_request)
+            except Exception:  # pragma: nocover # pylint: disable=broad-except
+                self.logger.exception("Error during handling incoming request")
+                return Response(status=SERVER_ERROR, reason="Server Error")
+            if response is not None:
+                return response
+
+        if self.in_flight >= self.max_concurrent_requests:
+            self.rejected_requests += 1
+            return Response(
+                status=SERVICE_UNAVAILABLE,
+                reason="Service Unavailable",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self.in_flight += 1
+        try:
+            response = await self._forward_request(http_request)
+        finally:
+            self.in_flight -= 1
+        cached_route = self.cached_routes.get(http_request.path)
+        if cached_route is not None and http_request.method == "GET":
+            cached_route.store(response)
+        return response
+
+    async def _forward_request(self, http_request: BaseRequest) -> Response:
         """Verify the request then send the request to Agent as an envelope."""
         request = await Request.create(http_request)
         if self._in_queue is None:  # pragma: nocover
@@ -367,6 +566,7 @@ class HTTPChannel(BaseAsyncChannel):  # pylint: disable=too-many-instance-attrib
             self.logger.warning(f"request is not valid: {request}")
             return Response(status=NOT_FOUND, reason="Request Not Found")
 
+        sent_at: float | None = None
         try:
             # turn request into envelope
             envelope = request.to_envelope_and_set_id(self._dialogues, self.target_skill_id)
@@ -375,12 +575,13 @@ class HTTPChannel(BaseAsyncChannel):  # pylint: disable=too-many-instance-attrib
 
             # send the envelope to the agent's inbox (via self.in_queue)
             await self._in_queue.put(envelope)
-            # wait for response envelope within given timeout window (self.timeout_window)
+            sent_at = time.monotonic()
+            # wait for response envelope within the timeout of the route (self.timeout_window by default)
             # to appear in dispatch_ready_envelopes
 
             response_message = await asyncio.wait_for(
                 self.pending_requests[request.id],
-                timeout=self.timeout_window,
+                timeout=self.get_timeout(http_request.path),
             )
             return Response.from_message(response_message)
 
@@ -400,6 +601,8 @@ class HTTPChannel(BaseAsyncChannel):  # pylint: disable=too-many-instance-attrib
         finally:
             if request.is_id_set:
                 self.pending_requests.pop(request.id, None)
+            if sent_at is not None:
+                self._record_wait_time(time.monotonic() - sent_at)
 
     async def _start_http_server(self) -> None:
         """Start http server."""
@@ -476,6 +679,13 @@ class HTTPServerConnection(Connection):
         api_spec_path = cast(str | None, self.configuration.config.get("api_spec_path"))
         ssl_cert_path = cast(str | None, self.configuration.config.get("ssl_cert"))
         ssl_key_path = cast(str | None, self.configuration.config.get("ssl_key"))
+        health_path = cast(str | None, self.configuration.config.get("health_path", DEFAULT_HEALTH_PATH))
+        max_concurrent_requests = cast(
+            int, self.configuration.config.get("max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS)
+        )
+        retry_after = cast(int, self.configuration.config.get("retry_after", DEFAULT_RETRY_AFTER))
+        route_timeouts = cast(dict[str, float], self.configuration.config.get("route_timeouts", {}))
+        cached_routes = cast(dict[str, float], self.configuration.config.get("cached_routes", {}))
 
         if bool(ssl_cert_path) != bool(ssl_key_path):  # pragma: nocover
             msg = "Please specify both ssl_cert and ssl_key or neither."
@@ -491,8 +701,24 @@ class HTTPServerConnection(Connection):
             logger=self.logger,
             ssl_cert_path=ssl_cert_path,
             ssl_key_path=ssl_key_path,
+            health_path=health_path,
+            max_concurrent_requests=max_concurrent_requests,
+            retry_after=retry_after,
+            route_timeouts=route_timeouts,
+            cached_routes=cached_routes,
         )
 
+    def register_route(self, method: str, path: str, handler: RouteHandler) -> None:
+        """Register a route answered in the loop of the server, replacing any previous one.
+
+        The handler must not block, and may only read state owned by the loop of the server.
+        """
+        self.channel.routes.register(method, path, handler)
+
+    def unregister_route(self, method: str, path: str) -> None:
+        """Unregister a route answered in the loop of the server."""
+        self.channel.routes.unregister(method, path)
+
     async def connect(self) -> None:
         """Connect to the http channel."""
         if self.is_connected:
@@ -0,0 +1,110 @@
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023 8baller
+#   Copyright 2022 Valory AG
+#   Copyright 2018-2021 Fetch.AI Limited
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""The routes answered directly in the loop of the http server."""
+
+import time
+from threading import Lock
+from collections.abc import Callable, Awaitable
+
+from aiohttp import web
+from multidict import CIMultiDict
+from aiohttp.web_request import BaseRequest
+
+
+SUCCESS = 200
+NOT_MODIFIED = 304
+
+# answers a request directly in the server loop, or returns None to forward it to the agent
+RouteHandler = Callable[[BaseRequest], Awaitable[web.StreamResponse | None]]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check whether an If-None-Match header value matches an ETag."""
+    if if_none_match is None:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+class RouteTable:
+    """The handlers of the routes of a channel answered without a round trip through the agent.
+
+    The table belongs to one channel. Handlers may be registered through the connection
+    from another thread while the server looks them up from its own, so the table is
+    guarded by a lock. A handler runs in the event loop of the server: it must not
+    block and may only read state owned by that loop.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the table."""
+        self._lock = Lock()
+        self._handlers: dict[tuple[str, str], RouteHandler] = {}
+
+    def register(self, method: str, path: str, handler: RouteHandler) -> None:
+        """Register the handler of a route, replacing any previous one."""
+        with self._lock:
+            self._handlers[(method.upper(), path)] = handler
+
+    def unregister(self, method: str, path: str) -> None:
+        """Unregister the handler of a route."""
+        with self._lock:
+            self._handlers.pop((method.upper(), path), None)
+
+    def get(self, method: str, path: str) -> RouteHandler | None:
+        """Get the handler of a route, if one is registered."""
+        with self._lock:
+            return self._handlers.get((method.upper(), path))
+
+
+class CachedRoute:
+    """A read-only route answered from the last successful response of the agent.
+
+    The response is kept for max_age seconds, and answered with a 304 when the
+    client already has its ETag. Requests are forwarded to the agent when nothing
+    is kept, so the agent stays the only one reading its own state.
+    """
+
+    def __init__(self, max_age: float) -> None:
+        """Initialize the route."""
+        self.max_age = max_age
+        self._response: tuple[int, CIMultiDict[str], bytes] | None = None
+        self._expires_at = 0.0
+
+    def store(self, response: web.Response) -> None:
+        """Keep a response of the agent to the route, if it is a successful one."""
+        if response.status != SUCCESS:
+            return
+        self._response = (response.status, CIMultiDict(response.headers), bytes(response.body or b""))
+        self._expires_at = time.monotonic() + self.max_age
+
+    async def __call__(self, http_request: BaseRequest) -> web.Response | None:
+        """Answer from the kept response, or return None to forward the request to the agent."""
+        if self._response is None or time.monotonic() >= self._expires_at:
+            return None
+        status, headers, body = self._response
+        etag = headers.get("ETag")
+        if etag is not None and etag_matches(http_request.headers.get("If-None-Match"), etag):
+            headers = CIMultiDict(
+                (name, value)
+                for name, value in headers.items()
+                if name.lower() not in {"content-type", "content-length"}
+            )
+            return web.Response(status=NOT_MODIFIED, headers=headers)
+        return web.Response(status=status, headers=headers, body=body)
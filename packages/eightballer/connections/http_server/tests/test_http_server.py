@@ -23,6 +23,7 @@ import os
 import re
 import ssl
 import asyncio
+import inspect
 import logging
 from typing import cast
 from traceback import print_exc
@@ -30,13 +31,24 @@ from unittest.mock import Mock, MagicMock, patch
 
 import pytest
 import aiohttp
+import openapi_core
+from multidict import CIMultiDict
 from aea.common import Address
 from aea.mail.base import Message, Envelope
 from aea.identity.base import Identity
+from aiohttp.test_utils import make_mocked_request
 from aiohttp.client_reqrep import ClientResponse
 from aea.test_tools.network import get_host, get_unused_tcp_port
 from aea.configurations.base import ConnectionConfig
 from aea.protocols.dialogue.base import Dialogue as BaseDialogue
+from werkzeug.datastructures import Headers, ImmutableMultiDict
+from openapi_core import create_spec
+from openapi_spec_validator.schemas import read_yaml_file
+from openapi_core.templating.paths.finders import PathFinder
+from openapi_core.validation.request.datatypes import RequestParameters
+from openapi_core.validation.request.validators import RequestValidator
+from openapi_core.templating.util import ExtendedParser, parse_path_parameter
+from openapi_core.templating.paths.exceptions import PathNotFound, ServerNotFound, OperationNotFound
 
 from packages.eightballer.protocols.http.message import HttpMessage
 from packages.eightballer.protocols.http.dialogues import (
@@ -45,9 +57,13 @@ from packages.eightballer.protocols.http.dialogues import (
 )
 from packages.eightballer.connections.http_server.connection import (
     APISpec,
+    Request,
     Response,
+    CachedPathFinder,
     HTTPServerConnection,
+    OPENAPI_CORE_VERSION,
 )
+from packages.eightballer.connections.http_server.routes import RouteTable, CachedRoute
 
 
 logger = logging.getLogger(__name__)
@@ -437,6 +453,110 @@ class TestHTTPServer:
         assert response.status == 500
         assert response.reason == "Server Error"
 
+    @pytest.mark.asyncio
+    async def test_get_health(self):
+        """Test the health check is answered without a round trip through the agent."""
+        response = await self.request("get", "/healthz")
+
+        assert response.status == 200
+        health = await response.json()
+        assert health["status"] == "ok"
+        assert health["pending_requests"] == health["in_flight"] == health["queue_depth"] == 0
+        assert self.http_connection.channel.pending_requests == {}
+
+    @pytest.mark.asyncio
+    async def test_get_503(self):
+        """Test a request over the in-flight limit is turned away at once."""
+        self.http_connection.channel.max_concurrent_requests = 0
+        response = await self.request("get", "/pets")
+
+        assert response.status == 503
+        assert response.headers["Retry-After"] == "1"
+        assert self.http_connection.channel.rejected_requests == 1
+        assert self.http_connection.channel.pending_requests == {}
+
+    @pytest.mark.asyncio
+    async def test_route_timeout(self):
+        """Test the timeout of a route takes precedence over the timeout window."""
+        self.http_connection.channel.route_timeouts = {"/pets": 0.1}
+        with patch.object(self.http_connection.channel.logger, "warning"):
+            response = await self.request("get", "/pets")
+        assert response.status == 408
+        assert self.http_connection.channel.in_flight == 0
+        assert self.http_connection.channel.wait_time is not None
+
+    @pytest.mark.asyncio
+    async def test_registered_route(self):
+        """Test a route registered on the connection is answered directly, and forwarded when its handler declines."""
+        answer = True
+
+        async def handler(request):
+            del request
+            return Response(status=200, text="fast") if answer else None
+
+        self.http_connection.register_route("get", "/pets", handler)
+        try:
+            response = await self.request("get", "/pets")
+            assert response.status == 200
+            assert await response.text() == "fast"
+
+            answer = False
+            request_task = self.loop.create_task(self.request("get", "/pets"))
+            envelope = await asyncio.wait_for(self.http_connection.receive(), timeout=20)
+            assert envelope
+            request_task.cancel()
+        finally:
+            self.http_connection.unregister_route("get", "/pets")
+
+    @pytest.mark.asyncio
+    async def test_cached_route(self):
+        """Test a cached route is answered from the last response of the agent until it expires."""
+        channel = self.http_connection.channel
+        channel.cached_routes["/pets"] = cached_route = CachedRoute(max_age=60)
+        channel.routes.register("GET", "/pets", cached_route)
+
+        request_task = self.loop.create_task(self.request("get", "/pets"))
+        envelope = await asyncio.wait_for(self.http_connection.receive(), timeout=20)
+        incoming_message, dialogue = self._get_message_and_dialogue(envelope)
+        message = dialogue.reply(
+            target_message=incoming_message,
+            performative=HttpMessage.Performative.RESPONSE,
+            version=incoming_message.version,
+            status_code=200,
+            status_text="Success",
+            headers=HttpMessage.Headers({"ETag": '"v1"'}),
+            body=b"Response body",
+        )
+        await self.http_connection.send(
+            Envelope(to=envelope.sender, sender=envelope.to, context=envelope.context, message=message)
+        )
+        response = await asyncio.wait_for(request_task, timeout=20)
+        assert response.status == 200
+
+        response = await self.request("get", "/pets")
+        assert response.status == 200
+        assert await response.text() == "Response body"
+        assert response.headers["ETag"] == '"v1"'
+        response = await self.request("get", "/pets", headers={"If-None-Match": '"v1"'})
+        assert response.status == 304
+        assert channel.queue_depth == 0
+
+        cached_route.max_age = 0
+        cached_route.store(Response(status=200, body=b"stale"))
+        request_task = self.loop.create_task(self.request("get", "/pets"))
+        assert await asyncio.wait_for(self.http_connection.receive(), timeout=20)
+        request_task.cancel()
+
+    def test_route_table(self):
+        """Test the handlers of the routes are matched on the method case-insensitively."""
+        routes = RouteTable()
+        handler = MagicMock()
+        routes.register("get", "/pets", handler)
+        assert routes.get("GET", "/pets") is handler
+        assert routes.get("POST", "/pets") is None
+        routes.unregister("GET", "/pets")
+        assert routes.get("get", "/pets") is None
+
     def teardown(self):
         """Teardown the test case."""
         self.loop.run_until_complete(self.http_connection.disconnect())
@@ -454,6 +574,108 @@ def test_apispec_verify_if_no_validator_set():
     assert APISpec().verify(Mock())
 
 
+def make_openapi_request(url: str, query: dict[str, str] | None = None) -> Mock:
+    """Make a GET request to validate against the petstore spec."""
+    return Mock(
+        full_url_pattern=url,
+        method="get",
+        parameters=RequestParameters(query=ImmutableMultiDict(query or {}), header=Headers([]), cookie={}),
+        body=b"",
+        mimetype="application/json",
+    )
+
+
+def test_apispec_verify_caches_operations():
+    """Test the operation of a path template is only resolved once, and an unknown url is neither cached nor valid."""
+    api_spec = APISpec(os.path.join(ROOT_DIR, "tests", "data", "petstore_sim.yaml"), "http://127.0.0.1:8000")
+    request = make_openapi_request("http://127.0.0.1:8000/pets", {"limit": "5"})
+    with patch.object(
+        CachedPathFinder, "_get_servers_iter", autospec=True, side_effect=PathFinder._get_servers_iter
+    ) as get_servers_iter:
+        assert api_spec.verify(request)
+        assert api_spec.verify(request)
+        request.parameters.query = ImmutableMultiDict({"limit": "abc"})
+        with patch.object(api_spec.logger, "exception"):
+            assert not api_spec.verify(request)
+        assert get_servers_iter.call_count == 1
+
+        for pet_id in ("1", "2", "3"):
+            pet_request = make_openapi_request(f"http://127.0.0.1:8000/pets/{pet_id}")
+            assert api_spec.verify(pet_request)
+            assert pet_request.parameters.path == {"petId": pet_id}
+        assert get_servers_iter.call_count == 2
+
+    request.full_url_pattern = "http://127.0.0.1:8000/unknown"
+    with patch.object(api_spec.logger, "exception"):
+        assert not api_spec.verify(request)
+        assert not api_spec.verify(request)
+
+
+def test_path_finder_matches_openapi_core():
+    """Test the cached path finder finds what the path finder of openapi-core does, within a bounded cache."""
+    spec_dict = read_yaml_file(os.path.join(ROOT_DIR, "tests", "data", "petstore_sim.yaml"))
+    spec_dict["servers"] = [{"url": "http://127.0.0.1:8000"}, {"url": "http://localhost:8000"}]
+    spec = create_spec(spec_dict)
+    finder = CachedPathFinder(spec, cache_size=2)
+    reference = PathFinder(spec)
+    for url in ("http://127.0.0.1:8000/pets", "http://127.0.0.1:8000/pets/7", "http://localhost:8000/pets/8"):
+        request = make_openapi_request(url)
+        assert finder.find(request) == reference.find(request)
+    assert len(finder._operations) == 2  # pylint: disable=protected-access
+    for url, error in (
+        ("http://127.0.0.1:8000/unknown", PathNotFound),
+        ("http://127.0.0.1:9000/pets", ServerNotFound),
+    ):
+        with pytest.raises(error):
+            finder.find(make_openapi_request(url))
+    with pytest.raises(OperationNotFound):
+        finder.find(Mock(full_url_pattern="http://127.0.0.1:8000/pets/7", method="delete"))
+
+
+def test_openapi_core_private_hooks():
+    """Test the private hooks of openapi-core overridden by the connection are still there, unchanged.
+
+    The connection pins openapi-core for these; a failure here means the pin was moved.
+    """
+    assert openapi_core.__version__ == OPENAPI_CORE_VERSION
+    assert list(inspect.signature(RequestValidator._find_path).parameters) == ["self", "request"]
+    assert list(inspect.signature(RequestValidator._unmarshal).parameters) == ["self", "param_or_media_type", "value"]
+    assert list(inspect.signature(PathFinder.find).parameters) == ["self", "request"]
+    assert list(inspect.signature(PathFinder._get_paths_iter).parameters) == ["self", "full_url_pattern"]
+    assert list(inspect.signature(PathFinder._get_servers_iter).parameters) == [
+        "self",
+        "full_url_pattern",
+        "ooperations_iter",
+    ]
+    assert ExtendedParser("/pets/{petId}", {parse_path_parameter.name: parse_path_parameter})._expression
+
+
+def test_response_from_message_headers():
+    """Test a repeated header is kept, and the content length set to the length of the body."""
+    message = HttpMessage(
+        performative=HttpMessage.Performative.RESPONSE,
+        version="",
+        status_code=200,
+        status_text="Success",
+        headers=HttpMessage.Headers([("Set-Cookie", "a=1"), ("Set-Cookie", "b=2"), ("Content-Length", "999")]),
+        body=b"abc",
+    )
+    response = Response.from_message(message)
+    assert response.headers.getall("Set-Cookie") == ["a=1", "b=2"]
+    assert response.headers["Content-Length"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_request_header_values():
+    """Test the values of a repeated request header can be read as openapi-core reads them."""
+    http_request = make_mocked_request(
+        "GET", "/pets", headers=CIMultiDict([("X-Tag", "a"), ("X-Tag", "b"), ("Content-Type", "text/plain")])
+    )
+    request = await Request.create(http_request)
+    assert request.parameters.header.getlist("x-tag") == ["a", "b"]
+    assert request.parameters.header.getlist("Content-Type") == ["text/plain"]
+
+
 @pytest.mark.asyncio
 class TestHTTPSServer:
     """Tests for HTTPServer connection."""
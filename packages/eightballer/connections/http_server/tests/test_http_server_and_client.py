@@ -19,7 +19,6 @@
 """Tests for the HTTP Client and Server connections together."""
 
 # pylint: disable=W0201
-import email
 import urllib
 import asyncio
 import logging
@@ -37,10 +36,7 @@ from aea.protocols.dialogue.base import Dialogue as BaseDialogue
 from packages.eightballer.protocols.http.message import HttpMessage
 from packages.eightballer.protocols.http.dialogues import HttpDialogue, BaseHttpDialogues
 from packages.eightballer.connections.http_client.connection import HTTPClientConnection
-from packages.eightballer.connections.http_server.connection import (
-    HTTPServerConnection,
-    headers_to_string,
-)
+from packages.eightballer.connections.http_server.connection import HTTPServerConnection
 
 
 logger = logging.getLogger(__name__)
@@ -143,7 +139,7 @@ class TestClientServer:
             performative=HttpMessage.Performative.REQUEST,
             method=method,
             url=f"http://{self.host}:{self.port}{path}",
-            headers=headers_to_string(headers) if headers else "",
+            headers=HttpMessage.Headers(headers),
             version="",
             body=body,
         )
@@ -214,14 +210,14 @@ class TestClientServer:
         await self.client.send(initial_request)
 
         request = await asyncio.wait_for(self.server.receive(), timeout=5)
-        parsed_headers = dict(email.message_from_string(cast(HttpMessage, request.message).headers).items())
+        parsed_headers = dict(cast(HttpMessage, request.message).headers.items())
         assert parsed_headers.items() >= headers.items()
 
         initial_response = self._make_response(request)
         await self.server.send(initial_response)
 
         response = await asyncio.wait_for(self.client.receive(), timeout=5)
-        parsed_headers = dict(email.message_from_string(cast(HttpMessage, response.message).headers).items())
+        parsed_headers = dict(cast(HttpMessage, response.message).headers.items())
         assert parsed_headers.items() >= headers.items()
         assert initial_request.message.dialogue_reference[0] == response.message.dialogue_reference[0]
 
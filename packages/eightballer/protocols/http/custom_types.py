@@ -0,0 +1,141 @@
+"""Custom types for the protocol."""
+
+from typing import Any, Union
+from collections.abc import Mapping, Iterable, Iterator
+
+
+class Headers:
+    """The headers of an http message, a multimap of names to values keeping their order.
+
+    Names are matched case-insensitively, and a name may have several values, e.g. Set-Cookie.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: Union[Mapping[str, str], Iterable[tuple[str, str]], None] = None) -> None:
+        """Initialize the headers from a mapping or from (name, value) pairs."""
+        if items is None:
+            items = ()
+        elif isinstance(items, Mapping):
+            items = items.items()
+        self._items: list[tuple[str, str]] = [(str(name), str(value)) for name, value in items]
+
+    @classmethod
+    def from_string(cls, headers: str) -> "Headers":
+        """Parse headers formatted as in an email message, one `name: value` line per header.
+
+        This is the format the headers were carried in before they had a type of their own.
+        """
+        items = []
+        for line in headers.splitlines():
+            name, separator, value = line.partition(":")
+            if separator:
+                items.append((name.strip(), value.strip()))
+        return cls(items)
+
+    def to_string(self) -> str:
+        """Format the headers as in an email message, one `name: value` line per header."""
+        return "".join(f"{name}: {value}\n" for name, value in self._items)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Get the first value of a header, or the default if it is not set."""
+        name = name.lower()
+        for item_name, value in self._items:
+            if item_name.lower() == name:
+                return value
+        return default
+
+    def getall(self, name: str) -> list[str]:
+        """Get every value of a header."""
+        name = name.lower()
+        return [value for item_name, value in self._items if item_name.lower() == name]
+
+    def getlist(self, name: str) -> list[str]:
+        """Get every value of a header, named as in werkzeug for the openapi request parameters."""
+        return self.getall(name)
+
+    def set(self, name: str, value: str) -> None:
+        """Set the value of a header, replacing its values if it is already set."""
+        lower_name = name.lower()
+        self._items = [item for item in self._items if item[0].lower() != lower_name]
+        self._items.append((name, str(value)))
+
+    def add(self, name: str, value: str) -> None:
+        """Add a value to a header."""
+        self._items.append((name, str(value)))
+
+    def items(self) -> list[tuple[str, str]]:
+        """Get the (name, value) pairs, in order."""
+        return list(self._items)
+
+    def __getitem__(self, name: str) -> str:
+        """Get the first value of a header, raising a KeyError if it is not set."""
+        value = self.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name: object) -> bool:
+        """Check whether a header is set."""
+        return isinstance(name, str) and self.get(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the names of the headers, in order."""
+        return (name for name, _ in self._items)
+
+    def __len__(self) -> int:
+        """Get the number of values."""
+        return len(self._items)
+
+    def __str__(self) -> str:
+        """Format the headers as in an email message."""
+        return self.to_string()
+
+    def __repr__(self) -> str:
+        """Get the representation of the headers."""
+        return f"Headers({self._items!r})"
+
+    def __eq__(self, other: object) -> bool:
+        """Check whether two instances hold the same headers, a string being parsed first."""
+        if isinstance(other, str):
+            other = Headers.from_string(other)
+        if not isinstance(other, Headers):
+            return NotImplemented
+        return self._items == other._items
+
+    __hash__ = None  # type: ignore
+
+    @staticmethod
+    def encode(headers_protobuf_object: Any, headers_object: "Headers") -> None:
+        """Encode an instance of this class into the protocol buffer object.
+
+        The protocol buffer object in the headers_protobuf_object argument is matched with the instance of this class
+        in the 'headers_object' argument.
+
+
+
+        Args:
+        ----
+               headers_protobuf_object:  the protocol buffer object whose type corresponds with this class.
+               headers_object:  an instance of this class to be encoded in the protocol buffer object.
+
+        """
+        for name, value in headers_object.items():
+            header = headers_protobuf_object.headers.add()
+            header.name = name
+            header.value = value
+
+    @classmethod
+    def decode(cls, headers_protobuf_object: Any) -> "Headers":
+        """Decode a protocol buffer object that corresponds with this class into an instance of this class.
+
+        A new instance of this class is created that matches the protocol buffer object in the
+        'headers_protobuf_object' argument.
+
+
+        Args:
+        ----
+               headers_protobuf_object:  the protocol buffer object whose type corresponds with this class.
+
+        """
+        return cls((header.name, header.value) for header in headers_protobuf_object.headers)
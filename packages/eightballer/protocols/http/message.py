@@ -27,6 +27,8 @@ from aea.configurations.base import PublicId
 from aea.exceptions import AEAEnforceError, enforce
 from aea.protocols.base import Message  # type: ignore
 
+from packages.eightballer.protocols.http.custom_types import Headers as CustomHeaders
+
 
 _default_logger = logging.getLogger("aea.packages.eightballer.protocols.http.message")
 
@@ -36,8 +38,10 @@ DEFAULT_BODY_SIZE = 4
 class HttpMessage(Message):
     """A protocol for HTTP requests and responses."""
 
-    protocol_id = PublicId.from_str("eightballer/http:0.1.0")
-    protocol_specification_id = PublicId.from_str("eightballer/http:0.1.0")
+    protocol_id = PublicId.from_str("eightballer/http:0.2.0")
+    protocol_specification_id = PublicId.from_str("eightballer/http:0.2.0")
+
+    Headers = CustomHeaders
 
     class Performative(Message.Performative):
         """Performatives for the http protocol."""
@@ -84,6 +88,12 @@ class HttpMessage(Message):
         :param performative: the message performative.
         :param **kwargs: extra options.
         """
+        # the headers used to be a string, which is still accepted and parsed
+        if isinstance(kwargs.get("headers"), str | dict):
+            headers = kwargs["headers"]
+            kwargs["headers"] = (
+                CustomHeaders.from_string(headers) if isinstance(headers, str) else CustomHeaders(headers)
+            )
         super().__init__(
             dialogue_reference=dialogue_reference,
             message_id=message_id,
@@ -128,10 +138,10 @@ class HttpMessage(Message):
         return cast(bytes, self.get("body"))
 
     @property
-    def headers(self) -> str:
+    def headers(self) -> CustomHeaders:
         """Get the 'headers' content from the message."""
         enforce(self.is_set("headers"), "'headers' content is not set.")
-        return cast(str, self.get("headers"))
+        return cast(CustomHeaders, self.get("headers"))
 
     @property
     def method(self) -> str:
@@ -230,8 +240,8 @@ class HttpMessage(Message):
                     ),
                 )
                 enforce(
-                    isinstance(self.headers, str),
-                    "Invalid type for content 'headers'. Expected 'str'. Found '{}'.".format(
+                    isinstance(self.headers, CustomHeaders),
+                    "Invalid type for content 'headers'. Expected 'Headers'. Found '{}'.".format(
                         type(self.headers)
                     ),
                 )
@@ -262,8 +272,8 @@ class HttpMessage(Message):
                     ),
                 )
                 enforce(
-                    isinstance(self.headers, str),
-                    "Invalid type for content 'headers'. Expected 'str'. Found '{}'.".format(
+                    isinstance(self.headers, CustomHeaders),
+                    "Invalid type for content 'headers'. Expected 'Headers'. Found '{}'.".format(
                         type(self.headers)
                     ),
                 )
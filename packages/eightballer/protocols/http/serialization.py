@@ -28,6 +28,9 @@ from aea.protocols.base import Message  # type: ignore
 from aea.protocols.base import Serializer  # type: ignore
 
 from packages.eightballer.protocols.http import http_pb2  # type: ignore
+from packages.eightballer.protocols.http.custom_types import (  # type: ignore
+    Headers,
+)
 from packages.eightballer.protocols.http.message import HttpMessage  # type: ignore
 
 
@@ -63,7 +66,7 @@ class HttpSerializer(Serializer):
             version = msg.version
             performative.version = version
             headers = msg.headers
-            performative.headers = headers
+            Headers.encode(performative.headers, headers)
             body = msg.body
             performative.body = body
             http_msg.request.CopyFrom(performative)
@@ -76,7 +79,7 @@ class HttpSerializer(Serializer):
             status_text = msg.status_text
             performative.status_text = status_text
             headers = msg.headers
-            performative.headers = headers
+            Headers.encode(performative.headers, headers)
             body = msg.body
             performative.body = body
             http_msg.response.CopyFrom(performative)
@@ -118,7 +121,8 @@ class HttpSerializer(Serializer):
             performative_content["url"] = url
             version = http_pb.request.version
             performative_content["version"] = version
-            headers = http_pb.request.headers
+            pb2_headers = http_pb.request.headers
+            headers = Headers.decode(pb2_headers)
             performative_content["headers"] = headers
             body = http_pb.request.body
             performative_content["body"] = body
@@ -129,7 +133,8 @@ class HttpSerializer(Serializer):
             performative_content["status_code"] = status_code
             status_text = http_pb.response.status_text
             performative_content["status_text"] = status_text
-            headers = http_pb.response.headers
+            pb2_headers = http_pb.response.headers
+            headers = Headers.decode(pb2_headers)
             performative_content["headers"] = headers
             body = http_pb.response.body
             performative_content["body"] = body
@@ -38,7 +38,7 @@ class TestMessageHttp(BaseProtocolMessagesTestCase):
                 method="some str",
                 url="some str",
                 version="some str",
-                headers="some str",
+                headers=HttpMessage.Headers([("Set-Cookie", "a=1"), ("Set-Cookie", "b=2")]),
                 body=b"some_bytes",
             ),
             HttpMessage(
@@ -46,7 +46,7 @@ class TestMessageHttp(BaseProtocolMessagesTestCase):
                 version="some str",
                 status_code=12,
                 status_text="some str",
-                headers="some str",
+                headers="Content-Type: text/plain\nETag: \"abc\"\n",
                 body=b"some_bytes",
             ),
         ]
@@ -71,3 +71,21 @@ class TestMessageHttp(BaseProtocolMessagesTestCase):
                 body=b"some_bytes",
             ),
         ]
+
+
+def test_headers_from_string():
+    """Test headers given as a string are parsed into a multimap matching names case-insensitively."""
+    message = HttpMessage(
+        performative=HttpMessage.Performative.RESPONSE,
+        version="",
+        status_code=200,
+        status_text="Success",
+        headers="Content-Type: text/plain\nset-cookie: a=1\nSet-Cookie: b=2\n",
+        body=b"",
+    )
+    assert isinstance(message.headers, HttpMessage.Headers)
+    assert message.headers["content-type"] == "text/plain"
+    assert message.headers.getall("Set-Cookie") == ["a=1", "b=2"]
+    assert message.headers.getlist("set-cookie") == ["a=1", "b=2"]
+    assert "ETag" not in message.headers
+    assert str(message.headers) == "Content-Type: text/plain\nset-cookie: a=1\nSet-Cookie: b=2\n"